@@ -0,0 +1,300 @@
+"""
+lampBenchmark
+Lamp Material Setup (throughput benchmarks)
+
+Description:
+Measures texture classification, shading graph planning and the create and
+assign cost of 1, 100 and 10,000 materials for the Arnold and Redshift
+creators and for both at once (Arnold+Redshift: one shading group with a
+shader per renderer and shared file nodes), and the cost of assigning one
+material to selections of that many objects. Maya is replaced by the
+in-memory lampFakeMaya backend, so the numbers track the tool's own Python
+overhead and the number of maya.cmds calls it makes, not Maya's node
+creation cost. lampMSPlugin is loaded as in a Maya session with the module
+installed, so commits go through lampApplyGraph; --no-plugin measures the
+maya.cmds fallback. Runs on any Python 3 interpreter:
+
+    python benchmarks/lampBenchmark.py --counts 1 100 10000 --json results.json
+    python benchmarks/lampBenchmark.py --baseline results.json --tolerance 0.25
+
+With --baseline the exit code is 1 if a case got slower than the baseline
+by more than the tolerance.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+
+import lampFakeMaya
+
+lampFakeMaya.install()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lamp_material_setup"))
+
+from lampAssignment import assign_material
+from lampMaterialSetup import MaterialBatchBuilder, MaterialFactory
+from lampShadingGraph import ShadingGraph, load_plugin
+from lampTextureClassifier import DEFAULT_CLASSIFIER
+
+DEFAULT_COUNTS = (1, 100, 10000)
+RENDERERS = ("Arnold", "Redshift", "Arnold+Redshift")
+# Benchmarks that do not depend on the renderer run once, reported with this renderer.
+RENDERER_INDEPENDENT = {"classify": "-"}
+TEXTURE_ROOT = os.path.join(os.sep, "benchmark", "textures")
+FILE_NAME_STYLES = (
+    "{asset}_{keyword}.png",
+    "{asset}_{keyword}_4K.exr",
+    "{asset}-{keyword}.1001.tif",
+    "T_{asset}_{keyword}_v002.png"
+)
+FILE_NAME_KEYWORDS = {
+    "Base Color": "BaseColor",
+    "Roughness": "Roughness",
+    "Metalness": "Metallic",
+    "Specular": "Specular",
+    "Normal": "Normal",
+    "Displacement": "Height"
+}
+
+
+def make_texture_sets(count):
+    texture_sets = {}
+    for index in range(count):
+        asset_name = f"asset{index:05d}"
+        texture_sets[asset_name] = {
+            texture_type: os.path.join(TEXTURE_ROOT, asset_name, f"{asset_name}_{keyword}.png")
+            for texture_type, keyword in FILE_NAME_KEYWORDS.items()
+        }
+    return texture_sets
+
+
+def make_file_names(count):
+    return [
+        FILE_NAME_STYLES[index % len(FILE_NAME_STYLES)].format(asset=f"asset{index:05d}", keyword=keyword)
+        for index in range(count) for keyword in FILE_NAME_KEYWORDS.values()
+    ]
+
+
+def renderer_names(renderer):
+    return renderer.split("+")
+
+
+def normal_map_type_for(renderer):
+    return "aiNormalMap" if "Arnold" in renderer_names(renderer) else None
+
+
+def make_builder(renderer):
+    return MaterialBatchBuilder(
+        renderer_names(renderer), normal_map_type_for(renderer), use_substance_style=True, enable_normal_displacement=True)
+
+
+def add_geometry(scene, texture_sets):
+    return {asset_name.lower(): [scene.create_mesh(f"{asset_name}_geo")] for asset_name in texture_sets}
+
+
+def plan(builder, texture_sets, geometry):
+    graph = ShadingGraph()
+    results = [
+        builder.plan_asset(graph, asset_name, textures, geometry.get(asset_name.lower(), []), {})
+        for asset_name, textures in texture_sets.items()
+    ]
+    return graph, results
+
+
+def bench_classify(renderer, count):
+    file_names = make_file_names(count)
+
+    started = time.perf_counter()
+    classifications = DEFAULT_CLASSIFIER.classify_many(file_names)
+    elapsed = time.perf_counter() - started
+
+    unknown = sum(1 for classification in classifications if classification.texture_type is None)
+    return elapsed, {"files": len(file_names), "unclassified": unknown}
+
+
+def bench_plan(renderer, count):
+    lampFakeMaya.new_scene()
+    builder = make_builder(renderer)
+    texture_sets = make_texture_sets(count)
+
+    started = time.perf_counter()
+    graph, results = plan(builder, texture_sets, {})
+    elapsed = time.perf_counter() - started
+
+    return elapsed, dict(graph.stats(), errors=sum(1 for result in results if result["error"]))
+
+
+def bench_create(renderer, count):
+    scene = lampFakeMaya.new_scene()
+    builder = make_builder(renderer)
+    texture_sets = make_texture_sets(count)
+    graph, results = plan(builder, texture_sets, {})
+    scene.command_counts.clear()
+
+    started = time.perf_counter()
+    graph.commit(chunk_name="lampBenchmark")
+    elapsed = time.perf_counter() - started
+
+    return elapsed, {"nodes": len(scene.nodes), "commands": sum(scene.command_counts.values())}
+
+
+def bench_assign(renderer, count):
+    scene = lampFakeMaya.new_scene()
+    builder = make_builder(renderer)
+    texture_sets = make_texture_sets(count)
+    graph, results = plan(builder, texture_sets, add_geometry(scene, texture_sets))
+    graph.commit(chunk_name="lampBenchmark")
+    scene.command_counts.clear()
+
+    started = time.perf_counter()
+    for result in results:
+        builder.assign_result(graph, result)
+    elapsed = time.perf_counter() - started
+
+    return elapsed, {"commands": sum(scene.command_counts.values()), "warnings": len(scene.warnings)}
+
+
+def bench_assign_selection(renderer, count):
+    """One material assigned to a set-dressing selection: objects, face components and a few deleted objects."""
+    scene = lampFakeMaya.new_scene()
+    builder = make_builder(renderer)
+    graph, results = plan(builder, make_texture_sets(1), {})
+    graph.commit(chunk_name="lampBenchmark")
+    sg = graph.resolve(results[0]["sg"])
+
+    group = scene.create_mesh("set_dressing_grp")
+    selection = []
+    for index in range(count):
+        transform = scene.create_mesh(f"prop_{index:05d}", group)
+        selection.append(f"{transform}.f[0:{index % 6}]" if index % 4 == 3 else transform)
+    selection.extend(f"|set_dressing_grp|deleted_{index:05d}" for index in range(count // 100))
+    scene.command_counts.clear()
+
+    started = time.perf_counter()
+    assignment = assign_material(selection, sg)
+    elapsed = time.perf_counter() - started
+
+    return elapsed, {
+        "assigned": len(assignment.assigned),
+        "failed": len(assignment.failed),
+        "commands": sum(scene.command_counts.values())
+    }
+
+
+def bench_connect_textures(renderer, count):
+    """The interactive path: one connect_textures() call, graph and undo chunk per material."""
+    scene = lampFakeMaya.new_scene()
+    normal_map_type = normal_map_type_for(renderer)
+    texture_sets = make_texture_sets(count)
+
+    started = time.perf_counter()
+    for asset_name, textures in texture_sets.items():
+        creator = MaterialFactory.create_material(renderer_names(renderer), f"{asset_name}M", normal_map_type)
+        creator.connect_textures(textures, True, True, normal_map_type, texture_info={})
+    elapsed = time.perf_counter() - started
+
+    return elapsed, {"nodes": len(scene.nodes), "commands": sum(scene.command_counts.values())}
+
+
+BENCHMARKS = {
+    "classify": bench_classify,
+    "plan": bench_plan,
+    "create": bench_create,
+    "assign": bench_assign,
+    "assign_selection": bench_assign_selection,
+    "connect_textures": bench_connect_textures
+}
+
+
+def run_case(benchmark, renderer, count, repeat):
+    """Return the fastest of repeat runs with the details of that run."""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            elapsed, details = BENCHMARKS[benchmark](renderer, count)
+        finally:
+            gc.enable()
+        if best is None or elapsed < best[0]:
+            best = (elapsed, details)
+    return {
+        "benchmark": benchmark,
+        "renderer": renderer,
+        "materials": count,
+        "seconds": round(best[0], 6),
+        "per_material_us": round(best[0] / count * 1e6, 2),
+        "details": best[1]
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a message for every case that is slower than the baseline by more than tolerance."""
+    previous = {(case["benchmark"], case["renderer"], case["materials"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        reference = previous.get((case["benchmark"], case["renderer"], case["materials"]))
+        if reference and case["per_material_us"] > reference["per_material_us"] * (1 + tolerance):
+            regressions.append(
+                f"{case['benchmark']} {case['renderer']} x{case['materials']}: "
+                f"{case['per_material_us']:.2f} us/material, baseline {reference['per_material_us']:.2f}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Lamp Material Setup without Maya.")
+    parser.add_argument("--counts", type=int, nargs="+", default=list(DEFAULT_COUNTS), help="Numbers of materials.")
+    parser.add_argument("--renderers", nargs="+", choices=RENDERERS, default=list(RENDERERS))
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest one is reported.")
+    parser.add_argument("--json", help="Write the results to this file.")
+    parser.add_argument("--baseline", help="Results file of an earlier run to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25%%).")
+    parser.add_argument("--no-plugin", action="store_true", help="Do not load lampMSPlugin; commits use maya.cmds.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if not options.no_plugin:
+        load_plugin()
+    results = []
+    print(f"{'benchmark':<18}{'renderer':<17}{'materials':>10}{'total ms':>12}{'us/material':>14}  details")
+    for benchmark in options.benchmarks:
+        renderers = [RENDERER_INDEPENDENT[benchmark]] if benchmark in RENDERER_INDEPENDENT else options.renderers
+        for renderer in renderers:
+            for count in options.counts:
+                case = run_case(benchmark, renderer, count, max(1, options.repeat))
+                results.append(case)
+                details = ", ".join(f"{key}={value}" for key, value in case["details"].items())
+                print(f"{benchmark:<18}{renderer:<17}{count:>10}{case['seconds'] * 1000:>12.2f}{case['per_material_us']:>14.2f}  {details}")
+
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as results_file:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "plugin": not options.no_plugin,
+                "results": results
+            }, results_file, indent=2)
+
+    if options.baseline:
+        with open(options.baseline, "r", encoding="utf-8") as baseline_file:
+            regressions = compare(results, json.load(baseline_file), options.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
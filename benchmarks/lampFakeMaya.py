@@ -0,0 +1,809 @@
+"""
+lampFakeMaya
+Lamp Material Setup (in-memory maya.cmds stand-in)
+
+Description:
+A small dependency graph kept in Python dictionaries that answers the
+maya.cmds calls made by the core modules: nodes with unique names, a DAG
+hierarchy for geometry, dynamic attributes, plug values, connections and
+shading group membership, undo and redo of the nodes created in an undo
+chunk, plus the selection list, DAG path, plug, MDGModifier and plug-in
+classes of maya.api.OpenMaya. loadPlugin() imports
+a plug-in module and calls its initializePlugin(), so lampApplyGraph is
+registered as in Maya. install() registers it as maya, maya.cmds,
+maya.utils and maya.api.OpenMaya in sys.modules, so lampMaterialSetup can be
+imported and driven on a plain Python interpreter. Only used by the
+benchmarks and the tests; it models the behaviour the tool relies on, not
+Maya's evaluation.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import importlib
+import os
+import re
+import sys
+import types
+from collections import Counter
+
+_TRAILING_DIGITS = re.compile(r"\d+$")
+_INVALID_NAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_:]")
+
+DEFAULT_LISTS = {
+    "asShader": ("defaultShaderList1", "defaultShaderList", "shaders"),
+    "asTexture": ("defaultTextureList1", "defaultTextureList", "textures"),
+    "asUtility": ("defaultRenderUtilityList1", "defaultRenderUtilityList", "utilities")
+}
+GEOMETRY_TYPES = ("mesh", "nurbsSurface", "subdiv")
+# Static attributes the tool queries; the shading group overrides assume mtoa and redshift4maya are loaded.
+NODE_TYPE_ATTRIBUTES = {
+    "shadingEngine": ("surfaceShader", "volumeShader", "displacementShader", "aiSurfaceShader", "rsSurfaceShader")
+}
+# Defaults reported by attributeQuery(listDefault=True); other numeric attributes default to 0.
+ATTRIBUTE_DEFAULTS = {
+    "aiStandardSurface": {"base": 0.8, "subsurfaceType": 1, "subsurfaceScale": 1.0, "specularRoughness": 0.2}
+}
+
+
+class FakeNode:
+    __slots__ = ("name", "node_type", "parent", "children", "values", "dynamic_attributes")
+
+    def __init__(self, name, node_type, parent=None):
+        self.name = name
+        self.node_type = node_type
+        self.parent = parent
+        self.children = []
+        self.values = {}
+        self.dynamic_attributes = set()
+
+
+class FakeScene:
+    """The dependency graph behind the fake maya.cmds module."""
+
+    def __init__(self):
+        self.scene_callbacks = []
+        self.node_removed_callbacks = []
+        self.undo_enabled = True
+        self.plugins = {}
+        self.new()
+
+    def new(self):
+        for callback in list(self.scene_callbacks):
+            callback()
+        self.nodes = {}
+        self.inputs = {}
+        self.outputs = {}
+        self.node_inputs = {}
+        self.node_outputs = {}
+        self.name_counters = {}
+        self.array_indices = Counter()
+        self.command_counts = Counter()
+        self.warnings = []
+        self.undo_depth = 0
+        self.chunk_nodes = None
+        self.undo_stack = []
+        self.redo_stack = []
+        for list_name, list_type, _ in DEFAULT_LISTS.values():
+            self.create_node(list_type, list_name)
+
+    # Nodes
+
+    def create_node(self, node_type, name=None, parent=None):
+        name = self.unique_name(name or f"{node_type}1")
+        node = FakeNode(name, node_type, parent)
+        self.nodes[name] = node
+        if self.chunk_nodes is not None:
+            self.chunk_nodes.append(node)
+        if parent:
+            parent.children.append(node)
+        return node
+
+    def unique_name(self, name):
+        name = _INVALID_NAME_CHARACTERS.sub("_", name)
+        if name not in self.nodes:
+            return name
+        base = _TRAILING_DIGITS.sub("", name)
+        counter = self.name_counters.get(base, 0)
+        while True:
+            counter += 1
+            candidate = f"{base}{counter}"
+            if candidate not in self.nodes:
+                self.name_counters[base] = counter
+                return candidate
+
+    def create_mesh(self, name, parent=None):
+        """Create a transform with a mesh shape, like polyCube without the history."""
+        transform = self.create_node("transform", name, parent and self.node(parent))
+        self.create_node("mesh", f"{transform.name}Shape", transform)
+        return self.long_name(transform)
+
+    def node(self, name):
+        node = self.nodes.get(name.rsplit("|", 1)[-1])
+        if node is None:
+            raise ValueError(f"No object matches name: {name}")
+        return node
+
+    def plug(self, plug):
+        node_name, separator, attribute = plug.partition(".")
+        if not separator:
+            raise ValueError(f"No object matches name: {plug}")
+        node = self.node(node_name)
+        return node, f"{node.name}.{attribute}"
+
+    def long_name(self, node):
+        path = []
+        while node is not None:
+            path.append(node.name)
+            node = node.parent
+        return "|" + "|".join(reversed(path))
+
+    def delete(self, node):
+        for child in list(node.children):
+            self.delete(child)
+        for destination in list(self.node_inputs.get(node.name, ())):
+            self.disconnect(self.inputs[destination], destination)
+        for source in list(self.node_outputs.get(node.name, ())):
+            for destination in list(self.outputs.get(source, ())):
+                self.disconnect(source, destination)
+        if node.parent:
+            node.parent.children.remove(node)
+        del self.nodes[node.name]
+        self.node_inputs.pop(node.name, None)
+        self.node_outputs.pop(node.name, None)
+        for callback, node_type in self.node_removed_callbacks:
+            if node_type is None or node_type == node.node_type:
+                callback(node.name, None)
+
+    # Undo
+
+    def undo_nodes(self, nodes):
+        """Delete nodes like undoing their creation; returns what redo_nodes() needs to bring them back."""
+        names = {node.name for node in nodes}
+        connections = [
+            (source, destination) for destination, source in self.inputs.items()
+            if source.partition(".")[0] in names or destination.partition(".")[0] in names
+        ]
+        for node in reversed(nodes):
+            if node.name in self.nodes:
+                self.delete(node)
+        return nodes, connections
+
+    def redo_nodes(self, nodes, connections):
+        """Bring back nodes under their old names; like Maya, no node-added callback is run."""
+        for node in nodes:
+            self.nodes[node.name] = node
+            if node.parent and node not in node.parent.children:
+                node.parent.children.append(node)
+        for source, destination in connections:
+            if source.partition(".")[0] in self.nodes and destination.partition(".")[0] in self.nodes:
+                if destination not in self.inputs:
+                    self.connect(source, destination)
+
+    # Connections
+
+    def connect(self, source, destination):
+        self.inputs[destination] = source
+        self.outputs.setdefault(source, []).append(destination)
+        self.node_inputs.setdefault(destination.partition(".")[0], set()).add(destination)
+        self.node_outputs.setdefault(source.partition(".")[0], set()).add(source)
+
+    def connect_checked(self, source, destination, force=False):
+        """Connect like connectAttr: an existing input is only replaced with force."""
+        current = self.inputs.get(destination)
+        if current == source:
+            raise RuntimeError(f"Connection not made: '{source}' -> '{destination}'. Connection already exists.")
+        if current is not None:
+            if not force:
+                raise RuntimeError(f"Connection not made: '{source}' -> '{destination}'. Destination is connected.")
+            self.disconnect(current, destination)
+        self.connect(source, destination)
+
+    def set_value(self, plug, value):
+        node, plug = self.plug(plug)
+        if plug in self.inputs:
+            raise RuntimeError(f"setAttr: The attribute '{plug}' is locked or connected and cannot be modified.")
+        node.values[plug.partition(".")[2]] = value
+
+    def add_attribute(self, node, long_name):
+        if long_name in node.dynamic_attributes:
+            raise RuntimeError(f"Found more than one attribute with the name {long_name}.")
+        node.dynamic_attributes.add(long_name)
+        node.values[long_name] = None
+
+    def disconnect(self, source, destination):
+        if self.inputs.get(destination) != source:
+            raise RuntimeError(f"There is no connection from '{source}' to '{destination}' to disconnect.")
+        del self.inputs[destination]
+        self.node_inputs[destination.partition(".")[0]].discard(destination)
+        destinations = self.outputs[source]
+        destinations.remove(destination)
+        if not destinations:
+            del self.outputs[source]
+            self.node_outputs[source.partition(".")[0]].discard(source)
+
+    def connections(self, name, source=True, destination=True):
+        """Yield (own plug, other plug) for the connections of a node or plug."""
+        node_name, _, attribute = name.rsplit("|", 1)[-1].partition(".")
+        if source:
+            plugs = [f"{node_name}.{attribute}"] if attribute else self.node_inputs.get(node_name, ())
+            for plug in plugs:
+                if plug in self.inputs:
+                    yield plug, self.inputs[plug]
+        if destination:
+            plugs = [f"{node_name}.{attribute}"] if attribute else self.node_outputs.get(node_name, ())
+            for plug in plugs:
+                for other in self.outputs.get(plug, ()):
+                    yield plug, other
+
+    def next_index(self, node, attribute):
+        key = (node.name, attribute)
+        index = self.array_indices[key]
+        self.array_indices[key] = index + 1
+        return index
+
+
+SCENE = FakeScene()
+
+
+def _command(function):
+    name = function.__name__
+
+    def command(*args, **kwargs):
+        SCENE.command_counts[name] += 1
+        return function(*args, **kwargs)
+
+    command.__name__ = name
+    command.__doc__ = function.__doc__
+    return command
+
+
+def _as_list(items):
+    if items is None:
+        return []
+    if isinstance(items, str):
+        return [items]
+    flattened = []
+    for item in items:
+        flattened.extend(_as_list(item))
+    return flattened
+
+
+def _types(node_type):
+    return (node_type,) if isinstance(node_type, str) else tuple(node_type)
+
+
+def _shapes(node):
+    if node.node_type in GEOMETRY_TYPES:
+        return [node]
+    return [shape for child in node.children for shape in _shapes(child)]
+
+
+# maya.cmds
+
+@_command
+def shadingNode(node_type, name=None, asShader=False, asTexture=False, asUtility=False, **kwargs):
+    node = SCENE.create_node(node_type, name)
+    for flag, enabled in (("asShader", asShader), ("asTexture", asTexture), ("asUtility", asUtility)):
+        if enabled:
+            list_name, _, attribute = DEFAULT_LISTS[flag]
+            default_list = SCENE.nodes[list_name]
+            SCENE.connect(f"{node.name}.message", f"{list_name}.{attribute}[{SCENE.next_index(default_list, attribute)}]")
+    return node.name
+
+
+@_command
+def createNode(node_type, name=None, parent=None, **kwargs):
+    return SCENE.create_node(node_type, name, parent and SCENE.node(parent)).name
+
+
+@_command
+def sets(*items, **kwargs):
+    if kwargs.get("query"):
+        sg = SCENE.node(_as_list(items)[0])
+        members = []
+        for destination in sorted(SCENE.node_inputs.get(sg.name, ())):
+            if ".dagSetMembers[" in destination:
+                shape, _, member_plug = SCENE.inputs[destination].partition(".")
+                component = member_plug.partition("objectGroups[")[2][:-1]
+                members.append(f"{SCENE.long_name(SCENE.nodes[shape])}.{component}" if component else SCENE.long_name(SCENE.nodes[shape]))
+        return members or None
+
+    if kwargs.get("empty"):
+        node = SCENE.create_node("shadingEngine" if kwargs.get("renderable") else "objectSet", kwargs.get("name", "set1"))
+        return node.name
+
+    shading_group = kwargs.get("forceElement")
+    if not shading_group or not kwargs.get("edit"):
+        raise RuntimeError("lampFakeMaya only supports sets(empty=True), sets(query=True) and sets(edit=True, forceElement=...).")
+    sg = SCENE.node(shading_group)
+    member_plugs = []
+    for item in _as_list(items):
+        node_name, separator, component = item.partition(".")
+        shapes = _shapes(SCENE.node(node_name))
+        if not shapes:
+            raise RuntimeError(f"Cannot add '{item}' to '{sg.name}': it is not geometry.")
+        if separator:
+            member_plugs.append(f"{shapes[0].name}.instObjGroups[0].objectGroups[{component}]")
+        else:
+            member_plugs.extend(f"{shape.name}.instObjGroups[0]" for shape in shapes)
+
+    for member_plug in member_plugs:
+        for destination in list(SCENE.outputs.get(member_plug, ())):
+            SCENE.disconnect(member_plug, destination)
+        SCENE.connect(member_plug, f"{sg.name}.dagSetMembers[{SCENE.next_index(sg, 'dagSetMembers')}]")
+
+
+@_command
+def addAttr(node, longName=None, dataType=None, attributeType=None, **kwargs):
+    SCENE.add_attribute(SCENE.node(node), longName)
+
+
+@_command
+def setAttr(plug, *values, **kwargs):
+    SCENE.set_value(plug, values[0] if len(values) == 1 else values)
+
+
+@_command
+def getAttr(plug, **kwargs):
+    node, plug = SCENE.plug(plug)
+    return node.values.get(plug.partition(".")[2])
+
+
+@_command
+def connectAttr(source, destination, force=False, **kwargs):
+    _, source = SCENE.plug(source)
+    _, destination = SCENE.plug(destination)
+    SCENE.connect_checked(source, destination, force)
+
+
+@_command
+def disconnectAttr(source, destination, **kwargs):
+    _, source = SCENE.plug(source)
+    _, destination = SCENE.plug(destination)
+    SCENE.disconnect(source, destination)
+
+
+@_command
+def listConnections(items, source=True, destination=True, plugs=False, connections=False, type=None, **kwargs):
+    node_types = _types(type) if type else None
+    result = []
+    for item in _as_list(items):
+        SCENE.node(item.partition(".")[0])
+        for own_plug, other_plug in SCENE.connections(item, source, destination):
+            other = other_plug if plugs else other_plug.partition(".")[0]
+            if node_types and SCENE.nodes[other_plug.partition(".")[0]].node_type not in node_types:
+                continue
+            if connections:
+                result.append(own_plug)
+            result.append(other)
+    return result or None
+
+
+@_command
+def listHistory(items, pruneDagObjects=False, **kwargs):
+    history = []
+    visited = set()
+    pending = [SCENE.node(item).name for item in _as_list(items)]
+    while pending:
+        name = pending.pop(0)
+        if name in visited:
+            continue
+        visited.add(name)
+        history.append(name)
+        for destination in SCENE.node_inputs.get(name, ()):
+            pending.append(SCENE.inputs[destination].partition(".")[0])
+    if pruneDagObjects:
+        history = [name for name in history if SCENE.nodes[name].node_type not in ("transform",) + GEOMETRY_TYPES]
+    return history
+
+
+@_command
+def attributeQuery(attribute, node=None, exists=False, listDefault=False, **kwargs):
+    fake_node = SCENE.node(node)
+    if listDefault:
+        return [ATTRIBUTE_DEFAULTS.get(fake_node.node_type, {}).get(attribute, 0.0)]
+    return (
+        attribute in fake_node.dynamic_attributes or attribute in fake_node.values
+        or attribute in NODE_TYPE_ATTRIBUTES.get(fake_node.node_type, ()))
+
+
+@_command
+def nodeType(node, **kwargs):
+    return SCENE.node(node.partition(".")[0]).node_type
+
+
+@_command
+def objExists(name):
+    node_name, _, attribute = name.rsplit("|", 1)[-1].partition(".")
+    node = SCENE.nodes.get(node_name)
+    if node is None:
+        return False
+    return not attribute or attribute in node.values or f"{node_name}.{attribute}" in SCENE.inputs
+
+
+@_command
+def delete(*items, **kwargs):
+    for item in _as_list(items):
+        if item.rsplit("|", 1)[-1] in SCENE.nodes:
+            SCENE.delete(SCENE.node(item))
+
+
+@_command
+def ls(*items, **kwargs):
+    if kwargs.get("selection"):
+        return []
+
+    if items:
+        names = []
+        for item in _as_list(items):
+            if item.startswith("*."):
+                attribute = item[2:]
+                names.extend(name for name, node in SCENE.nodes.items() if attribute in node.dynamic_attributes)
+            elif item.rsplit("|", 1)[-1].partition(".")[0] in SCENE.nodes:
+                names.append(item.rsplit("|", 1)[-1].partition(".")[0])
+        nodes = [SCENE.nodes[name] for name in dict.fromkeys(names)]
+    else:
+        nodes = list(SCENE.nodes.values())
+
+    if kwargs.get("dag") and kwargs.get("shapes"):
+        nodes = [shape for node in nodes for shape in _shapes(node)]
+    elif kwargs.get("geometry"):
+        nodes = [node for node in nodes if node.node_type in GEOMETRY_TYPES]
+    if kwargs.get("type"):
+        node_types = _types(kwargs["type"])
+        nodes = [node for node in nodes if node.node_type in node_types]
+
+    if kwargs.get("long"):
+        return [SCENE.long_name(node) if node.parent or node.node_type == "transform" else node.name for node in nodes]
+    return [node.name for node in nodes]
+
+
+@_command
+def listRelatives(items, parent=False, children=False, shapes=False, fullPath=False, **kwargs):
+    result = []
+    for item in _as_list(items):
+        node = SCENE.node(item)
+        if parent:
+            related = [node.parent] if node.parent else []
+        else:
+            related = _shapes(node) if shapes else list(node.children)
+        result.extend(SCENE.long_name(other) if fullPath else other.name for other in related)
+    return list(dict.fromkeys(result)) or None
+
+
+@_command
+def undoInfo(openChunk=False, closeChunk=False, query=False, **kwargs):
+    if query:
+        return SCENE.undo_enabled
+    if "state" in kwargs:
+        SCENE.undo_enabled = bool(kwargs["state"])
+    elif openChunk:
+        if SCENE.undo_depth == 0:
+            SCENE.chunk_nodes = []
+        SCENE.undo_depth += 1
+    elif closeChunk:
+        if SCENE.undo_depth == 0:
+            raise RuntimeError("undoInfo: closeChunk without a matching openChunk.")
+        SCENE.undo_depth -= 1
+        if SCENE.undo_depth == 0:
+            if SCENE.chunk_nodes:
+                SCENE.undo_stack.append(SCENE.chunk_nodes)
+                SCENE.redo_stack = []
+            SCENE.chunk_nodes = None
+
+
+@_command
+def undo(**kwargs):
+    """Undo the nodes created in the last undo chunk; only node creation is modelled."""
+    if SCENE.undo_stack:
+        SCENE.redo_stack.append(SCENE.undo_nodes(SCENE.undo_stack.pop()))
+
+
+@_command
+def redo(**kwargs):
+    if SCENE.redo_stack:
+        nodes, connections = SCENE.redo_stack.pop()
+        SCENE.redo_nodes(nodes, connections)
+        SCENE.undo_stack.append(nodes)
+
+
+@_command
+def refresh(**kwargs):
+    pass
+
+
+@_command
+def about(batch=False, **kwargs):
+    return True if batch else "2025"
+
+
+@_command
+def warning(message):
+    SCENE.warnings.append(message)
+
+
+@_command
+def loadPlugin(plugin, quiet=False, **kwargs):
+    """Import the plug-in module (it has to be importable) and run its initializePlugin()."""
+    name = os.path.splitext(os.path.basename(plugin))[0]
+    if name not in SCENE.plugins:
+        try:
+            module = importlib.import_module(name)
+        except ImportError:
+            raise RuntimeError(f"Plug-in, \"{plugin}\", was not found on MAYA_PLUG_IN_PATH.")
+        module.initializePlugin(name)
+        SCENE.plugins[name] = module
+    return [name]
+
+
+@_command
+def pluginInfo(plugin, query=False, loaded=False, **kwargs):
+    return os.path.splitext(os.path.basename(plugin))[0] in SCENE.plugins
+
+
+# maya.api.OpenMaya
+
+class MPxCommand:
+    pass
+
+
+class MFnPlugin:
+    """Registered commands become functions of the fake maya.cmds module."""
+
+    def __init__(self, plugin, vendor=None, version=None):
+        self.plugin = plugin
+
+    def registerCommand(self, name, creator):
+        def command(*args, **kwargs):
+            SCENE.command_counts[name] += 1
+            creator().doIt(args)
+
+        command.__name__ = name
+        setattr(sys.modules["maya.cmds"], name, command)
+
+    def deregisterCommand(self, name):
+        delattr(sys.modules["maya.cmds"], name)
+
+
+class MFnData:
+    kString = 4
+
+
+class MFnTypedAttribute:
+    """Attributes are identified by their long name."""
+
+    def create(self, long_name, short_name, data_type=None):
+        return long_name
+
+
+class MPlug:
+    def __init__(self, plug):
+        self._plug = plug
+
+    def name(self):
+        return self._plug
+
+    @property
+    def isDestination(self):
+        return self._plug in SCENE.inputs
+
+    def source(self):
+        return MPlug(SCENE.inputs[self._plug]) if self._plug in SCENE.inputs else MPlug("")
+
+
+class MDGModifier:
+    """Queues operations; doIt() runs the ones queued since the last doIt(), undoIt() reverts all of them."""
+
+    def __init__(self):
+        self._queued = []
+        self._done = []
+
+    def addAttribute(self, node, attribute):
+        self._queued.append(("addAttribute", node, attribute))
+
+    def connect(self, source, destination):
+        self._queued.append(("connect", source.name(), destination.name()))
+
+    def disconnect(self, source, destination):
+        self._queued.append(("disconnect", source.name(), destination.name()))
+
+    def newPlugValueString(self, plug, value):
+        self._queued.append(("value", plug.name(), value))
+
+    newPlugValueBool = newPlugValueInt = newPlugValueDouble = newPlugValueString
+
+    def doIt(self):
+        queued, self._queued = self._queued, []
+        for operation, first, second in queued:
+            if operation == "addAttribute":
+                SCENE.add_attribute(first, second)
+                undo = ("removeAttribute", first, second)
+            elif operation == "connect":
+                SCENE.connect_checked(first, second)
+                undo = ("disconnect", first, second)
+            elif operation == "disconnect":
+                SCENE.disconnect(first, second)
+                undo = ("connect", first, second)
+            else:
+                node, plug = SCENE.plug(first)
+                undo = ("value", plug, node.values.get(plug.partition(".")[2]))
+                SCENE.set_value(plug, second)
+            self._done.append(((operation, first, second), undo))
+
+    def undoIt(self):
+        for operation, undo in reversed(self._done):
+            action, first, second = undo
+            if action == "removeAttribute":
+                first.dynamic_attributes.discard(second)
+                first.values.pop(second, None)
+            elif action == "disconnect":
+                SCENE.disconnect(first, second)
+            elif action == "connect":
+                SCENE.connect(first, second)
+            else:
+                node, plug = SCENE.plug(first)
+                node.values[plug.partition(".")[2]] = second
+        self._queued = [operation for operation, _ in self._done] + self._queued
+        self._done = []
+
+
+class MFn:
+    kTransform = 110
+    kGeometric = 265
+
+
+class MDagPath:
+    """A list of FakeNodes from the root; FakeNodes stand in for MObjects."""
+
+    def __init__(self, other=None):
+        self._nodes = list(other._nodes) if other is not None else []
+
+    def push(self, node):
+        self._nodes.append(node)
+        return self
+
+    def node(self):
+        return self._nodes[-1]
+
+    def fullPathName(self):
+        return "|" + "|".join(node.name for node in self._nodes)
+
+    def hasFn(self, function_type):
+        node_type = self._nodes[-1].node_type
+        if function_type == MFn.kTransform:
+            return node_type == "transform"
+        if function_type == MFn.kGeometric:
+            return node_type in GEOMETRY_TYPES
+        return False
+
+    def childCount(self):
+        return len(self._nodes[-1].children)
+
+    def child(self, index):
+        return self._nodes[-1].children[index]
+
+
+class MSelectionList:
+    def __init__(self):
+        self._items = []
+        self._plugs = []
+
+    def add(self, name):
+        node_name, separator, attribute = name.partition(".")
+        node = SCENE.nodes.get(node_name.rsplit("|", 1)[-1])
+        if node is None:
+            raise RuntimeError("(kInvalidParameter): Object does not exist")
+        self._plugs.append(f"{node.name}.{attribute}" if separator else None)
+        if separator:
+            shapes = _shapes(node)
+            node = shapes[0] if shapes else node
+        self._items.append(node)
+        return self
+
+    def getDependNode(self, index):
+        return self._items[index]
+
+    def getPlug(self, index):
+        if self._plugs[index] is None:
+            raise TypeError("item is not a plug")
+        return MPlug(self._plugs[index])
+
+    def length(self):
+        return len(self._items)
+
+    def getDagPath(self, index):
+        node = self._items[index]
+        if node.parent is None and node.node_type != "transform":
+            raise TypeError("item is not a DAG path")
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        dag_path = MDagPath()
+        for node in reversed(path):
+            dag_path.push(node)
+        return dag_path
+
+
+class MFnDagNode:
+    def __init__(self, dag_path):
+        self.isIntermediateObject = bool(dag_path.node().values.get("intermediateObject"))
+
+
+class MMessage:
+    @staticmethod
+    def removeCallbacks(callback_ids):
+        for callback_id in callback_ids:
+            for callbacks in (SCENE.scene_callbacks, SCENE.node_removed_callbacks):
+                callbacks[:] = [entry for entry in callbacks if id(entry) != callback_id]
+
+
+class MSceneMessage:
+    kBeforeNew = 1
+    kBeforeOpen = 2
+
+    @staticmethod
+    def addCallback(message, callback, client_data=None):
+        SCENE.scene_callbacks.append(callback)
+        return id(callback)
+
+
+class MDGMessage:
+    @staticmethod
+    def addNodeRemovedCallback(callback, node_type=None, client_data=None):
+        entry = (callback, node_type)
+        SCENE.node_removed_callbacks.append(entry)
+        return id(entry)
+
+
+class MFnDependencyNode:
+    def __init__(self, node):
+        self._name = node
+
+    def name(self):
+        return self._name
+
+
+# maya.utils
+
+def executeDeferred(function, *args, **kwargs):
+    function(*args, **kwargs)
+
+
+def install():
+    """Register the fake modules as maya, maya.cmds, maya.utils and maya.api.OpenMaya."""
+    this_module = sys.modules[__name__]
+    maya = types.ModuleType("maya")
+    cmds = types.ModuleType("maya.cmds")
+    utils = types.ModuleType("maya.utils")
+    api = types.ModuleType("maya.api")
+    open_maya = types.ModuleType("maya.api.OpenMaya")
+
+    for name in ("shadingNode", "createNode", "sets", "addAttr", "setAttr", "getAttr", "connectAttr",
+                 "disconnectAttr", "listConnections", "listHistory", "attributeQuery", "nodeType",
+                 "objExists", "delete", "ls", "listRelatives", "undoInfo", "undo", "redo", "refresh", "about", "warning",
+                 "loadPlugin", "pluginInfo"):
+        setattr(cmds, name, getattr(this_module, name))
+    utils.executeDeferred = executeDeferred
+    for name in ("MPxCommand", "MFnPlugin", "MFnData", "MFnTypedAttribute", "MPlug", "MDGModifier", "MFn", "MDagPath",
+                 "MSelectionList", "MFnDagNode", "MMessage", "MSceneMessage", "MDGMessage", "MFnDependencyNode"):
+        setattr(open_maya, name, getattr(this_module, name))
+
+    maya.cmds, maya.utils, maya.api, api.OpenMaya = cmds, utils, api, open_maya
+    sys.modules.update({
+        "maya": maya,
+        "maya.cmds": cmds,
+        "maya.utils": utils,
+        "maya.api": api,
+        "maya.api.OpenMaya": open_maya
+    })
+    return SCENE
+
+
+def new_scene():
+    """Start an empty scene; registered kBeforeNew callbacks (the file node cache) are run first."""
+    SCENE.new()
+    return SCENE
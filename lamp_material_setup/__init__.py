@@ -0,0 +1,22 @@
+"""
+lamp_material_setup
+Lamp Material Setup (package)
+
+Description:
+Lets the tool be imported and run as a package (python -m lamp_material_setup).
+The modules import each other by their plain names, the same way Maya loads
+them from the module's scripts folder, so this folder is added to sys.path.
+Nothing else is imported here.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+import sys
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+if _PACKAGE_DIR not in sys.path:
+    sys.path.append(_PACKAGE_DIR)
@@ -0,0 +1,19 @@
+"""
+lamp_material_setup.__main__
+Lamp Material Setup (command-line entry point)
+
+Description:
+python -m lamp_material_setup scenes... --textures DIR
+See lampSceneBatch for the options.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import sys
+
+from lampSceneBatch import main
+
+sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+lampAssignment
+Lamp Material Setup (bulk shading group assignment)
+
+Description:
+Assigns a shading group to large selections. Objects are resolved once
+through the API and grouped by shape instance: transforms and groups expand
+to the shapes below them, instanced shapes keep one member per instance
+path, and face components are gathered per shape (a fully selected shape
+drops its components). Members are assigned in chunks with one sets call
+per chunk; a chunk that fails is split in half until the failing objects
+are isolated, so one bad object no longer fails the whole assignment.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import re
+from collections import namedtuple
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+
+from lampTextureSets import maya_safe_name
+
+ASSIGN_CHUNK_SIZE = 2000
+MAX_REPORTED_FAILURES = 10
+DEFAULT_MATERIAL_NAME = "newMaterial"
+
+AssignmentResult = namedtuple("AssignmentResult", ["assigned", "failed"])
+
+_NAME_SUFFIX_PATTERN = re.compile(r"[\d_\-]+$")
+
+
+def short_name(node_or_component):
+    return node_or_component.split(".", 1)[0].rsplit("|", 1)[-1].rsplit(":", 1)[-1]
+
+
+def material_name_for(objects, default=DEFAULT_MATERIAL_NAME):
+    """
+    Name a material after the objects it is made for: the object name for a
+    single object, the shared name of numbered copies (rock_01, rock_02 ->
+    rockM), otherwise the first object.
+    """
+    names = list(dict.fromkeys(short_name(obj) for obj in objects if obj))
+    if not names:
+        return default
+
+    base_names = {_NAME_SUFFIX_PATTERN.sub("", name) for name in names}
+    if len(names) > 1 and len(base_names) == 1 and base_names != {""}:
+        return f"{maya_safe_name(base_names.pop())}M"
+    return f"{maya_safe_name(names[0])}M"
+
+
+def group_by_shape(objects):
+    """
+    Return ({shape path: [members]}, {object: error}, {member: object}).
+    A member is the shape path itself or a component on it.
+    """
+    shapes = {}
+    sources = {}
+    failed = {}
+    for obj in dict.fromkeys(objects):
+        selection = om2.MSelectionList()
+        try:
+            selection.add(obj)
+            dag_path = selection.getDagPath(0)
+        except (RuntimeError, TypeError):
+            failed[obj] = "object does not exist or is not a DAG node"
+            continue
+
+        node, separator, component = obj.partition(".")
+        if separator:
+            shape_path = dag_path.fullPathName()
+            members = shapes.setdefault(shape_path, [])
+            if members is not None:
+                member = f"{shape_path}.{component}"
+                members.append(member)
+                sources.setdefault(member, obj)
+            continue
+
+        shape_paths = _shape_paths(dag_path)
+        if not shape_paths:
+            failed[obj] = "no geometry to assign to"
+            continue
+        for shape_path in shape_paths:
+            shapes[shape_path] = None
+            sources.setdefault(shape_path, obj)
+
+    return {
+        shape_path: [shape_path] if members is None else members
+        for shape_path, members in shapes.items()
+    }, failed, sources
+
+
+def assign_material(objects, sg, chunk_size=ASSIGN_CHUNK_SIZE):
+    """
+    Assign sg to objects and return AssignmentResult(assigned objects, {object: error}).
+    The assignment is one undo chunk, which becomes part of the caller's
+    chunk when one is open, so building and assigning undo together.
+    """
+    objects = list(dict.fromkeys(objects))
+    shapes, failed, sources = group_by_shape(objects)
+    members = [member for shape_members in shapes.values() for member in shape_members]
+
+    if members:
+        cmds.undoInfo(openChunk=True, chunkName=f"lampMaterialSetup_assign_{sg}")
+        try:
+            for start in range(0, len(members), chunk_size):
+                _force_element(members[start:start + chunk_size], sg, sources, failed)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+    return AssignmentResult([obj for obj in objects if obj not in failed], failed)
+
+
+def members_outside(sg, objects):
+    """Return the shape paths that are members of sg but not among objects or below them."""
+    selected_shapes, _, _ = group_by_shape(objects)
+    member_shapes, _, _ = group_by_shape(cmds.sets(sg, query=True) or [])
+    return [shape_path for shape_path in member_shapes if shape_path not in selected_shapes]
+
+
+def warn_failures(failed, limit=MAX_REPORTED_FAILURES):
+    for obj, error in list(failed.items())[:limit]:
+        cmds.warning(f"Failed to assign material to '{obj}': {error}")
+    if len(failed) > limit:
+        cmds.warning(f"Failed to assign material to {len(failed) - limit} more objects.")
+
+
+def _force_element(members, sg, sources, failed):
+    try:
+        cmds.sets(members, edit=True, forceElement=sg)
+    except (RuntimeError, ValueError) as e:
+        if len(members) == 1:
+            failed.setdefault(sources[members[0]], str(e).strip())
+            return
+        middle = len(members) // 2
+        _force_element(members[:middle], sg, sources, failed)
+        _force_element(members[middle:], sg, sources, failed)
+
+
+def _shape_paths(dag_path):
+    """Return the full paths of the renderable shapes at or below dag_path."""
+    if not dag_path.hasFn(om2.MFn.kTransform):
+        return [dag_path.fullPathName()] if dag_path.hasFn(om2.MFn.kGeometric) else []
+
+    shape_paths = []
+    pending = [dag_path]
+    while pending:
+        path = pending.pop()
+        for index in range(path.childCount()):
+            child_path = om2.MDagPath(path).push(path.child(index))
+            if child_path.hasFn(om2.MFn.kTransform):
+                pending.append(child_path)
+            elif child_path.hasFn(om2.MFn.kGeometric) and not om2.MFnDagNode(child_path).isIntermediateObject:
+                shape_paths.append(child_path.fullPathName())
+    return shape_paths
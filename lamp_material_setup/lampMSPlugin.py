@@ -2,6 +2,11 @@
 lampMSPlugin
 Lamp Material Setup (plugin-script for Maya)
 
+Description:
+Registers the lampApplyGraph command and the shelf button. The dialog and
+Qt are not imported here; they are loaded the first time the shelf button
+is used.
+
 Version:    2.1
 Author:     rabbitGraned
 License:    Apache 2.0
@@ -9,30 +14,40 @@ License:    Apache 2.0
 """
 
 import maya.cmds as cmds
-from lampMaterialSetup import show_ui
+import maya.api.OpenMaya as om2
+from lampSceneIndex import FILE_NODE_CACHE, MATERIAL_INDEX
+from lampShadingGraph import APPLY_COMMAND, ApplyGraphCommand
 import os
 
+SHOW_UI_COMMAND = "import lampMaterialSetup; lampMaterialSetup.show_ui()"
+
+def maya_useNewAPI():
+    pass
+
 def initializePlugin(plugin):
 
-    plugin_name = "Lamp Material Setup"
     version = "2.1"
     author = "rabbitGraned"
 
-    try:
-        if not cmds.commandPort(':7005', query=True):
-            cmds.commandPort(name=':7005', sourceType="python")
-    except RuntimeError:
-        pass
-    
-    cmds.evalDeferred("import lampMaterialSetup; lampMaterialSetup.show_ui()")
+    if not cmds.about(batch=True):
+        try:
+            if not cmds.commandPort(':7005', query=True):
+                cmds.commandPort(name=':7005', sourceType="python")
+        except RuntimeError:
+            pass
 
-    cmds.evalDeferred(add_shelf_button)
-    
-    print(f"{plugin_name} v{version} by {author} loaded successfully.")
+    om2.MFnPlugin(plugin, author, version).registerCommand(APPLY_COMMAND, ApplyGraphCommand.creator)
+
+    if not cmds.about(batch=True):
+        cmds.evalDeferred(add_shelf_button)
 
 def uninitializePlugin(plugin):
 
-    if cmds.commandPort(name=':7005', query=True):
+    om2.MFnPlugin(plugin).deregisterCommand(APPLY_COMMAND)
+    FILE_NODE_CACHE.release()
+    MATERIAL_INDEX.release()
+
+    if not cmds.about(batch=True) and cmds.commandPort(name=':7005', query=True):
         cmds.commandPort(name=':7005', close=True)
     print("Lamp Material Setup unloaded.")
 
@@ -52,14 +67,12 @@ def add_shelf_button():
         cmds.warning(f"Icon not found at path: {icon_path}")
         return
     
-    command = "import lampMaterialSetup; lampMaterialSetup.show_ui()"
-
     try:
         cmds.shelfButton(
             label=button_label,
             annotation=button_tooltip,
             image=icon_path,
-            command=command,
+            command=SHOW_UI_COMMAND,
             parent=shelf_name,
             imageOverlayLabel=button_label,
             sourceType="python"
@@ -3,6 +3,9 @@ Lamp Material Setup
 
 Desctiption:
 An approved version of the script, implemented as a plug-in for Maya.
+Material creators, the factory and the batch builder; importing this module
+has no side effects and does not load Qt. The dialog lives in
+lampMaterialSetupUI and is imported on the first show_ui() call.
 
 Version:    2.1
 Author:     rabbitGraned
@@ -10,124 +13,527 @@ License:    Apache 2.0
 
 """
 
-from PySide2 import QtWidgets, QtCore
+import hashlib
+import json
+import os
 import maya.cmds as cmds
-from pathlib import Path
-from functools import partial
-from shiboken2 import wrapInstance
-import maya.OpenMayaUI as omui
+import maya.utils
+
+from lampAssignment import MAX_REPORTED_FAILURES, assign_material, warn_failures
+from lampSceneIndex import CONTENT_HASH_ATTR, FILE_NODE_CACHE, MATERIAL_INDEX, MATERIAL_STATE_ATTR, TEXTURE_TYPE_ATTR
+from lampMaterialTemplates import load_template
+from lampProfiler import PROFILER
+from lampShadingGraph import ShadingGraph, load_plugin
+from lampTextureConvert import TextureConverter
+from lampTextureClassifier import TEXTURE_KEYWORDS
+from lampTextureProbe import choose_file_settings, probe_textures
+from lampTextureSets import asset_node_name, collect_texture_sets, load_texture_manifest, split_asset_key, tile_files, tile_scan
 
 VERSION = "2.1"
 
+_UI_NAMES = ("MaterialCreatorUI", "get_maya_main_window", "material_creator_ui")
+
+SG_SHADER_ATTRS = {"Arnold": "aiSurfaceShader", "Redshift": "rsSurfaceShader"}
+RENDERER_SUFFIXES = {"Arnold": "ai", "Redshift": "rs"}
+
 class MaterialCreator:
+    renderer = None
+    shader_type = None
+    file_node_cache = FILE_NODE_CACHE
+    material_index = MATERIAL_INDEX
+    probe_headers = True
+    reuse_existing = True
+    template_name = None
+    normal_map_dependent_types = ("Normal",)
+    displacement = "native"
+
     def __init__(self, material_name):
         self.material_name = material_name
+        self.graph = None
+        self.scalar_outputs = {}
+        self.reused = False
 
-    def create_shader(self):
+    def create_material_node(self):
         raise NotImplementedError("Method must be implemented in subclass")
 
-    def connect_textures(self, textures, use_substance_style, enable_normal_displacement, normal_map_type=None):
-        material, sg = self.create_shader()
+    def create_shader(self):
+        material = self.create_material_node()
+        sg = self.graph.shading_group(f"{self.material_name}SG")
+        self.graph.connect_attr(f"{material}.outColor", f"{sg}.surfaceShader")
+        return material, sg
+
+    def connect_textures(self, textures, use_substance_style, enable_normal_displacement, normal_map_type=None, texture_info=None):
+        with PROFILER.span("connect_textures", material=self.material_name, renderer=self.renderer) as span:
+            graph = ShadingGraph()
+            with PROFILER.span("plan_textures", material=self.material_name):
+                material, sg = self.plan_textures(graph, textures, use_substance_style, enable_normal_displacement, normal_map_type, texture_info)
+            graph.commit(chunk_name=f"lampMaterialSetup_{self.material_name}")
+            span.set(**graph.stats())
+        return graph.resolve(material), graph.resolve(sg)
+
+    def plan_textures(self, graph, textures, use_substance_style, enable_normal_displacement, normal_map_type=None, texture_info=None):
+        self.graph = graph
+        self.scalar_outputs = {}
+        textures = self._filter_textures(textures, enable_normal_displacement)
+        content_hash = self.content_hash(textures, use_substance_style)
+        existing = self.material_index.plan_lookup(graph, content_hash) if self.reuse_existing else None
+        self.reused = existing is not None
+        if existing:
+            return existing
+
+        with PROFILER.span("probe", textures=len(textures)):
+            texture_info = self._probe(textures, texture_info)
+
+        with PROFILER.span("create_shader", material=self.material_name):
+            material, sg = self.create_shader()
+
+        self.plan_network(material, sg, textures, texture_info, normal_map_type, use_substance_style)
+        graph.add_attr(material, CONTENT_HASH_ATTR)
+        graph.set_attr(f"{material}.{CONTENT_HASH_ATTR}", content_hash)
+        self.material_index.plan_add(graph, content_hash, material, sg)
+        return material, sg
 
+    def plan_network(self, material, sg, textures, texture_info, normal_map_type, use_substance_style):
+        """Plan the texture network of an already planned material and record its state."""
         for texture_type, file_path in textures.items():
-            if not file_path or (texture_type in ["Normal", "Displacement"] and not enable_normal_displacement):
-                continue
+            self._plan_texture(material, sg, texture_type, file_path, texture_info, normal_map_type, use_substance_style)
+
+        self.graph.add_attr(material, MATERIAL_STATE_ATTR)
+        self.graph.set_attr(f"{material}.{MATERIAL_STATE_ATTR}", json.dumps(self.material_state(textures, use_substance_style, texture_info)))
+
+    def update_textures(self, material, sg, textures, use_substance_style, enable_normal_displacement, normal_map_type=None, texture_info=None):
+        """
+        Bring a material created by this tool in line with the requested
+        textures, touching only the texture slots that changed.
+        """
+        current_state = read_material_state(material)
+        if current_state is None:
+            raise ValueError(f"Material {material} was not created by Lamp Material Setup.")
+
+        self.graph = graph = ShadingGraph()
+        self.scalar_outputs = {}
+        textures = self._filter_textures(textures, enable_normal_displacement)
+        # The probe also returns the modification times, read on its thread pool.
+        texture_info = self._probe(textures, texture_info)
+        requested_state = self.material_state(textures, use_substance_style, texture_info)
+        current_options, requested_options = current_state["options"], requested_state["options"]
+        template_changed = current_options.get("template") != requested_options.get("template")
+        if template_changed and cmds.nodeType(material) != self.shader_type:
+            raise ValueError(f"Material {material} is a {cmds.nodeType(material)}, {self.template_name or 'the built-in material'} needs a {self.shader_type}.")
+        rebuilt_types = set()
+        if current_options["use_substance_style"] != requested_options["use_substance_style"]:
+            rebuilt_types.update(TEXTURE_KEYWORDS)
+        if template_changed:
+            rebuilt_types.update(TEXTURE_KEYWORDS)
+        if current_options["normal_map_type"] != requested_options["normal_map_type"]:
+            rebuilt_types.update(self.normal_map_dependent_types)
+        if current_options.get("displacement") != requested_options.get("displacement"):
+            rebuilt_types.add("Displacement")
+        changed_types = [
+            texture_type for texture_type in TEXTURE_KEYWORDS
+            if texture_type in rebuilt_types
+            or current_state["textures"].get(texture_type) != requested_state["textures"].get(texture_type)
+        ]
+        if not changed_types:
+            return material, sg
+
+        previous_template = _load_previous_template(material, current_options.get("template")) if template_changed else None
+        network = self._texture_network(material, sg, previous_template)
+        replaced_file_nodes = []
+
+        with PROFILER.span("update_textures", material=material, changed=changed_types):
+            cmds.undoInfo(openChunk=True, chunkName=f"lampMaterialSetup_update_{material}")
+            try:
+                for texture_type in changed_types:
+                    old_texture = current_state["textures"].get(texture_type)
+                    new_texture = requested_state["textures"].get(texture_type)
+                    utility_nodes, connections = network.get(texture_type, ([], []))
+                    file_nodes = list(dict.fromkeys(source_plug.split(".", 1)[0] for source_plug, _ in connections))
+
+                    if old_texture and new_texture and texture_type not in rebuilt_types and file_nodes:
+                        # A changed texture can probe to other settings, which select another file node.
+                        new_file_node = self._plan_file_node(texture_type, new_texture[0], texture_info, use_substance_style)
+                        self._plan_file_node_swap(connections, new_file_node)
+                        replaced_file_nodes.extend(file_node for file_node in file_nodes if file_node != new_file_node)
+                        if new_file_node in file_nodes:
+                            # Setting the current name again reloads the texture and keeps a converted .tx/.rstexbin path.
+                            plug = f"{new_file_node}.fileTextureName"
+                            graph.set_attr(plug, cmds.getAttr(plug))
+                        continue
 
-            file_node = cmds.shadingNode("file", asTexture=True, name=f"{self.material_name}_{texture_type}")
-            cmds.setAttr(f"{file_node}.fileTextureName", file_path, type="string")
+                    replaced_file_nodes.extend(self._remove_texture(utility_nodes, connections))
+                    if new_texture:
+                        self._plan_texture(material, sg, texture_type, new_texture[0], texture_info, normal_map_type, use_substance_style)
 
-            if use_substance_style:
-                if texture_type in ["Roughness", "Metalness"]:
-                    cmds.setAttr(f"{file_node}.alphaIsLuminance", True)
-                if texture_type in ["Roughness", "Metalness", "Specular", "Normal"]:
-                    cmds.setAttr(f"{file_node}.colorSpace", "Raw", type="string")
+                if template_changed:
+                    # The slots are disconnected above, so the shader attributes are free to set.
+                    if previous_template:
+                        reset_shader_attributes(material, previous_template)
+                    self.plan_shader_attributes(material)
+
+                graph.set_attr(f"{material}.{MATERIAL_STATE_ATTR}", json.dumps(requested_state))
+                if self.material_index is not None:
+                    self._plan_content_hash(material, self.content_hash(textures, use_substance_style))
+                graph.commit(chunk_name=f"lampMaterialSetup_update_{material}")
 
-            self._connect_texture(material, file_node, texture_type, sg, normal_map_type, use_substance_style)
+                for file_node in replaced_file_nodes:
+                    delete_if_unused(file_node)
+            finally:
+                cmds.undoInfo(closeChunk=True)
 
         return material, sg
 
+    def plan_shader_attributes(self, material):
+        """Plan the shader attributes a template sets on an existing material; built-in materials set none."""
+
+    def _plan_content_hash(self, material, content_hash):
+        if not cmds.attributeQuery(CONTENT_HASH_ATTR, node=material, exists=True):
+            self.graph.add_attr(material, CONTENT_HASH_ATTR)
+        self.graph.set_attr(f"{material}.{CONTENT_HASH_ATTR}", content_hash)
+        self.graph.on_commit(lambda: self.material_index.add(content_hash, material))
+
+    def material_options(self, use_substance_style):
+        options = {
+            "use_substance_style": bool(use_substance_style),
+            "normal_map_type": getattr(self, "normal_map_type", None),
+            "template": self.template_name
+        }
+        if self.displacement != "native":
+            options["displacement"] = self.displacement
+        return options
+
+    def content_hash(self, textures, use_substance_style):
+        """Hash of everything the network is built from; equal hashes mean equivalent networks."""
+        return _content_hash(self.renderer, self.material_options(use_substance_style), textures)
+
+    def material_state(self, textures, use_substance_style, texture_info=None):
+        """The stored state; modification times come from texture_info when the texture was probed."""
+        texture_info = texture_info or {}
+        return {
+            "renderer": self.renderer,
+            "options": self.material_options(use_substance_style),
+            "textures": {
+                texture_type: [file_path, _texture_mtime(file_path, texture_info.get(file_path))]
+                for texture_type, file_path in textures.items()
+            }
+        }
+
+    def _filter_textures(self, textures, enable_normal_displacement):
+        return {
+            texture_type: file_path for texture_type, file_path in textures.items()
+            if file_path and (enable_normal_displacement or texture_type not in ["Normal", "Displacement"])
+            and (self.displacement or texture_type != "Displacement")
+        }
+
+    def _probe(self, textures, texture_info):
+        if texture_info is not None:
+            return texture_info
+        return probe_textures(textures.values()) if self.probe_headers else {}
+
+    def _plan_texture(self, material, sg, texture_type, file_path, texture_info, normal_map_type, use_substance_style):
+        file_node = self._plan_file_node(texture_type, file_path, texture_info, use_substance_style)
+
+        first_node = self.graph.node_count()
+        self._connect_texture(material, file_node, texture_type, sg, normal_map_type, use_substance_style)
+        for node in self.graph.nodes_since(first_node):
+            self.graph.add_attr(node, TEXTURE_TYPE_ATTR)
+            self.graph.set_attr(f"{node}.{TEXTURE_TYPE_ATTR}", texture_type)
+
+    def _plan_file_node(self, texture_type, file_path, texture_info, use_substance_style):
+        settings = choose_file_settings(texture_type, texture_info.get(file_path), use_substance_style)
+        file_node, _ = self.file_node_cache.plan_file_node(
+            self.graph, f"{self.material_name}_{texture_type}", texture_type, file_path,
+            settings.color_space, settings.alpha_is_luminance)
+        self.scalar_outputs[file_node] = settings.scalar_output
+        return file_node
+
+    def _plan_file_node_swap(self, connections, new_file_node):
+        """
+        Move the given (file plug, destination plug) connections of one slot
+        onto new_file_node and its scalar output.
+        """
+        for source_plug, destination_plug in connections:
+            source_attr = source_plug.split(".", 1)[1]
+            if source_attr in ("outAlpha", "outColorR"):
+                new_source_plug = self.scalar_plug(new_file_node)
+            else:
+                new_source_plug = f"{new_file_node}.{source_attr}"
+            if new_source_plug != source_plug:
+                self.graph.connect_attr(new_source_plug, destination_plug, force=True)
+
+    def _remove_texture(self, utility_nodes, connections):
+        """Disconnect one slot's file nodes and delete its utilities; returns the file nodes."""
+        for source_plug, destination_plug in connections:
+            cmds.disconnectAttr(source_plug, destination_plug)
+        if utility_nodes:
+            cmds.delete(utility_nodes)
+        return list(dict.fromkeys(source_plug.split(".", 1)[0] for source_plug, _ in connections))
+
+    def _texture_network(self, material, sg, previous_template=None):
+        """
+        Return {texture type: (utility nodes, [(file plug, destination plug)])}
+        for the network of material. Utilities are made per material and tagged
+        with their slot. A file node can feed several slots and materials, so
+        its connections are sorted by destination: a tagged utility or a slot
+        plug of the shader or shading group, of this creator or of the
+        template the material was built with before.
+        """
+        roots = [material]
+        if self.displacement:
+            roots.extend(cmds.listConnections(f"{sg}.displacementShader", source=True, destination=False) or [])
+        utility_types = {}
+        file_nodes = []
+        for node in cmds.listHistory(roots, pruneDagObjects=True) or []:
+            if not cmds.attributeQuery(TEXTURE_TYPE_ATTR, node=node, exists=True):
+                continue
+            if cmds.nodeType(node) == "file":
+                file_nodes.append(node)
+            else:
+                utility_types[node] = cmds.getAttr(f"{node}.{TEXTURE_TYPE_ATTR}")
+
+        network = {}
+        for node, texture_type in utility_types.items():
+            network.setdefault(texture_type, ([], []))[0].append(node)
+        slot_types = self._slot_types(material, sg, previous_template) if file_nodes else {}
+        for file_node in file_nodes:
+            connections = cmds.listConnections(file_node, source=False, destination=True, plugs=True, connections=True) or []
+            for source_plug, destination_plug in zip(connections[::2], connections[1::2]):
+                texture_type = utility_types.get(destination_plug.split(".", 1)[0]) or slot_types.get(destination_plug)
+                if texture_type:
+                    network.setdefault(texture_type, ([], []))[1].append((source_plug, destination_plug))
+        return network
+
+    def _slot_types(self, material, sg, previous_template=None):
+        """
+        Return {plug: texture type} for the plugs of material and sg that a
+        file node connects to directly, by planning every slot into a scratch
+        graph.
+        """
+        graph, scalar_outputs = self.graph, self.scalar_outputs
+        self.graph, self.scalar_outputs = ShadingGraph(), {}
+        normal_map_type = getattr(self, "normal_map_type", None)
+        slot_types = {}
+        try:
+            for use_substance_style in (False, True):
+                for texture_type in TEXTURE_KEYWORDS:
+                    first_connection = self.graph.connection_count()
+                    self._connect_texture(material, "@file", texture_type, sg, normal_map_type, use_substance_style)
+                    if previous_template:
+                        options = {"use_substance_style": use_substance_style, "normal_map_type": normal_map_type}
+                        previous_template.plan_texture(self.graph, self.material_name, material, sg, "@file", texture_type, "@file.outAlpha", options)
+                    for source_plug, destination_plug in self.graph.connections_since(first_connection):
+                        if source_plug.startswith("@file.") and not destination_plug.startswith("@"):
+                            slot_types.setdefault(destination_plug, texture_type)
+        finally:
+            self.graph, self.scalar_outputs = graph, scalar_outputs
+        return slot_types
+
+    def scalar_plug(self, file_node):
+        return f"{file_node}.{self.scalar_outputs.get(file_node, 'outAlpha')}"
+
     def _connect_texture(self, material, file_node, texture_type, sg, normal_map_type=None, use_substance_style=False):
         raise NotImplementedError("Method must be implemented in subclass")
 
     def connect_displacement(self, file_node, sg):
-        disp_shader = cmds.shadingNode("displacementShader", asUtility=True, name=f"{self.material_name}_dispShader")
-        cmds.connectAttr(f"{file_node}.outAlpha", f"{disp_shader}.displacement")
-        cmds.connectAttr(f"{disp_shader}.displacement", f"{sg}.displacementShader")
+        disp_shader = self.graph.shading_node("displacementShader", "utility", f"{self.material_name}_dispShader")
+        self.graph.connect_attr(self.scalar_plug(file_node), f"{disp_shader}.displacement")
+        self.graph.connect_attr(f"{disp_shader}.displacement", f"{sg}.displacementShader")
 
 class ArnoldMaterialCreator(MaterialCreator):
+    renderer = "Arnold"
+    shader_type = "aiStandardSurface"
+
     def __init__(self, material_name, normal_map_type):
         super().__init__(material_name)
         self.normal_map_type = normal_map_type
 
-    def create_shader(self):
-        material = cmds.shadingNode("aiStandardSurface", asShader=True, name=self.material_name)
-        sg = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=f"{self.material_name}SG")
-        cmds.connectAttr(f"{material}.outColor", f"{sg}.surfaceShader")
-        return material, sg
+    def create_material_node(self):
+        return self.graph.shading_node(self.shader_type, "shader", self.material_name)
 
     def _connect_texture(self, material, file_node, texture_type, sg, normal_map_type, use_substance_style):
+        graph = self.graph
         if texture_type == "Base Color":
-            cmds.connectAttr(f"{file_node}.outColor", f"{material}.baseColor")
+            graph.connect_attr(f"{file_node}.outColor", f"{material}.baseColor")
         elif texture_type == "Roughness":
-            cmds.connectAttr(f"{file_node}.outAlpha", f"{material}.specularRoughness")
+            graph.connect_attr(self.scalar_plug(file_node), f"{material}.specularRoughness")
         elif texture_type == "Metalness":
-            cmds.connectAttr(f"{file_node}.outAlpha", f"{material}.metalness")
+            graph.connect_attr(self.scalar_plug(file_node), f"{material}.metalness")
         elif texture_type == "Specular":
-            cmds.connectAttr(f"{file_node}.outColor", f"{material}.specularColor")
+            graph.connect_attr(f"{file_node}.outColor", f"{material}.specularColor")
         elif texture_type == "Normal":
             if self.normal_map_type == "aiNormalMap":
-                normal_node = cmds.shadingNode("aiNormalMap", asUtility=True, name=f"{self.material_name}_aiNormalMap")
-                cmds.connectAttr(f"{file_node}.outColor", f"{normal_node}.input")
-                cmds.connectAttr(f"{normal_node}.outValue", f"{material}.normalCamera")
+                normal_node = graph.shading_node("aiNormalMap", "utility", f"{self.material_name}_aiNormalMap")
+                graph.connect_attr(f"{file_node}.outColor", f"{normal_node}.input")
+                graph.connect_attr(f"{normal_node}.outValue", f"{material}.normalCamera")
                 if use_substance_style:
-                    cmds.setAttr(f"{normal_node}.invertY", True)
+                    graph.set_attr(f"{normal_node}.invertY", True)
             else:
-                bump_node = cmds.shadingNode("bump2d", asUtility=True, name=f"{self.material_name}_bump2d")
-                cmds.setAttr(f"{bump_node}.bumpInterp", 0)
-                cmds.connectAttr(f"{file_node}.outAlpha", f"{bump_node}.bumpValue")
-                cmds.connectAttr(f"{bump_node}.outNormal", f"{material}.normalCamera")
+                bump_node = graph.shading_node("bump2d", "utility", f"{self.material_name}_bump2d")
+                graph.set_attr(f"{bump_node}.bumpInterp", 0)
+                graph.connect_attr(self.scalar_plug(file_node), f"{bump_node}.bumpValue")
+                graph.connect_attr(f"{bump_node}.outNormal", f"{material}.normalCamera")
                 if use_substance_style:
-                    cmds.setAttr(f"{bump_node}.flipY", True)
+                    graph.set_attr(f"{bump_node}.flipY", True)
         elif texture_type == "Displacement":
             self.connect_displacement(file_node, sg)
 
 class RedshiftMaterialCreator(MaterialCreator):
-    def create_shader(self):
-        material = cmds.shadingNode("RedshiftMaterial", asShader=True, name=self.material_name)
-        sg = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=f"{self.material_name}SG")
-        cmds.connectAttr(f"{material}.outColor", f"{sg}.surfaceShader")
-        return material, sg
+    renderer = "Redshift"
+    shader_type = "RedshiftMaterial"
+
+    def create_material_node(self):
+        return self.graph.shading_node(self.shader_type, "shader", self.material_name)
 
     def _connect_texture(self, material, file_node, texture_type, sg, normal_map_type, use_substance_style):
+        graph = self.graph
         if texture_type == "Base Color":
-            cmds.connectAttr(f"{file_node}.outColor", f"{material}.diffuse_color")
+            graph.connect_attr(f"{file_node}.outColor", f"{material}.diffuse_color")
         elif texture_type == "Roughness":
-            cmds.connectAttr(f"{file_node}.outAlpha", f"{material}.refl_roughness")
+            graph.connect_attr(self.scalar_plug(file_node), f"{material}.refl_roughness")
         elif texture_type == "Metalness":
-            cmds.setAttr(f"{material}.refl_fresnel_mode", 2)
-            cmds.connectAttr(f"{file_node}.outAlpha", f"{material}.refl_metalness")
+            graph.set_attr(f"{material}.refl_fresnel_mode", 2)
+            graph.connect_attr(self.scalar_plug(file_node), f"{material}.refl_metalness")
         elif texture_type == "Specular":
-            cmds.connectAttr(f"{file_node}.outColor", f"{material}.refl_color")
+            graph.connect_attr(f"{file_node}.outColor", f"{material}.refl_color")
         elif texture_type == "Normal":
             if use_substance_style:
-                normal_node = cmds.shadingNode("RedshiftNormalMap", asUtility=True, name=f"{self.material_name}_rsNormalMap")
-                cmds.setAttr(f"{normal_node}.flipY", True)
-                cmds.connectAttr(f"{file_node}.outColor", f"{normal_node}.input")
-                cmds.connectAttr(f"{normal_node}.out", f"{material}.bump_input")
+                normal_node = graph.shading_node("RedshiftNormalMap", "utility", f"{self.material_name}_rsNormalMap")
+                graph.set_attr(f"{normal_node}.flipY", True)
+                graph.connect_attr(f"{file_node}.outColor", f"{normal_node}.input")
+                graph.connect_attr(f"{normal_node}.out", f"{material}.bump_input")
             else:
-                bump_node = cmds.shadingNode("bump2d", asUtility=True, name=f"{self.material_name}_bump2d")
-                cmds.setAttr(f"{bump_node}.bumpInterp", 0)
-                cmds.connectAttr(f"{file_node}.outAlpha", f"{bump_node}.bumpValue")
-                cmds.connectAttr(f"{bump_node}.outNormal", f"{material}.bump_input")
-            cmds.setAttr(f"{material}.enableBumpMap", True)
+                bump_node = graph.shading_node("bump2d", "utility", f"{self.material_name}_bump2d")
+                graph.set_attr(f"{bump_node}.bumpInterp", 0)
+                graph.connect_attr(self.scalar_plug(file_node), f"{bump_node}.bumpValue")
+                graph.connect_attr(f"{bump_node}.outNormal", f"{material}.bump_input")
+            graph.set_attr(f"{material}.enableBumpMap", True)
+        elif texture_type == "Displacement" and self.displacement == "shared":
+            self.connect_displacement(file_node, sg)
         elif texture_type == "Displacement":
-            disp_node = cmds.shadingNode("RedshiftDisplacement", asUtility=True, name=f"{self.material_name}_rsDisplacement")
-            cmds.connectAttr(f"{file_node}.outAlpha", f"{disp_node}.texMap")
-            cmds.connectAttr(f"{disp_node}.out", f"{sg}.displacementShader")
+            disp_node = graph.shading_node("RedshiftDisplacement", "utility", f"{self.material_name}_rsDisplacement")
+            graph.connect_attr(self.scalar_plug(file_node), f"{disp_node}.texMap")
+            graph.connect_attr(f"{disp_node}.out", f"{sg}.displacementShader")
+
+class TemplateMaterialCreator(MaterialCreator):
+    def __init__(self, material_name, template, normal_map_type=None):
+        super().__init__(material_name)
+        self.template = template
+        self.renderer = template.renderer
+        self.template_name = template.name
+        self.shader_type = template.shader[0]
+        self.normal_map_type = normal_map_type
+
+    @property
+    def normal_map_dependent_types(self):
+        return self.template.dependent_types("normal_map_type")
+
+    def create_shader(self):
+        return self.template.plan_shader(self.graph, self.material_name)
+
+    def plan_shader_attributes(self, material):
+        self.template.plan_shader_attributes(self.graph, material)
+
+    def _connect_texture(self, material, file_node, texture_type, sg, normal_map_type, use_substance_style):
+        options = {"use_substance_style": bool(use_substance_style), "normal_map_type": self.normal_map_type}
+        self.template.plan_texture(
+            self.graph, self.material_name, material, sg, file_node, texture_type, self.scalar_plug(file_node), options)
+
+class MultiRendererMaterialCreator(MaterialCreator):
+    """
+    One shading group with a shader per renderer. The first renderer's shader
+    is the surfaceShader, the others are connected to their renderer's
+    shading group override (aiSurfaceShader, rsSurfaceShader), so every
+    renderer renders its own shader. Textures are probed once and all shaders
+    share the file nodes and a Maya displacementShader.
+    """
+
+    def __init__(self, material_name, renderers, normal_map_type=None):
+        super().__init__(material_name)
+        self.renderers = renderer_list(renderers)
+        self.renderer = self.renderers[0]
+        self.normal_map_type = normal_map_type if "Arnold" in self.renderers else None
+        self.creators = []
+        for renderer in self.renderers:
+            if renderer not in SG_SHADER_ATTRS:
+                raise ValueError(f"Renderer {renderer} is not supported.")
+            name = material_name if not self.creators else f"{material_name}_{RENDERER_SUFFIXES[renderer]}"
+            creator = MaterialFactory.create_material(renderer, name, normal_map_type)
+            creator.displacement = None if self.creators else "shared"
+            creator.material_index = None
+            self.creators.append(creator)
+
+    def create_shader(self):
+        return self._bind(self.creators[0]).create_shader()
+
+    def plan_network(self, material, sg, textures, texture_info, normal_map_type, use_substance_style):
+        primary = self._bind(self.creators[0])
+        primary.plan_network(material, sg, primary._filter_textures(textures, True), texture_info, normal_map_type, use_substance_style)
+        for creator in self.creators[1:]:
+            self.plan_override(creator, sg, textures, texture_info, normal_map_type, use_substance_style)
+
+    def plan_override(self, creator, sg, textures, texture_info, normal_map_type, use_substance_style):
+        """Plan the shader of creator's renderer behind its shading group override."""
+        self._bind(creator)
+        material = creator.create_material_node()
+        self.graph.connect_attr(f"{material}.outColor", f"{sg}.{SG_SHADER_ATTRS[creator.renderer]}")
+        creator.plan_network(material, sg, creator._filter_textures(textures, True), texture_info, normal_map_type, use_substance_style)
+        return material
+
+    def update_textures(self, material, sg, textures, use_substance_style, enable_normal_displacement, normal_map_type=None, texture_info=None):
+        """
+        Update the shader of every renderer on sg and add the shaders of
+        renderers it does not have yet.
+        """
+        materials = shading_group_materials(sg)
+        if not materials:
+            raise ValueError(f"Material {material} was not created by Lamp Material Setup.")
+
+        textures = self._filter_textures(textures, enable_normal_displacement)
+        texture_info = self._probe(textures, texture_info)
+        surface_material = (cmds.listConnections(f"{sg}.surfaceShader", source=True, destination=False) or [material])[0]
+
+        cmds.undoInfo(openChunk=True, chunkName=f"lampMaterialSetup_update_{surface_material}")
+        try:
+            missing = []
+            for creator in self.creators:
+                if creator.renderer in materials:
+                    creator.update_textures(materials[creator.renderer], sg, textures, use_substance_style, True, normal_map_type, texture_info)
+                else:
+                    missing.append(creator)
+
+            self.graph = ShadingGraph()
+            for creator in missing:
+                self.plan_override(creator, sg, textures, texture_info, normal_map_type, use_substance_style)
+            self._plan_content_hash(surface_material, self.content_hash(textures, use_substance_style))
+            self.graph.commit(chunk_name=f"lampMaterialSetup_update_{surface_material}")
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        return material, sg
+
+    def content_hash(self, textures, use_substance_style):
+        hashes = [creator.content_hash(creator._filter_textures(textures, True), use_substance_style) for creator in self.creators]
+        return _combined_hash(hashes)
+
+    def _bind(self, creator):
+        creator.graph = self.graph
+        creator.scalar_outputs = {}
+        return creator
 
 class MaterialFactory:
     @staticmethod
-    def create_material(renderer, material_name, normal_map_type=None):
+    def create_material(renderer, material_name, normal_map_type=None, template=None):
+        renderers = renderer_list(renderer)
+        if len(renderers) > 1:
+            if template:
+                raise ValueError("Material templates are made for one renderer and cannot be built for several.")
+            return MultiRendererMaterialCreator(material_name, renderers, normal_map_type)
+        renderer = renderers[0]
+        if template:
+            material_template = load_template(template)
+            if material_template.renderer != renderer:
+                raise ValueError(f"Material template '{material_template.name}' is made for {material_template.renderer}, not {renderer}.")
+            return TemplateMaterialCreator(material_name, material_template, normal_map_type)
         if renderer == "Arnold":
             return ArnoldMaterialCreator(material_name, normal_map_type)
         elif renderer == "Redshift":
@@ -135,301 +541,303 @@ class MaterialFactory:
         else:
             raise ValueError(f"Renderer {renderer} is not supported.")
 
-class MaterialCreatorUI(QtWidgets.QDialog):
-    TEXTURE_KEYWORDS = {
-        "Base Color": ["basecolor", "albedo", "diffuse"],
-        "Roughness": ["roughness", "rough"],
-        "Metalness": ["metalness", "metal"],
-        "Specular": ["specular"],
-        "Normal": ["normal", "nmap"],
-        "Displacement": ["displacement", "disp", "height"]
-    }
-
-    def __init__(self, parent=None):
-        super(MaterialCreatorUI, self).__init__(parent)
-        self.setWindowFlags(QtCore.Qt.Window)
-        self.setWindowTitle("Lamp Material Setup")
-        self.resize(400, 600)
-
-        self.textures = {key: None for key in self.TEXTURE_KEYWORDS.keys()}
-        self.use_substance_style = True
-        self.enable_normal_displacement = False
-        self.renderer = "Arnold"
-        self.project_dir = Path(cmds.workspace(q=True, rd=True))
-        self.texture_dir = self.project_dir / "textures"
-        self.last_texture_dir = None
-
-        self.init_ui()
-        self.update_object_name()
-        self.connect_selection_changed()
-
-    def init_ui(self):
-        main_layout = QtWidgets.QVBoxLayout(self)
-
-        menu_bar = QtWidgets.QMenuBar()
-        edit_menu = menu_bar.addMenu("Edit")
-        reset_action = QtWidgets.QAction("Reset Textures", self)
-        reset_action.triggered.connect(self.reset_fields)
-        edit_menu.addAction(reset_action)
-
-        default_action = QtWidgets.QAction("Default Settings", self)
-        default_action.triggered.connect(self.default_settings)
-        edit_menu.addAction(default_action)
-
-        help_menu = menu_bar.addMenu("Help")
-        about_action = QtWidgets.QAction("Docs", self)
-        about_action.triggered.connect(lambda: __import__('webbrowser').open("https://github.com/rabbitGraned/Lamp-Material-Setup/wiki"))
-        help_menu.addAction(about_action)
-
-        about_action = QtWidgets.QAction("About", self)
-        about_action.triggered.connect(lambda: __import__('webbrowser').open("https://github.com/rabbitGraned/Lamp-Material-Setup"))
-        help_menu.addAction(about_action)
-
-        help_menu.addSeparator()
-
-        version_action = QtWidgets.QAction(f"Tool Version {VERSION}", self)
-        version_action.setEnabled(False)
-        help_menu.addAction(version_action)
-
-        main_layout.addWidget(menu_bar)
-
-        renderer_layout = QtWidgets.QHBoxLayout()
-        renderer_label = QtWidgets.QLabel("Renderer:")
-        self.renderer_combo = QtWidgets.QComboBox()
-        self.renderer_combo.addItems(["Arnold", "Redshift"])
-        self.renderer_combo.setMaximumWidth(150)
-        self.renderer_combo.currentTextChanged.connect(self.update_renderer_and_material_info)
-        renderer_layout.addWidget(renderer_label)
-        renderer_layout.addWidget(self.renderer_combo)
-        renderer_layout.addStretch()
-        main_layout.addLayout(renderer_layout)
-
-        self.material_info_label = QtWidgets.QLabel("Material: aiStandardSurface")
-        main_layout.addWidget(self.material_info_label)
-
-        object_layout = QtWidgets.QHBoxLayout()
-        object_label = QtWidgets.QLabel("Object:") 
-        object_label.setFixedWidth(100)
-        self.object_name_field = QtWidgets.QLineEdit()
-        self.object_name_field.setReadOnly(True)
-        self.object_name_field.setMinimumWidth(250)
-        object_layout.addWidget(object_label)
-        object_layout.addSpacing(10)
-        object_layout.addWidget(self.object_name_field)
-        object_layout.addStretch()
-        main_layout.addLayout(object_layout)
-
-        textures_group = QtWidgets.QGroupBox("Textures")
-        textures_layout = QtWidgets.QVBoxLayout()
-
-        self.texture_widgets = {}
-        for texture_type in ["Base Color", "Metalness", "Roughness", "Specular"]:
-            texture_layout = QtWidgets.QHBoxLayout()
-            texture_label = QtWidgets.QLabel(f"{texture_type}:")
-            texture_label.setFixedWidth(100)
-            texture_field = QtWidgets.QLineEdit()
-            texture_field.setMinimumWidth(250) 
-            browse_button = QtWidgets.QPushButton("...")
-            browse_button.setMaximumWidth(30)
-            browse_button.clicked.connect(partial(self.browse_texture, texture_type))
-            texture_layout.addWidget(texture_label)
-            texture_layout.addWidget(texture_field)
-            texture_layout.addWidget(browse_button)
-            textures_layout.addLayout(texture_layout)
-            self.texture_widgets[texture_type] = texture_field
-            texture_field.textChanged.connect(partial(self.update_texture_dict, texture_type))
-
-        textures_group.setLayout(textures_layout)
-        main_layout.addWidget(textures_group)
-
-        self.normal_displacement_group = QtWidgets.QGroupBox("Displacement and Normal")
-        self.normal_displacement_layout = QtWidgets.QVBoxLayout()
-
-        normal_layout = QtWidgets.QHBoxLayout()
-        normal_label = QtWidgets.QLabel("Normal:")
-        normal_label.setFixedWidth(100)
-        self.normal_combo = QtWidgets.QComboBox()
-        self.normal_combo.addItems(["aiNormalMap", "bump2d"])
-        self.normal_combo.setMaximumWidth(100)
-        normal_layout.addWidget(normal_label)
-        normal_layout.addWidget(self.normal_combo)
-        normal_layout.addStretch()
-        self.normal_displacement_layout.addLayout(normal_layout)
-
-        normal_field_layout = QtWidgets.QHBoxLayout()
-        normal_field_label = QtWidgets.QLabel("")
-        normal_field_label.setFixedWidth(100)
-        self.normal_field = QtWidgets.QLineEdit()
-        normal_browse = QtWidgets.QPushButton("...")
-        normal_browse.setMaximumWidth(30)
-        normal_browse.clicked.connect(partial(self.browse_texture, "Normal"))
-        normal_field_layout.addWidget(normal_field_label)
-        normal_field_layout.addWidget(self.normal_field)
-        normal_field_layout.addWidget(normal_browse)
-        self.normal_displacement_layout.addLayout(normal_field_layout)
-        self.texture_widgets["Normal"] = self.normal_field
-        self.normal_field.textChanged.connect(partial(self.update_texture_dict, "Normal"))
-
-        displacement_layout = QtWidgets.QHBoxLayout()
-        displacement_label = QtWidgets.QLabel("Displacement:")
-        displacement_label.setFixedWidth(100)
-        self.displacement_field = QtWidgets.QLineEdit()
-        displacement_browse = QtWidgets.QPushButton("...")
-        displacement_browse.setMaximumWidth(30)
-        displacement_browse.clicked.connect(partial(self.browse_texture, "Displacement"))
-        displacement_layout.addWidget(displacement_label)
-        displacement_layout.addWidget(self.displacement_field)
-        displacement_layout.addWidget(displacement_browse)
-        self.normal_displacement_layout.addLayout(displacement_layout)
-        self.texture_widgets["Displacement"] = self.displacement_field
-        self.displacement_field.textChanged.connect(partial(self.update_texture_dict, "Displacement"))
-
-        self.normal_displacement_group.setLayout(self.normal_displacement_layout)
-        self.normal_displacement_group.setEnabled(False)
-        main_layout.addWidget(self.normal_displacement_group)
-
-        checkboxes_layout = QtWidgets.QHBoxLayout()
-        self.enable_normal_disp_checkbox = QtWidgets.QCheckBox("Enable Displacement && Normal")
-        self.enable_normal_disp_checkbox.setChecked(False)
-        self.enable_normal_disp_checkbox.stateChanged.connect(self.toggle_normal_displacement_block)
-
-        self.substance_checkbox = QtWidgets.QCheckBox("Use Substance style")
-        self.substance_checkbox.setChecked(True)
-        self.substance_checkbox.stateChanged.connect(self.toggle_substance_style)
-        self.substance_checkbox.setToolTip(
-            "Substance Painter Workflow:\n"
-            "- Enables the use of Substance-style texture mapping.\n"
-            "- Roughness and Metalness use Alpha Channels.\n"
-            "- Color Spaces are set to 'Raw' for relevant maps.")
-
-        checkboxes_layout.addWidget(self.enable_normal_disp_checkbox)
-        checkboxes_layout.addWidget(self.substance_checkbox)
-        main_layout.addLayout(checkboxes_layout)
-
-        main_layout.addStretch()
-
-        create_button = QtWidgets.QPushButton("Create Material")
-        create_button.clicked.connect(self.create_material)
-        main_layout.addWidget(create_button)
-
-    def update_object_name(self):
-        selection = cmds.ls(selection=True)
-        object_name = selection[0] if selection else "None"
-        self.object_name_field.setText(object_name)
-
-    def connect_selection_changed(self):
-        script_job_id = cmds.scriptJob(event=["SelectionChanged", self.update_object_name])
-        self.script_job_id = script_job_id
-
-    def closeEvent(self, event):
-        if hasattr(self, "script_job_id"):
-            cmds.scriptJob(kill=self.script_job_id, force=True)
-        super(MaterialCreatorUI, self).closeEvent(event)
-
-    def update_renderer_and_material_info(self, renderer):
+    @staticmethod
+    def create_updater(material, sg, renderer, normal_map_type=None, template=None):
+        """
+        Return the creator that updates material on sg. A shading group with
+        shaders for several renderers is updated for all of them, so the
+        shared file nodes stay in step; requested renderers it lacks are added.
+        Templates are made for one renderer, so a template is ignored for such
+        a shading group. Without a normal_map_type an Arnold shader keeps its
+        current one.
+        """
+        materials = shading_group_materials(sg)
+        renderers = list(dict.fromkeys(list(materials) + renderer_list(renderer)))
+        if template and len(renderers) > 1:
+            cmds.warning(f"Material templates are made for one renderer, {sg} is updated for {' and '.join(renderers)} without the template.")
+            template = None
+        if normal_map_type is None and "Arnold" in materials:
+            normal_map_type = read_material_state(materials["Arnold"])["options"].get("normal_map_type")
+        material_name = next(iter(materials.values()), material)
+        return MaterialFactory.create_material(renderers, material_name, normal_map_type, template)
+
+class MaterialBatchBuilder:
+    GEOMETRY_SUFFIXES = ("_geo", "_geometry", "_mesh")
+
+    def __init__(self, renderer, normal_map_type=None, use_substance_style=True, enable_normal_displacement=False, convert_textures=False, template=None, reuse_existing=True):
         self.renderer = renderer
-        material_type = "aiStandardSurface" if renderer == "Arnold" else "rsMaterial (Experimental)"
-        self.material_info_label.setText(f"Material: {material_type}")
-
-        if renderer == "Redshift":
-            self.normal_combo.setCurrentText("bump2d")
-            self.normal_combo.setEnabled(False)
-        else:
-            self.normal_combo.setEnabled(True)
-
-    def toggle_substance_style(self, state):
-        self.use_substance_style = bool(state)
-
-    def toggle_normal_displacement_block(self, state):
-        self.enable_normal_displacement = bool(state)
-        self.normal_displacement_group.setEnabled(state)
-
-    def update_texture_dict(self, texture_type, new_text):
-        self.textures[texture_type] = new_text.strip() or None
-
-    def reset_fields(self):
-        for texture_type, field in self.texture_widgets.items():
-            field.clear()
-            self.textures[texture_type] = None
-
-    def default_settings(self):
-        self.renderer_combo.setCurrentText("Arnold")
-        self.substance_checkbox.setChecked(True)
-        self.enable_normal_disp_checkbox.setChecked(False)
-        self.reset_fields()
-
-    def browse_texture(self, texture_type=None):
-        start_dir = self.last_texture_dir if self.last_texture_dir else (self.texture_dir if self.texture_dir.exists() else self.project_dir)
-        file_paths, _ = QtWidgets.QFileDialog.getOpenFileNames(
-            self, "Select Texture(s)", str(start_dir), "Image Files (*.jpg *.png *.exr *.hdr)"
-        )
-        if not file_paths:
+        self.normal_map_type = normal_map_type if "Arnold" in renderer_list(renderer) else None
+        self.template = template
+        self.use_substance_style = use_substance_style
+        self.enable_normal_displacement = enable_normal_displacement
+        self.convert_textures = convert_textures
+        self.reuse_existing = reuse_existing
+
+    def build_from_directory(self, root_dir, assign=True):
+        tile_sets = {}
+        texture_sets = collect_texture_sets(root_dir, tile_sets=tile_sets)
+        warn_missing_tiles(tile_sets)
+        return self.build(texture_sets, assign, tile_sets)
+
+    def build_from_manifest(self, manifest_path, assign=True):
+        return self.build(load_texture_manifest(manifest_path), assign)
+
+    def build(self, texture_sets, assign=True, tile_sets=None):
+        """
+        Build and assign a material per texture set. Tile sets are listed once
+        for the whole build; tile_sets ({token path: TileSet}) are known already.
+        """
+        with PROFILER.span("batch_build", renderer=self.renderer, assets=len(texture_sets)), tile_scan(tile_sets):
+            with PROFILER.span("index_scene_geometry"):
+                geometry = self.index_scene_geometry() if assign else {}
+            with PROFILER.span("probe"):
+                texture_info = probe_textures(
+                    file_path for textures in texture_sets.values() for file_path in textures.values())
+            graph = ShadingGraph()
+            results = []
+
+            with PROFILER.span("plan_textures", assets=len(texture_sets)):
+                for asset_name, textures in texture_sets.items():
+                    objects = geometry.get(split_asset_key(asset_name)[1].lower(), [])
+                    results.append(self.plan_asset(graph, asset_name, textures, objects, texture_info))
+
+            if cmds.about(batch=True):
+                # Only headless sessions load lampMSPlugin here; in the GUI it also opens a command port.
+                load_plugin()
+            cmds.refresh(suspend=True)
+            cmds.undoInfo(openChunk=True, chunkName="lampMaterialSetup_batch")
+            try:
+                graph.commit(chunk_name="lampMaterialSetup_batch")
+                with PROFILER.span("assign", assets=len(results)):
+                    for result in results:
+                        self.assign_result(graph, result)
+            finally:
+                cmds.undoInfo(closeChunk=True)
+                cmds.refresh(suspend=False)
+            if assign:
+                warn_unassigned(results)
+
+            if self.convert_textures:
+                # Only the textures wired into a material; filtered and failed assets are skipped.
+                file_paths = list(dict.fromkeys(
+                    file_path for result in results for file_path in result["textures"].values()))
+                with PROFILER.span("convert_textures", textures=len(file_paths)):
+                    convert_textures(self.renderer, file_paths, wait=cmds.about(batch=True))
+
+        return results
+
+    def plan_asset(self, graph, asset_name, textures, objects, texture_info=None):
+        result = {"asset": asset_name, "material": None, "sg": None, "objects": objects, "error": None, "reused": False, "textures": {}}
+        material_name = f"{asset_node_name(asset_name)}M"
+
+        try:
+            creator = MaterialFactory.create_material(self.renderer, material_name, self.normal_map_type, self.template)
+            creator.reuse_existing = self.reuse_existing
+            result["material"], result["sg"] = creator.plan_textures(
+                graph, textures, self.use_substance_style, self.enable_normal_displacement, self.normal_map_type, texture_info)
+            result["reused"] = creator.reused
+            result["textures"] = creator._filter_textures(textures, self.enable_normal_displacement)
+        except Exception as e:
+            result["error"] = str(e)
+            cmds.warning(f"Failed to build material for asset '{asset_name}': {e}")
+
+        return result
+
+    def assign_result(self, graph, result):
+        if result["error"]:
             return
 
-        if len(file_paths) == 1 and texture_type:
-            file_path = file_paths[0]
-            self.texture_widgets[texture_type].setText(file_path)
-            self.textures[texture_type] = file_path
-            self.last_texture_dir = Path(file_path).parent
-
-            matched_type = self.match_texture_type(Path(file_path).name.lower())
-            if matched_type and matched_type != texture_type:
-                cmds.warning(f"Selected texture '{file_path}' seems to be a {matched_type} map, but assigned to {texture_type}.")
-        else:
-            for file_path in file_paths:
-                base_name = Path(file_path).name.lower()
-                matched_type = self.match_texture_type(base_name)
-
-                if matched_type:
-                    if not self.enable_normal_displacement and matched_type in ["Normal", "Displacement"]:
-                        continue
-
-                    self.texture_widgets[matched_type].setText(file_path)
-                    self.textures[matched_type] = file_path
-                    self.last_texture_dir = Path(file_path).parent
+        result["material"] = graph.resolve(result["material"])
+        result["sg"] = graph.resolve(result["sg"])
+        if not result["objects"]:
+            return
 
-    def match_texture_type(self, file_name):
-        for texture_type, keywords in self.TEXTURE_KEYWORDS.items():
-            if any(keyword in file_name for keyword in keywords):
-                return texture_type
+        assignment = assign_material(result["objects"], result["sg"])
+        if assignment.failed:
+            result["error"] = f"Failed to assign material to {len(assignment.failed)} of {len(result['objects'])} objects."
+            warn_failures(assignment.failed)
+
+    def index_scene_geometry(self):
+        geometry = {}
+        shapes = cmds.ls(geometry=True, noIntermediate=True, long=True) or []
+        if not shapes:
+            return geometry
+
+        for transform in cmds.listRelatives(shapes, parent=True, fullPath=True) or []:
+            short_name = transform.rsplit("|", 1)[-1].rsplit(":", 1)[-1].lower()
+            for suffix in self.GEOMETRY_SUFFIXES:
+                if short_name.endswith(suffix):
+                    short_name = short_name[:-len(suffix)]
+                    break
+            geometry.setdefault(short_name, []).append(transform)
+        return geometry
+
+def read_material_state(material):
+    if not cmds.attributeQuery(MATERIAL_STATE_ATTR, node=material, exists=True):
+        return None
+    try:
+        return json.loads(cmds.getAttr(f"{material}.{MATERIAL_STATE_ATTR}") or "")
+    except ValueError:
         return None
 
-    def create_material(self):
-        selection = cmds.ls(selection=True)
-        material_name = f"{selection[0]}M" if selection else "newMaterial"
+def _load_previous_template(material, template_name):
+    if not template_name:
+        return None
+    try:
+        return load_template(template_name)
+    except (OSError, ValueError) as e:
+        cmds.warning(f"Material template '{template_name}' of {material} cannot be loaded, its attributes and connections are kept: {e}")
+        return None
 
-        filtered_textures = {
-            k: v for k, v in self.textures.items()
-            if self.enable_normal_displacement or k not in ["Normal", "Displacement"]
+def reset_shader_attributes(material, template):
+    """Set the shader attributes template sets on material back to their defaults."""
+    for attribute, value, attr_type in template.shader[2]:
+        plug = f"{material}.{attribute}"
+        if attr_type == "string":
+            cmds.setAttr(plug, "", type="string")
+            continue
+        defaults = cmds.attributeQuery(attribute, node=material, listDefault=True) or []
+        if len(defaults) == 1:
+            cmds.setAttr(plug, defaults[0])
+
+def renderer_list(renderer):
+    """Accept one renderer name or a sequence of them and return a list without duplicates."""
+    return [renderer] if isinstance(renderer, str) else list(dict.fromkeys(renderer))
+
+def shading_group_materials(sg):
+    """Return {renderer: material} for the Lamp materials on sg, the surfaceShader first."""
+    materials = {}
+    for attr in ("surfaceShader",) + tuple(SG_SHADER_ATTRS.values()):
+        if not cmds.attributeQuery(attr, node=sg, exists=True):
+            continue
+        for material in cmds.listConnections(f"{sg}.{attr}", source=True, destination=False) or []:
+            state = read_material_state(material)
+            if state:
+                materials.setdefault(state["renderer"], material)
+    return materials
+
+def shading_group_content_hash(sg):
+    """
+    Recompute the content hash of the Lamp material on sg from the stored
+    states of its shaders, the surfaceShader first as in a build.
+    """
+    hashes = [
+        _content_hash(state["renderer"], state["options"], {texture_type: texture[0] for texture_type, texture in state["textures"].items()})
+        for state in map(read_material_state, shading_group_materials(sg).values())
+    ]
+    if not hashes:
+        return None
+    return hashes[0] if len(hashes) == 1 else _combined_hash(hashes)
+
+def _content_hash(renderer, options, textures):
+    content = {
+        "renderer": renderer,
+        "options": options,
+        "textures": {
+            texture_type: os.path.normcase(os.path.normpath(file_path))
+            for texture_type, file_path in textures.items()
         }
+    }
+    return hashlib.sha1(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _combined_hash(hashes):
+    return hashlib.sha1(" ".join(hashes).encode("utf-8")).hexdigest()
+
+def find_lamp_material(objects, renderer=None):
+    shapes = cmds.ls(cmds.ls(objects, objectsOnly=True), dag=True, shapes=True, noIntermediate=True, long=True) or []
+    if not shapes:
+        return None, None
+
+    renderers = None if renderer is None else renderer_list(renderer)
+    for sg in dict.fromkeys(cmds.listConnections(shapes, type="shadingEngine") or []):
+        for material_renderer, material in shading_group_materials(sg).items():
+            if renderers is None or material_renderer in renderers:
+                return material, sg
+    return None, None
+
+def delete_if_unused(node):
+    if not cmds.objExists(node):
+        return False
+    destinations = set(cmds.listConnections(node, source=False, destination=True) or [])
+    if destinations and destinations.difference(cmds.ls(list(destinations), type=("defaultTextureList", "materialInfo")) or []):
+        return False
+    cmds.delete(node)
+    return True
+
+def _texture_mtime(file_path, info):
+    return info.mtime if info is not None else _modification_time(file_path)
+
+def _modification_time(file_path):
+    try:
+        return max(os.path.getmtime(tile) for tile in tile_files(file_path))
+    except (OSError, ValueError):
+        return None
 
-        normal_map_type = self.normal_combo.currentText() if self.renderer == "Arnold" else None
-        creator = MaterialFactory.create_material(self.renderer, material_name, normal_map_type)
-        material, sg = creator.connect_textures(filtered_textures, self.use_substance_style, self.enable_normal_displacement, normal_map_type)
+def warn_missing_tiles(tile_sets):
+    for pattern, tile_set in tile_sets.items():
+        if tile_set.missing:
+            cmds.warning(f"Texture set '{pattern}' is missing tiles: {', '.join(tile_set.missing)}")
+
+def warn_unassigned(results, limit=MAX_REPORTED_FAILURES):
+    unassigned = [result for result in results if not result["error"] and not result["objects"]]
+    for result in unassigned[:limit]:
+        cmds.warning(f"No geometry matches asset '{result['asset']}', {result['material']} was not assigned.")
+    if len(unassigned) > limit:
+        cmds.warning(f"{len(unassigned) - limit} more materials were not assigned.")
+
+def warn_failed_conversions(results):
+    for result in results:
+        if result.status == "failed":
+            cmds.warning(f"Failed to convert texture '{result.source}': {result.error}")
+
+def rewire_converted_textures(results):
+    nodes_by_source = FILE_NODE_CACHE.nodes_by_source()
+    rewired = []
+
+    warn_failed_conversions(results)
+    cmds.undoInfo(openChunk=True, chunkName="lampMaterialSetup_rewire")
+    try:
+        for result in results:
+            if result.status == "failed":
+                continue
+            for file_node in nodes_by_source.get(FILE_NODE_CACHE.make_key(result.source)[0], []):
+                if cmds.objExists(file_node) and cmds.getAttr(f"{file_node}.fileTextureName") != result.output:
+                    cmds.setAttr(f"{file_node}.fileTextureName", result.output, type="string")
+                    rewired.append(file_node)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return rewired
+
+def convert_textures(renderer, file_paths, wait=False):
+    """
+    Convert file_paths and point the file nodes at the converted files. For
+    several renderers the file nodes are shared and keep their source paths;
+    every renderer's converted file is written next to the source, where
+    Arnold and Redshift pick it up on their own. With wait, returns the
+    rewired file nodes, otherwise the conversion threads.
+    """
+    renderers = renderer_list(renderer)
+    if len(renderers) > 1:
+        threads = [_convert_textures(renderer, file_paths, wait, warn_failed_conversions) for renderer in renderers]
+        return [] if wait else threads
+    return _convert_textures(renderers[0], file_paths, wait, rewire_converted_textures)
+
+def _convert_textures(renderer, file_paths, wait, on_results):
+    converter = TextureConverter(renderer)
+    if wait:
+        return on_results(converter.convert(file_paths))
+    return converter.convert_async(file_paths, lambda results: maya.utils.executeDeferred(on_results, results))
 
-        if selection:
-            try:
-                cmds.sets(selection, edit=True, forceElement=sg)
-            except Exception as e:
-                cmds.warning(f"Failed to assign material to selected objects: {e}")
-        else:
-            cmds.warning("No geometry selected. Material created but not assigned.")
+def show_ui():
+    import lampMaterialSetupUI
+    return lampMaterialSetupUI.show_ui()
 
-def get_maya_main_window():
-    main_window_ptr = omui.MQtUtil.mainWindow()
-    return wrapInstance(int(main_window_ptr), QtWidgets.QMainWindow)
+def __getattr__(name):
+    if name in _UI_NAMES:
+        import lampMaterialSetupUI
+        return getattr(lampMaterialSetupUI, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def show_ui():
-    try:
-        global material_creator_ui
-        if material_creator_ui and material_creator_ui.isVisible():
-            material_creator_ui.close()
-            material_creator_ui.deleteLater()
-    except NameError:
-        pass
-
-    parent = get_maya_main_window()
-    material_creator_ui = MaterialCreatorUI(parent)
-    material_creator_ui.show()
-
-show_ui()
+if __name__ == "__main__":
+    show_ui()
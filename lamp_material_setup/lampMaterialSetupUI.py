@@ -0,0 +1,532 @@
+"""
+lampMaterialSetupUI
+Lamp Material Setup (dialog)
+
+Description:
+The Lamp Material Setup dialog. Imported on the first show_ui() call, so
+Qt is only loaded when the dialog is actually used.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+from PySide2 import QtWidgets, QtCore
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+from pathlib import Path
+from functools import partial
+from shiboken2 import wrapInstance
+import maya.OpenMayaUI as omui
+
+from lampAssignment import MAX_REPORTED_FAILURES, assign_material, material_name_for, members_outside, warn_failures
+from lampMaterialSetup import VERSION, MaterialFactory, convert_textures, find_lamp_material, warn_missing_tiles
+from lampMaterialTemplates import available_templates, load_template
+from lampProfiler import PROFILER
+from lampTextureAudit import SOURCE_VARIANT, RepathRule, TextureAudit, repath_textures
+from lampTextureBrowser import TextureBrowserDialog
+from lampTextureClassifier import DEFAULT_CLASSIFIER, TEXTURE_KEYWORDS
+from lampTextureSets import resolve_tile_sets
+
+SELECTION_UPDATE_DELAY_MS = 50
+RENDERER_MODES = {
+    "Arnold": ("Arnold",),
+    "Redshift": ("Redshift",),
+    "Arnold + Redshift": ("Arnold", "Redshift")
+}
+MATERIAL_TYPES = {"Arnold": "aiStandardSurface", "Redshift": "rsMaterial (Experimental)"}
+
+class MaterialCreatorUI(QtWidgets.QDialog):
+    TEXTURE_KEYWORDS = TEXTURE_KEYWORDS
+
+    def __init__(self, parent=None):
+        super(MaterialCreatorUI, self).__init__(parent)
+        self.setWindowFlags(QtCore.Qt.Window)
+        self.setWindowTitle("Lamp Material Setup")
+        self.resize(400, 600)
+
+        self.textures = {key: None for key in self.TEXTURE_KEYWORDS.keys()}
+        self.use_substance_style = True
+        self.enable_normal_displacement = False
+        self.convert_textures = False
+        self.update_existing = True
+        self.reuse_identical = True
+        self.renderer = "Arnold"
+        self.renderers = RENDERER_MODES[self.renderer]
+        self.project_dir = Path(cmds.workspace(q=True, rd=True))
+        self.texture_dir = self.project_dir / "textures"
+        self.last_texture_dir = None
+        self.selection_callback_id = None
+
+        self.selection_timer = QtCore.QTimer(self)
+        self.selection_timer.setSingleShot(True)
+        self.selection_timer.setInterval(SELECTION_UPDATE_DELAY_MS)
+        self.selection_timer.timeout.connect(self.update_object_name)
+
+        self.init_ui()
+        self.update_object_name()
+        self.connect_selection_changed()
+
+    def init_ui(self):
+        main_layout = QtWidgets.QVBoxLayout(self)
+
+        menu_bar = QtWidgets.QMenuBar()
+        edit_menu = menu_bar.addMenu("Edit")
+        reset_action = QtWidgets.QAction("Reset Textures", self)
+        reset_action.triggered.connect(self.reset_fields)
+        edit_menu.addAction(reset_action)
+
+        default_action = QtWidgets.QAction("Default Settings", self)
+        default_action.triggered.connect(self.default_settings)
+        edit_menu.addAction(default_action)
+
+        edit_menu.addSeparator()
+
+        self.profile_action = QtWidgets.QAction("Profile Builds", self)
+        self.profile_action.setCheckable(True)
+        self.profile_action.setChecked(PROFILER.enabled)
+        self.profile_action.toggled.connect(self.toggle_profiling)
+        edit_menu.addAction(self.profile_action)
+
+        export_profile_action = QtWidgets.QAction("Export Profile...", self)
+        export_profile_action.triggered.connect(self.export_profile)
+        edit_menu.addAction(export_profile_action)
+
+        edit_menu.addSeparator()
+
+        texture_menu = edit_menu.addMenu("Texture Paths")
+        check_paths_action = QtWidgets.QAction("Check Texture Paths", self)
+        check_paths_action.triggered.connect(self.check_texture_paths)
+        texture_menu.addAction(check_paths_action)
+
+        repath_action = QtWidgets.QAction("Repath Textures...", self)
+        repath_action.triggered.connect(self.repath_texture_paths)
+        texture_menu.addAction(repath_action)
+
+        converted_action = QtWidgets.QAction("Use Converted Textures", self)
+        converted_action.triggered.connect(lambda: self.switch_texture_variant(self.renderers[0]))
+        texture_menu.addAction(converted_action)
+
+        source_action = QtWidgets.QAction("Use Source Textures", self)
+        source_action.triggered.connect(lambda: self.switch_texture_variant(SOURCE_VARIANT))
+        texture_menu.addAction(source_action)
+
+        help_menu = menu_bar.addMenu("Help")
+        about_action = QtWidgets.QAction("Docs", self)
+        about_action.triggered.connect(lambda: __import__('webbrowser').open("https://github.com/rabbitGraned/Lamp-Material-Setup/wiki"))
+        help_menu.addAction(about_action)
+
+        about_action = QtWidgets.QAction("About", self)
+        about_action.triggered.connect(lambda: __import__('webbrowser').open("https://github.com/rabbitGraned/Lamp-Material-Setup"))
+        help_menu.addAction(about_action)
+
+        help_menu.addSeparator()
+
+        version_action = QtWidgets.QAction(f"Tool Version {VERSION}", self)
+        version_action.setEnabled(False)
+        help_menu.addAction(version_action)
+
+        main_layout.addWidget(menu_bar)
+
+        renderer_layout = QtWidgets.QHBoxLayout()
+        renderer_label = QtWidgets.QLabel("Renderer:")
+        self.renderer_combo = QtWidgets.QComboBox()
+        self.renderer_combo.addItems(list(RENDERER_MODES))
+        self.renderer_combo.setMaximumWidth(150)
+        self.renderer_combo.setToolTip(
+            "Renderer:\n"
+            "- Arnold + Redshift builds both shaders in one shading group; they share the file nodes.\n"
+            "- Redshift renders its shader through the shading group's Redshift override.")
+        self.renderer_combo.currentTextChanged.connect(self.update_renderer_and_material_info)
+        template_label = QtWidgets.QLabel("Template:")
+        self.template_combo = QtWidgets.QComboBox()
+        self.template_combo.setMinimumWidth(150)
+        self.template_combo.setToolTip(
+            "Material Template:\n"
+            "- Built-in uses the default network of the selected renderer.\n"
+            "- Other entries are JSON/YAML templates from LAMP_MATERIAL_TEMPLATE_PATH and the templates folder.")
+        self.update_template_list()
+
+        renderer_layout.addWidget(renderer_label)
+        renderer_layout.addWidget(self.renderer_combo)
+        renderer_layout.addSpacing(10)
+        renderer_layout.addWidget(template_label)
+        renderer_layout.addWidget(self.template_combo)
+        renderer_layout.addStretch()
+        main_layout.addLayout(renderer_layout)
+
+        self.material_info_label = QtWidgets.QLabel("Material: aiStandardSurface")
+        main_layout.addWidget(self.material_info_label)
+
+        object_layout = QtWidgets.QHBoxLayout()
+        object_label = QtWidgets.QLabel("Object:") 
+        object_label.setFixedWidth(100)
+        self.object_name_field = QtWidgets.QLineEdit()
+        self.object_name_field.setReadOnly(True)
+        self.object_name_field.setMinimumWidth(250)
+        object_layout.addWidget(object_label)
+        object_layout.addSpacing(10)
+        object_layout.addWidget(self.object_name_field)
+        object_layout.addStretch()
+        main_layout.addLayout(object_layout)
+
+        textures_group = QtWidgets.QGroupBox("Textures")
+        textures_layout = QtWidgets.QVBoxLayout()
+
+        self.texture_widgets = {}
+        for texture_type in ["Base Color", "Metalness", "Roughness", "Specular"]:
+            texture_layout = QtWidgets.QHBoxLayout()
+            texture_label = QtWidgets.QLabel(f"{texture_type}:")
+            texture_label.setFixedWidth(100)
+            texture_field = QtWidgets.QLineEdit()
+            texture_field.setMinimumWidth(250) 
+            browse_button = QtWidgets.QPushButton("...")
+            browse_button.setMaximumWidth(30)
+            browse_button.clicked.connect(partial(self.browse_texture, texture_type))
+            texture_layout.addWidget(texture_label)
+            texture_layout.addWidget(texture_field)
+            texture_layout.addWidget(browse_button)
+            textures_layout.addLayout(texture_layout)
+            self.texture_widgets[texture_type] = texture_field
+            texture_field.textChanged.connect(partial(self.update_texture_dict, texture_type))
+
+        textures_group.setLayout(textures_layout)
+        main_layout.addWidget(textures_group)
+
+        self.normal_displacement_group = QtWidgets.QGroupBox("Displacement and Normal")
+        self.normal_displacement_layout = QtWidgets.QVBoxLayout()
+
+        normal_layout = QtWidgets.QHBoxLayout()
+        normal_label = QtWidgets.QLabel("Normal:")
+        normal_label.setFixedWidth(100)
+        self.normal_combo = QtWidgets.QComboBox()
+        self.normal_combo.addItems(["aiNormalMap", "bump2d"])
+        self.normal_combo.setMaximumWidth(100)
+        normal_layout.addWidget(normal_label)
+        normal_layout.addWidget(self.normal_combo)
+        normal_layout.addStretch()
+        self.normal_displacement_layout.addLayout(normal_layout)
+
+        normal_field_layout = QtWidgets.QHBoxLayout()
+        normal_field_label = QtWidgets.QLabel("")
+        normal_field_label.setFixedWidth(100)
+        self.normal_field = QtWidgets.QLineEdit()
+        normal_browse = QtWidgets.QPushButton("...")
+        normal_browse.setMaximumWidth(30)
+        normal_browse.clicked.connect(partial(self.browse_texture, "Normal"))
+        normal_field_layout.addWidget(normal_field_label)
+        normal_field_layout.addWidget(self.normal_field)
+        normal_field_layout.addWidget(normal_browse)
+        self.normal_displacement_layout.addLayout(normal_field_layout)
+        self.texture_widgets["Normal"] = self.normal_field
+        self.normal_field.textChanged.connect(partial(self.update_texture_dict, "Normal"))
+
+        displacement_layout = QtWidgets.QHBoxLayout()
+        displacement_label = QtWidgets.QLabel("Displacement:")
+        displacement_label.setFixedWidth(100)
+        self.displacement_field = QtWidgets.QLineEdit()
+        displacement_browse = QtWidgets.QPushButton("...")
+        displacement_browse.setMaximumWidth(30)
+        displacement_browse.clicked.connect(partial(self.browse_texture, "Displacement"))
+        displacement_layout.addWidget(displacement_label)
+        displacement_layout.addWidget(self.displacement_field)
+        displacement_layout.addWidget(displacement_browse)
+        self.normal_displacement_layout.addLayout(displacement_layout)
+        self.texture_widgets["Displacement"] = self.displacement_field
+        self.displacement_field.textChanged.connect(partial(self.update_texture_dict, "Displacement"))
+
+        self.normal_displacement_group.setLayout(self.normal_displacement_layout)
+        self.normal_displacement_group.setEnabled(False)
+        main_layout.addWidget(self.normal_displacement_group)
+
+        checkboxes_layout = QtWidgets.QHBoxLayout()
+        self.enable_normal_disp_checkbox = QtWidgets.QCheckBox("Enable Displacement && Normal")
+        self.enable_normal_disp_checkbox.setChecked(False)
+        self.enable_normal_disp_checkbox.stateChanged.connect(self.toggle_normal_displacement_block)
+
+        self.substance_checkbox = QtWidgets.QCheckBox("Use Substance style")
+        self.substance_checkbox.setChecked(True)
+        self.substance_checkbox.stateChanged.connect(self.toggle_substance_style)
+        self.substance_checkbox.setToolTip(
+            "Substance Painter Workflow:\n"
+            "- Enables the use of Substance-style texture mapping.\n"
+            "- Roughness and Metalness use Alpha Channels.\n"
+            "- Color Spaces are set to 'Raw' for relevant maps.")
+
+        self.convert_checkbox = QtWidgets.QCheckBox("Convert textures")
+        self.convert_checkbox.setChecked(False)
+        self.convert_checkbox.stateChanged.connect(self.toggle_convert_textures)
+        self.convert_checkbox.setToolTip(
+            "Texture Conversion:\n"
+            "- Converts textures to .tx (Arnold) or .rstexbin (Redshift) in the background.\n"
+            "- Textures that are already converted and up to date are skipped.\n"
+            "- File nodes are switched to the converted textures when conversion finishes.\n"
+            "- With Arnold + Redshift both are converted and file nodes keep the source textures.")
+
+        self.update_checkbox = QtWidgets.QCheckBox("Update existing material")
+        self.update_checkbox.setChecked(True)
+        self.update_checkbox.stateChanged.connect(self.toggle_update_existing)
+        self.update_checkbox.setToolTip(
+            "Update Mode:\n"
+            "- If the selected object already has a material created by this tool, it is updated in place.\n"
+            "- Only changed textures and options are rewired; unchanged nodes are kept.\n"
+            "- Nodes that are no longer used are deleted.")
+
+        self.reuse_checkbox = QtWidgets.QCheckBox("Reuse identical material")
+        self.reuse_checkbox.setChecked(True)
+        self.reuse_checkbox.stateChanged.connect(self.toggle_reuse_identical)
+        self.reuse_checkbox.setToolTip(
+            "Reuse Mode:\n"
+            "- If the scene already has a material built from the same renderer, template, options and textures,\n"
+            "  that material is assigned instead of creating a duplicate network.")
+
+        checkboxes_layout.addWidget(self.enable_normal_disp_checkbox)
+        checkboxes_layout.addWidget(self.substance_checkbox)
+        checkboxes_layout.addWidget(self.convert_checkbox)
+        main_layout.addLayout(checkboxes_layout)
+        main_layout.addWidget(self.update_checkbox)
+        main_layout.addWidget(self.reuse_checkbox)
+
+        main_layout.addStretch()
+
+        create_button = QtWidgets.QPushButton("Create Material")
+        create_button.clicked.connect(self.create_material)
+        main_layout.addWidget(create_button)
+
+    def update_object_name(self):
+        selection = om2.MGlobal.getActiveSelectionList()
+        count = selection.length()
+        if count == 0:
+            object_name = "None"
+        else:
+            object_name = selection.getSelectionStrings(0)[0]
+            if count > 1:
+                object_name = f"{object_name} (+{count - 1} more)"
+        self.object_name_field.setText(object_name)
+
+    def schedule_object_name_update(self, *args):
+        # Restarting the single-shot timer on every event reads the selection once a burst settles.
+        self.selection_timer.start()
+
+    def connect_selection_changed(self):
+        self.selection_callback_id = om2.MModelMessage.addCallback(
+            om2.MModelMessage.kActiveListModified, self.schedule_object_name_update)
+
+    def disconnect_selection_changed(self):
+        if self.selection_callback_id is not None:
+            om2.MMessage.removeCallback(self.selection_callback_id)
+            self.selection_callback_id = None
+        self.selection_timer.stop()
+
+    def closeEvent(self, event):
+        self.disconnect_selection_changed()
+        super(MaterialCreatorUI, self).closeEvent(event)
+
+    def update_renderer_and_material_info(self, renderer):
+        self.renderer = renderer
+        self.renderers = RENDERER_MODES[renderer]
+        material_type = " + ".join(MATERIAL_TYPES[name] for name in self.renderers)
+        self.material_info_label.setText(f"Material: {material_type}")
+
+        if "Arnold" not in self.renderers:
+            self.normal_combo.setCurrentText("bump2d")
+            self.normal_combo.setEnabled(False)
+        else:
+            self.normal_combo.setEnabled(True)
+        self.update_template_list()
+
+    def update_template_list(self):
+        self.template_combo.clear()
+        self.template_combo.addItem("Built-in", None)
+        for name, path in available_templates().items():
+            try:
+                template = load_template(path)
+            except (OSError, ValueError) as e:
+                cmds.warning(f"Skipping material template {path}: {e}")
+                continue
+            if template.renderer == self.renderer:
+                self.template_combo.addItem(name, path)
+
+    def toggle_substance_style(self, state):
+        self.use_substance_style = bool(state)
+
+    def toggle_update_existing(self, state):
+        self.update_existing = bool(state)
+
+    def toggle_reuse_identical(self, state):
+        self.reuse_identical = bool(state)
+
+    def toggle_convert_textures(self, state):
+        self.convert_textures = bool(state)
+
+    def toggle_normal_displacement_block(self, state):
+        self.enable_normal_displacement = bool(state)
+        self.normal_displacement_group.setEnabled(state)
+
+    def update_texture_dict(self, texture_type, new_text):
+        self.textures[texture_type] = new_text.strip() or None
+
+    def reset_fields(self):
+        for texture_type, field in self.texture_widgets.items():
+            field.clear()
+            self.textures[texture_type] = None
+
+    def default_settings(self):
+        self.renderer_combo.setCurrentText("Arnold")
+        self.template_combo.setCurrentIndex(0)
+        self.substance_checkbox.setChecked(True)
+        self.enable_normal_disp_checkbox.setChecked(False)
+        self.convert_checkbox.setChecked(False)
+        self.update_checkbox.setChecked(True)
+        self.reuse_checkbox.setChecked(True)
+        self.reset_fields()
+
+    def browse_texture(self, texture_type=None):
+        start_dir = self.last_texture_dir if self.last_texture_dir else (self.texture_dir if self.texture_dir.exists() else self.project_dir)
+        browser = TextureBrowserDialog(str(start_dir), texture_type, self)
+        accepted = browser.exec_() == QtWidgets.QDialog.Accepted
+        self.last_texture_dir = Path(browser.root_dir)
+        file_paths = browser.selected_files() if accepted else []
+        browser.deleteLater()
+        if not file_paths:
+            return
+
+        file_paths, tile_sets = resolve_tile_sets(file_paths)
+        warn_missing_tiles(tile_sets)
+
+        if len(file_paths) == 1 and texture_type:
+            file_path = file_paths[0]
+            self.texture_widgets[texture_type].setText(file_path)
+            self.textures[texture_type] = file_path
+
+            matched_type = self.match_texture_type(Path(file_path).name)
+            if matched_type and matched_type != texture_type:
+                cmds.warning(f"Selected texture '{file_path}' seems to be a {matched_type} map, but assigned to {texture_type}.")
+        else:
+            for file_path, classification in zip(file_paths, DEFAULT_CLASSIFIER.classify_many(file_paths)):
+                matched_type = classification.texture_type
+
+                if matched_type:
+                    if not self.enable_normal_displacement and matched_type in ["Normal", "Displacement"]:
+                        continue
+
+                    self.texture_widgets[matched_type].setText(file_path)
+                    self.textures[matched_type] = file_path
+
+    def match_texture_type(self, file_name):
+        return DEFAULT_CLASSIFIER.classify(file_name).texture_type
+
+    def toggle_profiling(self, enabled):
+        if enabled:
+            PROFILER.enable()
+        else:
+            PROFILER.disable()
+
+    def export_profile(self):
+        if not PROFILER.records:
+            cmds.warning("No profile recorded. Enable Edit > Profile Builds and create a material first.")
+            return
+        file_path, _ = QtWidgets.QFileDialog.getSaveFileName(
+            self, "Export Profile", "lampProfile.json", "Chrome Trace (*.json)")
+        if file_path:
+            PROFILER.export_chrome_trace(file_path)
+            om2.MGlobal.displayInfo(f"Lamp Material Setup profile written to {file_path}")
+
+    def check_texture_paths(self):
+        entries = TextureAudit().scan()
+        missing = [entry for entry in entries if not entry.status.exists]
+        for entry in missing[:MAX_REPORTED_FAILURES]:
+            cmds.warning(f"Missing texture on '{entry.node}': {entry.path}")
+        om2.MGlobal.displayInfo(f"Lamp Material Setup: {len(missing)} of {len(entries)} file nodes read missing textures.")
+
+    def repath_texture_paths(self):
+        old_path, accepted = QtWidgets.QInputDialog.getText(self, "Repath Textures", "Replace the path prefix:")
+        if not accepted or not old_path:
+            return
+        new_path, accepted = QtWidgets.QInputDialog.getText(self, "Repath Textures", f"Replace '{old_path}' with:")
+        if accepted:
+            self.apply_texture_paths([RepathRule(old_path, new_path)], None)
+
+    def switch_texture_variant(self, variant):
+        if variant != SOURCE_VARIANT and len(self.renderers) > 1:
+            cmds.warning("File nodes are shared by several renderers; each renderer finds its converted textures next to the sources.")
+            return
+        self.apply_texture_paths((), variant)
+
+    def apply_texture_paths(self, rules, variant):
+        changes, skipped, missing = repath_textures(rules, variant)
+        if skipped:
+            cmds.warning(f"{len(skipped)} file nodes were left unchanged because their new texture does not exist.")
+        om2.MGlobal.displayInfo(f"Lamp Material Setup: changed {len(changes)} file nodes, {len(missing)} other file nodes read missing textures.")
+
+    def create_material(self):
+        selection = cmds.ls(selection=True)
+        material_name = material_name_for(selection)
+
+        filtered_textures = {
+            k: v for k, v in self.textures.items()
+            if self.enable_normal_displacement or k not in ["Normal", "Displacement"]
+        }
+
+        normal_map_type = self.normal_combo.currentText() if "Arnold" in self.renderers else None
+        template = self.template_combo.currentData()
+        with PROFILER.span("ui.create_material", renderer=self.renderer, objects=len(selection)):
+            # One undo step for the material and its assignment; assign_material's own chunk nests in it.
+            cmds.undoInfo(openChunk=True, chunkName="lampMaterialSetup_create")
+            try:
+                material, sg = find_lamp_material(selection, self.renderers) if self.update_existing and selection else (None, None)
+                if material:
+                    # A reused material is shared; updating it in place would change the other objects too.
+                    others = members_outside(sg, selection)
+                    if others:
+                        om2.MGlobal.displayInfo(f"Lamp Material Setup: {material} is also assigned to {len(others)} objects outside the selection, creating a new material for the selection.")
+                        material = None
+                if material:
+                    try:
+                        creator = MaterialFactory.create_updater(material, sg, self.renderers, normal_map_type, template)
+                        creator.update_textures(material, sg, filtered_textures, self.use_substance_style, self.enable_normal_displacement, normal_map_type)
+                    except ValueError as e:
+                        cmds.warning(f"Cannot update {material}, creating a new material for the selection: {e}")
+                        material = None
+                if not material:
+                    creator = MaterialFactory.create_material(self.renderers, material_name, normal_map_type, template)
+                    creator.reuse_existing = self.reuse_identical
+                    material, sg = creator.connect_textures(filtered_textures, self.use_substance_style, self.enable_normal_displacement, normal_map_type)
+                    if creator.reused:
+                        om2.MGlobal.displayInfo(f"Lamp Material Setup: reusing identical material {material}.")
+
+                if self.convert_textures:
+                    with PROFILER.span("convert_textures"):
+                        convert_textures(self.renderers, [path for path in filtered_textures.values() if path])
+
+                if selection:
+                    with PROFILER.span("assign", objects=len(selection)):
+                        assignment = assign_material(selection, sg)
+                    if assignment.failed:
+                        warn_failures(assignment.failed)
+                        cmds.warning(f"Material assigned to {len(assignment.assigned)} of {len(selection)} selected objects.")
+                else:
+                    cmds.warning("No geometry selected. Material created but not assigned.")
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+def get_maya_main_window():
+    main_window_ptr = omui.MQtUtil.mainWindow()
+    return wrapInstance(int(main_window_ptr), QtWidgets.QMainWindow)
+
+def show_ui():
+    try:
+        global material_creator_ui
+        if material_creator_ui and material_creator_ui.isVisible():
+            material_creator_ui.close()
+            material_creator_ui.deleteLater()
+    except NameError:
+        pass
+
+    parent = get_maya_main_window()
+    material_creator_ui = MaterialCreatorUI(parent)
+    material_creator_ui.show()
+
+if __name__ == "__main__":
+    show_ui()
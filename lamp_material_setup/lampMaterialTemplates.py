@@ -0,0 +1,262 @@
+"""
+lampMaterialTemplates
+Lamp Material Setup (declarative material templates)
+
+Description:
+Loads material templates (JSON, or YAML when PyYAML is available) that
+describe the shader, and the nodes, attributes and connections of every
+texture slot. A template is validated and compiled once into a plan of
+tuples and cached by file modification time, so applying it to a material
+only walks the compiled plan. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+
+TEMPLATE_PATH_ENV = "LAMP_MATERIAL_TEMPLATE_PATH"
+BUILTIN_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+TEMPLATE_EXTENSIONS = (".json", ".yaml", ".yml")
+
+NODE_CATEGORIES = ("shader", "texture", "utility")
+CONDITION_KEYS = ("use_substance_style", "normal_map_type")
+RESERVED_NODES = ("material", "sg", "file")
+SCALAR_OUTPUT = "$scalar"
+
+_template_cache = {}
+
+
+def template_search_path():
+    paths = [path for path in os.environ.get(TEMPLATE_PATH_ENV, "").split(os.pathsep) if path]
+    paths.append(BUILTIN_TEMPLATE_DIR)
+    return paths
+
+
+def available_templates():
+    """Return {template name: path}; earlier search path entries win."""
+    templates = {}
+    for directory in template_search_path():
+        try:
+            file_names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for file_name in file_names:
+            name, extension = os.path.splitext(file_name)
+            if extension.lower() in TEMPLATE_EXTENSIONS:
+                templates.setdefault(name, os.path.join(directory, file_name))
+    return templates
+
+
+def find_template(name):
+    if os.path.isfile(name):
+        return name
+    for directory in template_search_path():
+        for extension in TEMPLATE_EXTENSIONS:
+            path = os.path.join(directory, name + extension)
+            if os.path.isfile(path):
+                return path
+    raise ValueError(f"Material template '{name}' was not found in {os.pathsep.join(template_search_path())}.")
+
+
+def load_template(name):
+    """Return the compiled template for a name or path, recompiling only when the file changed."""
+    path = os.path.normpath(os.path.abspath(find_template(name)))
+    modification_time = os.path.getmtime(path)
+    cached = _template_cache.get(path)
+    if cached and cached[0] == modification_time:
+        return cached[1]
+
+    template = compile_template(_read_template_file(path), os.path.splitext(os.path.basename(path))[0])
+    _template_cache[path] = (modification_time, template)
+    return template
+
+
+def clear_template_cache():
+    _template_cache.clear()
+
+
+def _read_template_file(path):
+    with open(path, "r", encoding="utf-8") as template_file:
+        if path.lower().endswith(".json"):
+            return json.load(template_file)
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"PyYAML is required to load the material template {path}.")
+        return yaml.safe_load(template_file)
+
+
+def compile_template(definition, name=None):
+    if not isinstance(definition, dict):
+        raise ValueError(f"Material template '{name}' must be a mapping.")
+    name = definition.get("name", name)
+    return MaterialTemplate(
+        name,
+        _required(definition, "renderer", name),
+        _compile_shader(_required(definition, "shader", name), name),
+        {
+            texture_type: _compile_slot(slot, f"{name}: {texture_type}")
+            for texture_type, slot in (definition.get("textures") or {}).items()
+        }
+    )
+
+
+class MaterialTemplate:
+    """
+    Compiled template. The shader is a (node_type, output, attributes) tuple,
+    every texture slot a list of variants; the first variant whose condition
+    matches the material options is planned.
+    """
+
+    def __init__(self, name, renderer, shader, slots):
+        self.name = name
+        self.renderer = renderer
+        self.shader = shader
+        self.slots = slots
+
+    @property
+    def texture_types(self):
+        return list(self.slots)
+
+    def dependent_types(self, option):
+        """Return the texture types whose wiring depends on the given option."""
+        return [
+            texture_type for texture_type, variants in self.slots.items()
+            if any(option in _condition_keys(variant) for variant in variants)
+        ]
+
+    def plan_shader(self, graph, material_name):
+        node_type, output, attributes = self.shader
+        material = graph.shading_node(node_type, "shader", material_name)
+        sg = graph.shading_group(f"{material_name}SG")
+        graph.connect_attr(f"{material}.{output}", f"{sg}.surfaceShader")
+        self.plan_shader_attributes(graph, material)
+        return material, sg
+
+    def plan_shader_attributes(self, graph, material):
+        """Plan the shader attributes on material, which may already exist in the scene."""
+        for attribute, value, attr_type in self.shader[2]:
+            graph.set_attr(f"{material}.{attribute}", value, attr_type)
+
+    def plan_texture(self, graph, material_name, material, sg, file_node, texture_type, scalar_plug, options):
+        for condition, nodes, attributes, connections in self.slots.get(texture_type, ()):
+            if not _matches(condition, options):
+                continue
+
+            handles = {"material": material, "sg": sg, "file": file_node}
+            for local_name, node_type, category, suffix in nodes:
+                handles[local_name] = graph.shading_node(node_type, category, f"{material_name}_{suffix}")
+
+            for (node, attribute), value, attr_type, attribute_condition in attributes:
+                if _matches(attribute_condition, options):
+                    graph.set_attr(f"{handles[node]}.{attribute}", value, attr_type)
+
+            for source, destination, connection_condition in connections:
+                if _matches(connection_condition, options):
+                    graph.connect_attr(_plug(handles, source, scalar_plug), _plug(handles, destination, scalar_plug))
+            return True
+        return False
+
+
+def _condition_keys(variant):
+    condition, nodes, attributes, connections = variant
+    keys = {key for key, value in condition}
+    keys.update(key for attribute in attributes for key, value in attribute[3])
+    keys.update(key for connection in connections for key, value in connection[2])
+    return keys
+
+
+def _matches(condition, options):
+    return all(options.get(key) == value for key, value in condition)
+
+
+def _plug(handles, reference, scalar_plug):
+    node, attribute = reference
+    if attribute == SCALAR_OUTPUT:
+        return scalar_plug
+    return f"{handles[node]}.{attribute}"
+
+
+def _required(definition, key, name):
+    if key not in definition:
+        raise ValueError(f"Material template '{name}' is missing '{key}'.")
+    return definition[key]
+
+
+def _compile_condition(condition, name):
+    condition = condition or {}
+    unknown = set(condition).difference(CONDITION_KEYS)
+    if unknown:
+        raise ValueError(f"Material template '{name}' uses unknown conditions: {', '.join(sorted(unknown))}.")
+    return tuple(sorted(condition.items()))
+
+
+def _compile_value(value, name):
+    if isinstance(value, dict):
+        return value.get("value"), value.get("type"), _compile_condition(value.get("when"), name)
+    if isinstance(value, list):
+        raise ValueError(f"Material template '{name}' sets a compound value; set its child attributes instead.")
+    return value, "string" if isinstance(value, str) else None, ()
+
+
+def _compile_shader(shader, name):
+    attributes = []
+    for attribute, value in (shader.get("attributes") or {}).items():
+        value, attr_type, condition = _compile_value(value, name)
+        if condition:
+            raise ValueError(f"Material template '{name}' cannot use conditions on shader attributes.")
+        attributes.append((attribute, value, attr_type))
+    return _required(shader, "type", name), shader.get("output", "outColor"), tuple(attributes)
+
+
+def _compile_slot(slot, name):
+    variants = slot if isinstance(slot, list) else [slot]
+    return [_compile_variant(variant, name) for variant in variants]
+
+
+def _compile_variant(variant, name):
+    nodes = []
+    for local_name, node in (variant.get("nodes") or {}).items():
+        if local_name in RESERVED_NODES:
+            raise ValueError(f"Material template '{name}' cannot redefine the '{local_name}' node.")
+        category = node.get("category", "utility")
+        if category not in NODE_CATEGORIES:
+            raise ValueError(f"Material template '{name}' uses unknown node category '{category}'.")
+        nodes.append((local_name, _required(node, "type", name), category, node.get("suffix", node["type"])))
+    known_nodes = set(RESERVED_NODES).union(node[0] for node in nodes)
+
+    attributes = []
+    for plug, value in (variant.get("attributes") or {}).items():
+        attributes.append((_compile_reference(plug, known_nodes, name),) + _compile_value(value, name))
+
+    connections = []
+    for connection in variant.get("connections") or []:
+        if isinstance(connection, dict):
+            source, destination, condition = connection.get("from"), connection.get("to"), connection.get("when")
+        else:
+            (source, destination), condition = connection, None
+        connections.append((
+            _compile_reference(source, known_nodes, name),
+            _compile_reference(destination, known_nodes, name),
+            _compile_condition(condition, name)
+        ))
+
+    return _compile_condition(variant.get("when"), name), tuple(nodes), tuple(attributes), tuple(connections)
+
+
+def _compile_reference(reference, known_nodes, name):
+    """Split 'node.attribute' into a tuple; a bare attribute refers to the material."""
+    if not isinstance(reference, str) or not reference:
+        raise ValueError(f"Material template '{name}' has an invalid plug {reference!r}.")
+    node, separator, attribute = reference.partition(".")
+    if not separator:
+        node, attribute = "material", reference
+    if node not in known_nodes:
+        raise ValueError(f"Material template '{name}' references unknown node '{node}'.")
+    if attribute == SCALAR_OUTPUT and node != "file":
+        raise ValueError(f"Material template '{name}' can only use {SCALAR_OUTPUT} on the file node.")
+    return node, attribute
@@ -0,0 +1,135 @@
+"""
+lampProfiler
+Lamp Material Setup (build instrumentation)
+
+Description:
+Opt-in timing of material build phases. Code marks phases with
+PROFILER.span(name, **args); while the profiler is disabled span() returns
+a shared no-op context, so instrumented code pays one attribute check per
+phase. Recorded spans can be summarized, written as a JSON log or exported
+as a Chrome trace (chrome://tracing, Perfetto). Set LAMP_PROFILE=1 to
+enable it at startup. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import threading
+import time
+
+PROFILE_ENV_VAR = "LAMP_PROFILE"
+DISABLED_VALUES = ("", "0", "false", "off", "no")
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("profiler", "name", "args", "start")
+
+    def __init__(self, profiler, name, args):
+        self.profiler = profiler
+        self.name = name
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.args["error"] = str(exc_value)
+        self.profiler._record(self.name, self.start, time.perf_counter(), self.args)
+        return False
+
+    def set(self, **args):
+        """Attach values (counts, names) to the span before it ends."""
+        self.args.update(args)
+
+
+class Profiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.records = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self.records = []
+            self._origin = time.perf_counter()
+
+    def span(self, name, **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def summary(self):
+        """Return {span name: {"count", "total", "mean", "max"}} in seconds, slowest first."""
+        totals = {}
+        for name, start, end, thread_id, args in self.records:
+            entry = totals.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += end - start
+            entry["max"] = max(entry["max"], end - start)
+        for entry in totals.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return dict(sorted(totals.items(), key=lambda item: item[1]["total"], reverse=True))
+
+    def export_log(self, file_path):
+        records = [
+            {"name": name, "start": start - self._origin, "duration": end - start, "thread": thread_id, "args": args}
+            for name, start, end, thread_id, args in self.records
+        ]
+        self._write(file_path, {"records": records, "summary": self.summary()})
+
+    def export_chrome_trace(self, file_path):
+        process_id = os.getpid()
+        events = [{
+            "name": "process_name", "ph": "M", "pid": process_id, "tid": 0,
+            "args": {"name": "Lamp Material Setup"}
+        }]
+        for name, start, end, thread_id, args in self.records:
+            events.append({
+                "name": name, "cat": "lamp", "ph": "X",
+                "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6,
+                "pid": process_id, "tid": thread_id, "args": args
+            })
+        self._write(file_path, {"traceEvents": events, "displayTimeUnit": "ms"})
+
+    def _record(self, name, start, end, args):
+        with self._lock:
+            self.records.append((name, start, end, threading.get_ident(), args))
+
+    @staticmethod
+    def _write(file_path, data):
+        directory = os.path.dirname(file_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(file_path, "w", encoding="utf-8") as output_file:
+            json.dump(data, output_file, default=str)
+
+
+PROFILER = Profiler(enabled=os.environ.get(PROFILE_ENV_VAR, "").strip().lower() not in DISABLED_VALUES)
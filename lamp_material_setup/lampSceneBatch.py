@@ -0,0 +1,406 @@
+"""
+lampSceneBatch
+Lamp Material Setup (headless scene batch)
+
+Description:
+Command-line entry point for running material setup over many Maya scenes.
+The driver only needs a plain Python interpreter: it starts a pool of
+long-lived mayapy workers, hands every worker one scene at a time over a
+JSON-lines protocol and collects per-scene results and timings. A worker
+that crashes or times out is restarted for the remaining scenes. Each
+worker opens its scene, runs MaterialBatchBuilder and/or the texture repath
+(lampTextureAudit) and saves the result.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import argparse
+import glob
+import json
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+
+MAYAPY_ENV_VAR = "LAMP_MAYAPY"
+RESULT_MARKER = "@@lamp-result@@"
+SCENE_EXTENSIONS = (".ma", ".mb")
+RENDERER_PLUGINS = {
+    "Arnold": "mtoa",
+    "Redshift": "redshift4maya"
+}
+DEFAULT_TIMEOUT = 1800
+
+
+def find_mayapy(mayapy=None):
+    if mayapy:
+        return mayapy
+    if os.environ.get(MAYAPY_ENV_VAR):
+        return os.environ[MAYAPY_ENV_VAR]
+
+    executable = "mayapy.exe" if os.name == "nt" else "mayapy"
+    if os.environ.get("MAYA_LOCATION"):
+        candidate = os.path.join(os.environ["MAYA_LOCATION"], "bin", executable)
+        if os.path.isfile(candidate):
+            return candidate
+    return shutil.which(executable) or executable
+
+
+def collect_scenes(paths):
+    """Expand files, folders and glob patterns into a sorted list of unique scene files."""
+    scenes = []
+    for path in paths:
+        matches = glob.glob(path) if glob.has_magic(path) else [path]
+        for match in matches:
+            if os.path.isdir(match):
+                scenes.extend(
+                    os.path.join(match, file_name) for file_name in sorted(os.listdir(match))
+                    if file_name.lower().endswith(SCENE_EXTENSIONS))
+            else:
+                scenes.append(match)
+    return list(dict.fromkeys(os.path.abspath(scene) for scene in scenes))
+
+
+def make_job(scene, options):
+    scene_dir, scene_file = os.path.split(scene)
+    fields = {"scene_dir": scene_dir, "scene_name": os.path.splitext(scene_file)[0]}
+    output = scene
+    if options.output_dir:
+        output = os.path.join(options.output_dir.format(**fields), scene_file)
+
+    return {
+        "scene": scene,
+        "output": None if options.dry_run else output,
+        "textures": options.textures.format(**fields) if options.textures else None,
+        "manifest": options.manifest.format(**fields) if options.manifest else None,
+        "renderer": options.renderer,
+        "normal_map_type": options.normal_map_type,
+        "use_substance_style": options.substance_style,
+        "enable_normal_displacement": options.displacement,
+        "convert_textures": options.convert,
+        "template": options.template,
+        "reuse_existing": options.reuse,
+        "repath": options.repath or [],
+        "texture_variant": options.texture_variant,
+        "assign": not options.no_assign,
+        "profile": os.path.join(options.profile.format(**fields), fields["scene_name"] + ".json") if options.profile else None
+    }
+
+
+class SceneWorker:
+    """One mayapy process that builds materials for scenes sent to it, one at a time."""
+
+    def __init__(self, mayapy, timeout=DEFAULT_TIMEOUT):
+        self.mayapy = mayapy
+        self.timeout = timeout
+        self.process = None
+        self._lines = None
+
+    def run(self, job):
+        started = time.perf_counter()
+        try:
+            if self.process is None:
+                self._start()
+            self.process.stdin.write(json.dumps(job) + "\n")
+            self.process.stdin.flush()
+            result = self._read_result(started)
+        except (OSError, RuntimeError) as e:
+            self.stop()
+            result = {"scene": job["scene"], "status": "failed", "error": str(e), "assets": [], "timings": {}}
+
+        result["timings"]["total"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=10)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+        self.process = None
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            [self.mayapy, os.path.abspath(__file__), "--worker"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            universal_newlines=True, bufsize=1)
+        self._lines = queue.Queue()
+        threading.Thread(target=self._pump, args=(self.process.stdout, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _pump(stream, lines):
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def _read_result(self, started):
+        log = []
+        while True:
+            remaining = self.timeout - (time.perf_counter() - started)
+            try:
+                line = self._lines.get(timeout=max(remaining, 0))
+            except queue.Empty:
+                self.process.kill()
+                self.process = None
+                raise RuntimeError(f"Timed out after {self.timeout} s")
+
+            if line is None:
+                self.process.wait()
+                code = self.process.returncode
+                self.process = None
+                raise RuntimeError(f"mayapy exited with code {code}: {''.join(log[-20:]).strip()}")
+            if line.startswith(RESULT_MARKER):
+                return json.loads(line[len(RESULT_MARKER):])
+            log.append(line)
+
+
+def run_batch(jobs, mayapy=None, workers=None, timeout=DEFAULT_TIMEOUT, on_result=None):
+    """Run jobs on a pool of mayapy workers and return the results in job order."""
+    mayapy = find_mayapy(mayapy)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    pending = queue.Queue()
+    for index, job in enumerate(jobs):
+        pending.put((index, job))
+    results = [None] * len(jobs)
+    lock = threading.Lock()
+
+    def work():
+        worker = SceneWorker(mayapy, timeout)
+        try:
+            while True:
+                try:
+                    index, job = pending.get_nowait()
+                except queue.Empty:
+                    return
+                result = worker.run(job)
+                results[index] = result
+                if on_result:
+                    with lock:
+                        on_result(result)
+        finally:
+            worker.stop()
+
+    threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def process_scene(job):
+    """Open, build and save one scene. Runs inside mayapy."""
+    import maya.cmds as cmds
+    from lampMaterialSetup import MaterialBatchBuilder
+    from lampProfiler import PROFILER
+    from lampShadingGraph import load_plugin
+
+    timings = {}
+    result = {"scene": job["scene"], "status": "ok", "error": None, "assets": [], "timings": timings}
+    if job.get("profile"):
+        PROFILER.reset()
+        PROFILER.enable()
+    try:
+        started = time.perf_counter()
+        for renderer in job["renderer"]:
+            plugin = RENDERER_PLUGINS.get(renderer)
+            if plugin and not cmds.pluginInfo(plugin, query=True, loaded=True):
+                cmds.loadPlugin(plugin, quiet=True)
+        # mayapy does not load lampMSPlugin; without lampApplyGraph every setAttr and connectAttr is a cmds call.
+        load_plugin()
+        cmds.file(job["scene"], open=True, force=True, prompt=False)
+        timings["open"] = round(time.perf_counter() - started, 3)
+
+        if job["textures"] or job["manifest"]:
+            started = time.perf_counter()
+            builder = MaterialBatchBuilder(
+                job["renderer"], job["normal_map_type"], job["use_substance_style"],
+                job["enable_normal_displacement"], job["convert_textures"], job["template"], job.get("reuse_existing", True))
+            if job["manifest"]:
+                assets = builder.build_from_manifest(job["manifest"], job["assign"])
+            else:
+                assets = builder.build_from_directory(job["textures"], job["assign"])
+            timings["build"] = round(time.perf_counter() - started, 3)
+
+            result["assets"] = [
+                {
+                    "asset": asset["asset"], "material": asset["material"], "objects": len(asset["objects"]),
+                    "reused": asset["reused"], "error": asset["error"]
+                }
+                for asset in assets
+            ]
+            if any(asset["error"] for asset in assets):
+                result["status"] = "partial"
+
+        if job.get("repath") or job.get("texture_variant"):
+            started = time.perf_counter()
+            result["repath"] = repath_scene(job["repath"], job["texture_variant"])
+            timings["repath"] = round(time.perf_counter() - started, 3)
+            if result["repath"]["skipped"]:
+                result["status"] = "partial"
+
+        if job["output"]:
+            started = time.perf_counter()
+            os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+            scene_type = "mayaAscii" if job["output"].lower().endswith(".ma") else "mayaBinary"
+            cmds.file(rename=job["output"])
+            cmds.file(save=True, force=True, type=scene_type)
+            timings["save"] = round(time.perf_counter() - started, 3)
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+    finally:
+        if job.get("profile"):
+            PROFILER.disable()
+            try:
+                PROFILER.export_chrome_trace(job["profile"])
+                result["profile"] = job["profile"]
+            except OSError as e:
+                result["error"] = result["error"] or f"Could not write the profile: {e}"
+    return result
+
+
+def repath_scene(rules, variant):
+    """Apply repath rules and the texture variant to the scene's file nodes. Runs inside mayapy."""
+    from lampTextureAudit import RepathRule, repath_textures
+
+    changes, skipped, missing = repath_textures([RepathRule.parse(rule) for rule in rules], variant)
+    return {
+        "changed": len(changes),
+        "skipped": [change.new_path for change in skipped],
+        "missing": sorted({entry.path for entry in missing})
+    }
+
+
+def run_worker():
+    """Read jobs from stdin and answer each with one marked JSON line on stdout."""
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    try:
+        for line in sys.stdin:
+            if line.strip():
+                result = process_scene(json.loads(line))
+                sys.stdout.write(RESULT_MARKER + json.dumps(result) + "\n")
+                sys.stdout.flush()
+    finally:
+        maya.standalone.uninitialize()
+
+
+def run_in_process(jobs, on_result=None):
+    """Run jobs in the current mayapy interpreter, without worker processes."""
+    import maya.standalone
+    maya.standalone.initialize(name="python")
+    results = []
+    try:
+        for job in jobs:
+            started = time.perf_counter()
+            result = process_scene(job)
+            result["timings"]["total"] = round(time.perf_counter() - started, 3)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    finally:
+        maya.standalone.uninitialize()
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m lamp_material_setup",
+        description="Build Lamp Material Setup materials in many Maya scenes with a pool of mayapy workers.")
+    parser.add_argument("scenes", nargs="*", help="Scene files, folders or glob patterns.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--textures", help="Texture library folder. {scene_dir} and {scene_name} are replaced per scene.")
+    source.add_argument("--manifest", help="JSON texture manifest, or a manifest pointing at a Substance Painter export preset. {scene_dir} and {scene_name} are replaced per scene.")
+    parser.add_argument(
+        "--renderer", nargs="+", choices=sorted(RENDERER_PLUGINS), default=["Arnold"],
+        help="One renderer, or several to build one shading group with a shader per renderer.")
+    parser.add_argument("--normal-map-type", choices=["aiNormalMap", "bump2d"], default="aiNormalMap")
+    parser.add_argument("--template", help="Material template name or path.")
+    parser.add_argument("--no-substance-style", dest="substance_style", action="store_false")
+    parser.add_argument("--displacement", action="store_true", help="Connect normal and displacement maps.")
+    parser.add_argument("--convert", action="store_true", help="Convert textures to .tx/.rstexbin.")
+    parser.add_argument("--no-reuse", dest="reuse", action="store_false", help="Always build new materials, even if an identical one exists.")
+    parser.add_argument("--no-assign", action="store_true", help="Create materials without assigning them.")
+    parser.add_argument(
+        "--repath", action="append", metavar="OLD=NEW",
+        help="Repath the tool's file nodes: replace the path prefix OLD by NEW (re:OLD=NEW for a regular expression). Can be repeated.")
+    parser.add_argument(
+        "--texture-variant", choices=["source"] + sorted(RENDERER_PLUGINS),
+        help="Point the tool's file nodes at the source textures or at a renderer's converted textures.")
+    parser.add_argument("--output-dir", help="Save scenes to this folder instead of overwriting them.")
+    parser.add_argument("--dry-run", action="store_true", help="Build materials but do not save the scenes.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of mayapy workers (0 runs in this interpreter).")
+    parser.add_argument("--mayapy", help=f"mayapy executable (default: ${MAYAPY_ENV_VAR}, $MAYA_LOCATION/bin or PATH).")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds allowed per scene.")
+    parser.add_argument("--results", help="Write the per-scene results as JSON to this file.")
+    parser.add_argument("--profile", help="Write a Chrome trace per scene to this folder. {scene_dir} and {scene_name} are replaced per scene.")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+
+    options = parser.parse_args(argv)
+    if not options.worker:
+        if not options.scenes:
+            parser.error("no scenes given")
+        if not options.textures and not options.manifest and not options.repath and not options.texture_variant:
+            parser.error("one of --textures, --manifest, --repath or --texture-variant is required")
+    for rule in options.repath or []:
+        if "=" not in rule:
+            parser.error(f"repath rule '{rule}' is not in the form OLD=NEW")
+    if options.template and len(set(options.renderer)) > 1:
+        parser.error("--template works with a single --renderer")
+    if "Arnold" not in options.renderer:
+        options.normal_map_type = None
+    return options
+
+
+def print_result(result):
+    timings = " ".join(f"{name}={seconds:.2f}s" for name, seconds in result["timings"].items())
+    print(f"[{result['status']:>7}] {result['scene']} ({len(result['assets'])} assets, {timings})")
+    if result["error"]:
+        print(f"          {result['error']}")
+    for asset in result["assets"]:
+        if asset["error"]:
+            print(f"          {asset['asset']}: {asset['error']}")
+    repath = result.get("repath")
+    if repath:
+        print(f"          repathed {repath['changed']} file nodes, {len(repath['skipped'])} skipped (target missing), "
+              f"{len(repath['missing'])} missing textures")
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.worker:
+        run_worker()
+        return 0
+
+    jobs = [make_job(scene, options) for scene in collect_scenes(options.scenes)]
+    if not jobs:
+        print("No scenes found.")
+        return 1
+
+    started = time.perf_counter()
+    if options.workers == 0:
+        results = run_in_process(jobs, print_result)
+    else:
+        results = run_batch(jobs, options.mayapy, options.workers, options.timeout, print_result)
+    elapsed = time.perf_counter() - started
+
+    failed = [result for result in results if result["status"] != "ok"]
+    print(f"{len(results) - len(failed)}/{len(results)} scenes succeeded in {elapsed:.2f}s.")
+
+    if options.results:
+        with open(options.results, "w", encoding="utf-8") as results_file:
+            json.dump({"elapsed": round(elapsed, 3), "scenes": results}, results_file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
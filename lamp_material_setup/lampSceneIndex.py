@@ -0,0 +1,261 @@
+"""
+lampSceneIndex
+Lamp Material Setup (scene indexes)
+
+Description:
+In-memory indexes over nodes created by the tool. The index is built with one
+scene scan on first use and then kept up to date from node creation and
+Maya's node-removed callbacks, so lookups never rescan the scene.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+
+from lampTextureSets import tiling_mode
+
+TEXTURE_TYPE_ATTR = "lampTextureType"
+FILE_SETTINGS_ATTR = "lampFileSettings"
+SOURCE_PATH_ATTR = "lampSourcePath"
+SHARED_PLACEMENT_ATTR = "lampSharedPlacement"
+MATERIAL_STATE_ATTR = "lampMaterialState"
+CONTENT_HASH_ATTR = "lampContentHash"
+
+# The place2dTexture applies its repeat, offset and rotation to outUV; the
+# file node's own placement attributes keep their defaults, which match
+# place2dTexture's, so only the UV and filter size are connected.
+PLACE2D_CONNECTIONS = (
+    ("outUV", "uvCoord"),
+    ("outUvFilterSize", "uvFilterSize")
+)
+
+
+def tagged_nodes(attr_name, node_type=None):
+    nodes = cmds.ls(f"*.{attr_name}", objectsOnly=True, recursive=True) or []
+    if node_type and nodes:
+        nodes = cmds.ls(nodes, type=node_type) or []
+    return nodes
+
+
+class FileNodeCache:
+    def __init__(self):
+        self._nodes = None
+        self._keys = {}
+        self._place2d = None
+        self._callback_ids = []
+        self._dirty = False
+
+    @staticmethod
+    def make_key(file_path, color_space=None, alpha_is_luminance=False):
+        return (os.path.normcase(os.path.normpath(file_path)), color_space or "", bool(alpha_is_luminance))
+
+    def lookup(self, key):
+        """
+        Return the file node for key, or None. Entries are kept by node name,
+        so an entry whose node is gone or no longer reads key (renamed, or
+        recreated under another name by undo/redo) makes the index rescan.
+        Redo brings removed nodes back without a callback, so the first miss
+        after a removal rescans too.
+        """
+        self._ensure_index()
+        node = self._nodes.get(key)
+        if (node and not self._is_current(node, key)) or (node is None and self._dirty):
+            self._rescan()
+            node = self._nodes.get(key)
+        return node
+
+    def add(self, key, node):
+        self._ensure_index()
+        self._nodes[key] = node
+        self._keys[node] = key
+
+    def nodes_by_source(self):
+        """Return {normalized source path: [file nodes]} for every indexed node."""
+        self._ensure_index()
+        if self._dirty or not all(self._is_current(node, key) for key, node in self._nodes.items()):
+            self._rescan()
+        nodes_by_source = {}
+        for key, node in self._nodes.items():
+            nodes_by_source.setdefault(key[0], []).append(node)
+        return nodes_by_source
+
+    def plan_file_node(self, graph, name, texture_type, file_path, color_space=None, alpha_is_luminance=False):
+        """
+        Return (file_node, created). An existing file node with the same path
+        and settings is reused, otherwise a new one is planned in graph and
+        shared by every material planned into the same graph.
+        """
+        key = self.make_key(file_path, color_space, alpha_is_luminance)
+        node = self.lookup(key)
+        if node:
+            return node, False
+
+        pending = graph.cache.setdefault("file_nodes", {})
+        if key in pending:
+            return pending[key], False
+
+        file_node = graph.shading_node("file", "texture", name)
+        uv_tiling_mode = tiling_mode(file_path)
+        if uv_tiling_mode:
+            graph.set_attr(f"{file_node}.uvTilingMode", uv_tiling_mode)
+        graph.set_attr(f"{file_node}.fileTextureName", file_path)
+        if alpha_is_luminance:
+            graph.set_attr(f"{file_node}.alphaIsLuminance", True)
+        if color_space:
+            graph.set_attr(f"{file_node}.colorSpace", color_space)
+
+        graph.add_attr(file_node, TEXTURE_TYPE_ATTR)
+        graph.set_attr(f"{file_node}.{TEXTURE_TYPE_ATTR}", texture_type)
+        graph.add_attr(file_node, FILE_SETTINGS_ATTR)
+        graph.set_attr(f"{file_node}.{FILE_SETTINGS_ATTR}", f"{key[1]}|{int(key[2])}")
+        graph.add_attr(file_node, SOURCE_PATH_ATTR)
+        graph.set_attr(f"{file_node}.{SOURCE_PATH_ATTR}", file_path)
+
+        place2d = self.plan_place2d(graph)
+        for source_attr, destination_attr in PLACE2D_CONNECTIONS:
+            graph.connect_attr(f"{place2d}.{source_attr}", f"{file_node}.{destination_attr}")
+
+        pending[key] = file_node
+        graph.on_commit(lambda: self.add(key, graph.resolve(file_node)))
+        return file_node, True
+
+    def plan_place2d(self, graph):
+        if self._place2d and cmds.objExists(self._place2d):
+            return self._place2d
+
+        if self._place2d is None or not cmds.objExists(self._place2d):
+            existing = tagged_nodes(SHARED_PLACEMENT_ATTR, "place2dTexture")
+            if existing:
+                self._place2d = existing[0]
+                return self._place2d
+
+        if "place2d" not in graph.cache:
+            place2d = graph.shading_node("place2dTexture", "utility", "lampPlace2dTexture")
+            graph.add_attr(place2d, SHARED_PLACEMENT_ATTR)
+            graph.set_attr(f"{place2d}.{SHARED_PLACEMENT_ATTR}", "shared")
+            graph.cache["place2d"] = place2d
+            graph.on_commit(lambda: self._set_place2d(graph.resolve(place2d)))
+        return graph.cache["place2d"]
+
+    def reset(self, *args):
+        self._nodes = None
+        self._keys = {}
+        self._place2d = None
+
+    def release(self):
+        if self._callback_ids:
+            om2.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+        self.reset()
+
+    def _set_place2d(self, node):
+        self._place2d = node
+
+    def _ensure_index(self):
+        if self._nodes is not None:
+            return
+
+        self._nodes = {}
+        self._keys = {}
+        self._dirty = False
+        for node in tagged_nodes(SOURCE_PATH_ATTR, "file"):
+            key = self._node_key(node)
+            self._nodes.setdefault(key, node)
+            self._keys[node] = key
+
+        if not self._callback_ids:
+            self._callback_ids = [
+                om2.MDGMessage.addNodeRemovedCallback(self._node_removed, "file"),
+                om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, self.reset),
+                om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, self.reset)
+            ]
+
+    def _rescan(self):
+        self._nodes = None
+        self._ensure_index()
+
+    def _node_key(self, node):
+        color_space, _, alpha_is_luminance = (cmds.getAttr(f"{node}.{FILE_SETTINGS_ATTR}") or "").partition("|")
+        return self.make_key(cmds.getAttr(f"{node}.{SOURCE_PATH_ATTR}") or "", color_space, alpha_is_luminance == "1")
+
+    def _is_current(self, node, key):
+        return (
+            cmds.objExists(node) and cmds.attributeQuery(SOURCE_PATH_ATTR, node=node, exists=True)
+            and self._node_key(node) == key)
+
+    def _node_removed(self, node, client_data):
+        self._forget(om2.MFnDependencyNode(node).name())
+
+    def _forget(self, node):
+        self._dirty = True
+        key = self._keys.pop(node, None)
+        if key is not None and self._nodes.get(key) == node:
+            del self._nodes[key]
+
+
+class MaterialIndex:
+    """
+    Materials created by the tool by the content hash of their inputs, so an
+    equivalent network can be reused instead of built again.
+    """
+
+    def __init__(self):
+        self._materials = None
+        self._callback_ids = []
+
+    def lookup(self, content_hash):
+        """Return (material, sg) of an existing material with this content hash, or None."""
+        self._ensure_index()
+        material = self._materials.get(content_hash)
+        if material is None:
+            return None
+        if not cmds.objExists(material) or cmds.getAttr(f"{material}.{CONTENT_HASH_ATTR}") != content_hash:
+            del self._materials[content_hash]
+            return None
+        sgs = cmds.listConnections(material, source=False, destination=True, type="shadingEngine") or []
+        return (material, sgs[0]) if sgs else None
+
+    def plan_lookup(self, graph, content_hash):
+        """Like lookup(), but also finds materials planned into graph and not committed yet."""
+        return graph.cache.setdefault("materials", {}).get(content_hash) or self.lookup(content_hash)
+
+    def plan_add(self, graph, content_hash, material, sg):
+        graph.cache.setdefault("materials", {})[content_hash] = (material, sg)
+        graph.on_commit(lambda: self.add(content_hash, graph.resolve(material)))
+
+    def add(self, content_hash, material):
+        self._ensure_index()
+        self._materials[content_hash] = material
+
+    def reset(self, *args):
+        self._materials = None
+
+    def release(self):
+        if self._callback_ids:
+            om2.MMessage.removeCallbacks(self._callback_ids)
+        self._callback_ids = []
+        self.reset()
+
+    def _ensure_index(self):
+        if self._materials is not None:
+            return
+
+        self._materials = {}
+        for material in tagged_nodes(CONTENT_HASH_ATTR):
+            self._materials.setdefault(cmds.getAttr(f"{material}.{CONTENT_HASH_ATTR}"), material)
+
+        if not self._callback_ids:
+            self._callback_ids = [
+                om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeNew, self.reset),
+                om2.MSceneMessage.addCallback(om2.MSceneMessage.kBeforeOpen, self.reset)
+            ]
+
+
+FILE_NODE_CACHE = FileNodeCache()
+MATERIAL_INDEX = MaterialIndex()
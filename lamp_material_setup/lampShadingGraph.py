@@ -0,0 +1,235 @@
+"""
+lampShadingGraph
+Lamp Material Setup (deferred shading network construction)
+
+Description:
+Collects a shading network as a plan of node, attribute and connection
+operations and commits it in bulk inside a single undo chunk. Added
+attributes, attribute values and connections are applied with one
+MDGModifier through the lampApplyGraph command when the plug-in is loaded
+(load_plugin() loads it in batch and headless sessions), directly when undo
+is off, and with maya.cmds otherwise.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+
+import maya.cmds as cmds
+import maya.api.OpenMaya as om2
+
+from lampProfiler import PROFILER
+
+APPLY_COMMAND = "lampApplyGraph"
+PLUGIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lampMSPlugin.py")
+
+_CATEGORY_FLAGS = {
+    "shader": "asShader",
+    "texture": "asTexture",
+    "utility": "asUtility"
+}
+
+_ATTRIBUTE_DATA_TYPES = {
+    "string": "kString"
+}
+
+_pending_graph = None
+
+
+def load_plugin():
+    """
+    Load lampMSPlugin unless lampApplyGraph is already registered. Batch and
+    headless sessions do not load it from the plug-in manager. Returns
+    whether the command is available.
+    """
+    if not hasattr(cmds, APPLY_COMMAND):
+        try:
+            cmds.loadPlugin(PLUGIN_PATH, quiet=True)
+        except RuntimeError as e:
+            cmds.warning(f"Could not load {PLUGIN_PATH}, shading networks are applied with maya.cmds: {e}")
+    return hasattr(cmds, APPLY_COMMAND)
+
+
+class ShadingGraph:
+    def __init__(self):
+        self.names = {}
+        self.cache = {}
+        self._nodes = []
+        self._added_attributes = []
+        self._attributes = []
+        self._connections = []
+        self._commit_callbacks = []
+
+    def shading_node(self, node_type, category, name):
+        handle = f"@{len(self._nodes)}"
+        self._nodes.append((handle, node_type, category, name))
+        return handle
+
+    def shading_group(self, name):
+        return self.shading_node("shadingEngine", "shadingGroup", name)
+
+    def add_attr(self, node, long_name, data_type="string"):
+        self._added_attributes.append((node, long_name, data_type))
+
+    def set_attr(self, plug, value, attr_type=None):
+        if attr_type is None and isinstance(value, str):
+            attr_type = "string"
+        self._attributes.append((plug, value, attr_type))
+
+    def connect_attr(self, source_plug, destination_plug, force=False):
+        self._connections.append((source_plug, destination_plug, force))
+
+    def node_count(self):
+        return len(self._nodes)
+
+    def nodes_since(self, index):
+        return [node[0] for node in self._nodes[index:]]
+
+    def connection_count(self):
+        return len(self._connections)
+
+    def connections_since(self, index):
+        return [connection[:2] for connection in self._connections[index:]]
+
+    def stats(self):
+        return {
+            "nodes": len(self._nodes),
+            "added_attributes": len(self._added_attributes),
+            "attributes": len(self._attributes),
+            "connections": len(self._connections)
+        }
+
+    def on_commit(self, callback):
+        self._commit_callbacks.append(callback)
+
+    def resolve(self, node_or_plug):
+        if not node_or_plug.startswith("@"):
+            return node_or_plug
+        handle, separator, attribute = node_or_plug.partition(".")
+        return f"{self.names[handle]}{separator}{attribute}"
+
+    def commit(self, chunk_name="lampMaterialSetup"):
+        with PROFILER.span("commit", chunk=chunk_name) as span:
+            span.set(**self.stats())
+            cmds.undoInfo(openChunk=True, chunkName=chunk_name)
+            try:
+                with PROFILER.span("create_nodes"):
+                    self._create_nodes()
+                if hasattr(cmds, APPLY_COMMAND):
+                    with PROFILER.span("apply", backend="MDGModifier"):
+                        self._apply_with_command()
+                elif not cmds.undoInfo(query=True, state=True):
+                    # Nothing is recorded for undo, so the modifier needs no command to hold it.
+                    with PROFILER.span("apply", backend="MDGModifier"):
+                        self._apply_to_modifier(om2.MDGModifier())
+                else:
+                    with PROFILER.span("apply", backend="cmds"):
+                        self._apply_with_cmds()
+            finally:
+                cmds.undoInfo(closeChunk=True)
+
+        for callback in self._commit_callbacks:
+            callback()
+        return self.names
+
+    def _create_nodes(self):
+        for handle, node_type, category, name in self._nodes:
+            if category == "shadingGroup":
+                self.names[handle] = cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=name)
+            else:
+                self.names[handle] = cmds.shadingNode(node_type, name=name, **{_CATEGORY_FLAGS[category]: True})
+
+    def _apply_with_cmds(self):
+        for node, long_name, data_type in self._added_attributes:
+            cmds.addAttr(self.resolve(node), longName=long_name, dataType=data_type)
+
+        for plug, value, attr_type in self._attributes:
+            if attr_type:
+                cmds.setAttr(self.resolve(plug), value, type=attr_type)
+            else:
+                cmds.setAttr(self.resolve(plug), value)
+
+        for source_plug, destination_plug, force in self._connections:
+            cmds.connectAttr(self.resolve(source_plug), self.resolve(destination_plug), force=force)
+
+    def _apply_with_command(self):
+        global _pending_graph
+
+        _pending_graph = self
+        try:
+            getattr(cmds, APPLY_COMMAND)()
+        finally:
+            _pending_graph = None
+
+    def _apply_to_modifier(self, modifier):
+        if self._added_attributes:
+            for node, long_name, data_type in self._added_attributes:
+                modifier.addAttribute(_get_node(self.resolve(node)), _typed_attribute(long_name, data_type))
+            # The plugs of the new attributes only exist once they are added.
+            modifier.doIt()
+
+        for plug, value, attr_type in self._attributes:
+            _add_plug_value(modifier, _get_plug(self.resolve(plug)), value, attr_type)
+
+        for source_plug, destination_plug, force in self._connections:
+            destination = _get_plug(self.resolve(destination_plug))
+            if force and destination.isDestination:
+                modifier.disconnect(destination.source(), destination)
+            modifier.connect(_get_plug(self.resolve(source_plug)), destination)
+        modifier.doIt()
+
+
+def _get_plug(plug_name):
+    selection = om2.MSelectionList()
+    selection.add(plug_name)
+    return selection.getPlug(0)
+
+
+def _get_node(node_name):
+    selection = om2.MSelectionList()
+    selection.add(node_name)
+    return selection.getDependNode(0)
+
+
+def _typed_attribute(long_name, data_type):
+    data_type = getattr(om2.MFnData, _ATTRIBUTE_DATA_TYPES[data_type])
+    return om2.MFnTypedAttribute().create(long_name, long_name, data_type)
+
+
+def _add_plug_value(modifier, plug, value, attr_type):
+    if attr_type == "string":
+        modifier.newPlugValueString(plug, value)
+    elif isinstance(value, bool):
+        modifier.newPlugValueBool(plug, value)
+    elif isinstance(value, int):
+        modifier.newPlugValueInt(plug, value)
+    else:
+        modifier.newPlugValueDouble(plug, value)
+
+
+class ApplyGraphCommand(om2.MPxCommand):
+    def __init__(self):
+        super(ApplyGraphCommand, self).__init__()
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        return ApplyGraphCommand()
+
+    def doIt(self, args):
+        if _pending_graph is None:
+            raise RuntimeError(f"{APPLY_COMMAND} has no pending shading graph to apply.")
+        self.modifier = om2.MDGModifier()
+        _pending_graph._apply_to_modifier(self.modifier)
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+    def isUndoable(self):
+        return True
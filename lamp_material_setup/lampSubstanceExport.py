@@ -0,0 +1,241 @@
+"""
+lampSubstanceExport
+Lamp Material Setup (Substance Painter export presets)
+
+Description:
+Reads Substance Painter export presets (the JSON export configuration with
+exportPresets, maps, fileName and channels) and turns them into texture
+sets. The texture type of every exported map comes from the Painter
+channels it is made of, not from its file name. The paths are either
+predicted from the preset's file name patterns, the export folder and the
+texture set names, or taken from the list of files an export wrote, so no
+folder is scanned and no file name is classified. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import re
+from collections import namedtuple
+from pathlib import Path
+
+from lampTextureSets import UDIM_TOKEN, tile_files, tile_scan
+
+# Painter channel / converted map name (lower case) -> texture type.
+SUBSTANCE_MAP_TYPES = {
+    "basecolor": "Base Color",
+    "diffuse": "Base Color",
+    "roughness": "Roughness",
+    "metallic": "Metalness",
+    "specular": "Specular",
+    "normal": "Normal",
+    "normal_opengl": "Normal",
+    "normal_directx": "Normal",
+    "height": "Displacement",
+    "displacement": "Displacement"
+}
+DEFAULT_FILE_FORMAT = "png"
+
+ExportMap = namedtuple("ExportMap", ["file_name", "texture_type", "file_format"])
+
+# Longest names first, "$textureSet_BaseColor" is $textureSet followed by "_BaseColor".
+_VARIABLE_PATTERN = re.compile(r"\$(textureSet|sceneName|colorSpace|project|mesh|udim)")
+# Painter writes "(...)" parts of a file name only when their variables are set: "$textureSet_BaseColor(.$udim)".
+_OPTIONAL_PATTERN = re.compile(r"\(([^()]*)\)")
+
+
+class SubstanceExportPreset:
+    """The maps of one export preset whose texture type is known."""
+
+    def __init__(self, name, maps, skipped=()):
+        self.name = name
+        self.maps = list(maps)
+        self.skipped = list(skipped)
+
+    @classmethod
+    def from_data(cls, data, preset_name=None, default_file_format=DEFAULT_FILE_FORMAT):
+        """
+        Build the preset from an export configuration ({"exportPresets":
+        [...]}, the first preset or the one named preset_name) or from a
+        single preset ({"name": ..., "maps": [...]}). Maps that pack several
+        texture types or none are listed in skipped.
+        """
+        presets = data.get("exportPresets") if isinstance(data, dict) else None
+        if presets is None:
+            presets = [data]
+        if not isinstance(presets, list) or not all(isinstance(preset, dict) for preset in presets):
+            raise ValueError("A Substance Painter export preset must be a JSON object with a 'maps' list.")
+
+        matches = [preset for preset in presets if preset_name is None or preset.get("name") == preset_name]
+        if not matches:
+            raise ValueError(f"Export preset '{preset_name}' not found.")
+        preset = matches[0]
+
+        maps = []
+        skipped = []
+        for export_map in preset.get("maps") or []:
+            file_name = export_map.get("fileName")
+            texture_types = {
+                SUBSTANCE_MAP_TYPES.get(str(channel.get("srcMapName", "")).lower())
+                for channel in export_map.get("channels") or []
+            }
+            if not file_name or len(texture_types) != 1 or None in texture_types:
+                skipped.append(file_name)
+                continue
+            file_format = (export_map.get("parameters") or {}).get("fileFormat") or default_file_format
+            maps.append(ExportMap(file_name, texture_types.pop(), file_format.lstrip(".")))
+        return cls(preset.get("name"), maps, skipped)
+
+    @classmethod
+    def load(cls, preset_path, preset_name=None, default_file_format=DEFAULT_FILE_FORMAT):
+        with open(preset_path, "r", encoding="utf-8") as preset_file:
+            return cls.from_data(json.load(preset_file), preset_name, default_file_format)
+
+    def predict_texture_sets(self, export_dir, texture_set_names, mesh=None, project=None, verify=True):
+        """
+        Return {texture set: {texture type: path}} for the files the preset
+        writes to export_dir. $udim becomes a <UDIM> token. Without verify
+        optional "(...)" parts are left out of the file names; with verify
+        the variant that was exported is used and a texture that was not
+        exported (no file, or no tile) is left out.
+        """
+        texture_sets = {}
+        with tile_scan():
+            for texture_set in texture_set_names:
+                textures = {}
+                for export_map in self.maps:
+                    values = {"textureSet": texture_set, "mesh": mesh, "project": project, "udim": UDIM_TOKEN}
+                    file_paths = [
+                        os.path.join(export_dir, f"{file_name}.{export_map.file_format}")
+                        for file_name in _expand(export_map.file_name, values)
+                    ]
+                    if verify:
+                        file_paths = [file_path for file_path in file_paths if _exported(file_path)]
+                    if file_paths:
+                        textures.setdefault(export_map.texture_type, file_paths[0])
+                texture_sets[texture_set] = textures
+        return texture_sets
+
+    def match_outputs(self, outputs, mesh=None, project=None):
+        """
+        Map the files an export wrote ({texture set: [paths]}) to texture
+        types by matching them against the preset's file name patterns.
+        UDIM tiles collapse into one <UDIM> path; unmatched files are ignored.
+        """
+        texture_sets = {}
+        for texture_set, file_paths in outputs.items():
+            patterns = [
+                (_file_name_pattern(export_map, {"textureSet": texture_set, "mesh": mesh, "project": project}), export_map.texture_type)
+                for export_map in self.maps
+            ]
+            textures = {}
+            for file_path in file_paths:
+                directory, file_name = os.path.split(file_path)
+                for pattern, texture_type in patterns:
+                    match = pattern.match(file_name)
+                    if match is None:
+                        continue
+                    if match.groupdict().get("udim"):
+                        start, end = match.span("udim")
+                        file_path = os.path.join(directory, file_name[:start] + UDIM_TOKEN + file_name[end:])
+                    textures.setdefault(texture_type, file_path)
+                    break
+            texture_sets[texture_set] = textures
+        return texture_sets
+
+
+def _expand(file_name, values):
+    """
+    Return the file name without and with its optional parts, variables
+    replaced. An optional part whose variables are not given is left out.
+    """
+    def substitute(text):
+        if any(values.get(name) is None for name in _VARIABLE_PATTERN.findall(text)):
+            return None
+        return _VARIABLE_PATTERN.sub(lambda match: values[match.group(1)], text)
+
+    required = substitute(_OPTIONAL_PATTERN.sub("", file_name))
+    if required is None:
+        raise ValueError(f"Export file name '{file_name}' uses a variable that is not given.")
+    full = substitute(_OPTIONAL_PATTERN.sub(
+        lambda match: match.group(1) if substitute(match.group(1)) is not None else "", file_name))
+    return list(dict.fromkeys([required, full]))
+
+
+def _file_name_pattern(export_map, values):
+    def translate(text):
+        parts = []
+        position = 0
+        for match in _VARIABLE_PATTERN.finditer(text):
+            parts.append(re.escape(text[position:match.start()]))
+            name = match.group(1)
+            if name == "udim":
+                parts.append(r"(?P<udim>1\d{3})")
+            elif values.get(name) is not None:
+                parts.append(re.escape(values[name]))
+            else:
+                parts.append(r".+?")
+            position = match.end()
+        parts.append(re.escape(text[position:]))
+        return "".join(parts)
+
+    parts = []
+    position = 0
+    for match in _OPTIONAL_PATTERN.finditer(export_map.file_name):
+        parts.append(translate(export_map.file_name[position:match.start()]))
+        parts.append(f"(?:{translate(match.group(1))})?")
+        position = match.end()
+    parts.append(translate(export_map.file_name[position:]))
+    return re.compile("".join(parts) + re.escape(f".{export_map.file_format}") + "$", re.IGNORECASE)
+
+
+def _exported(file_path):
+    if UDIM_TOKEN in file_path:
+        return bool(tile_files(file_path, (os.path.splitext(file_path)[1].lower(),)))
+    return os.path.isfile(file_path)
+
+
+def load_substance_manifest(manifest_path, data=None):
+    """
+    Read a manifest that points at a Substance Painter export preset:
+    {"preset": "painter_export.json", "preset_name": ..., "mesh": ...,
+     "export_dir": "textures", "texture_sets": ["Crate", ...]}
+    predicts the exported files, while {"preset": ..., "outputs": {"Crate":
+    ["textures/Crate_BaseColor.png", ...]}} maps the files an export wrote.
+    "preset" can also hold the preset itself. Relative paths are resolved
+    against the manifest's folder. Returns {texture set: {texture type: path}};
+    texture sets without any exported texture are left out.
+    """
+    manifest_path = Path(manifest_path)
+    if data is None:
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            data = json.load(manifest_file)
+
+    root = manifest_path.parent
+    preset_name = data.get("preset_name")
+    file_format = data.get("file_format", DEFAULT_FILE_FORMAT)
+    if isinstance(data["preset"], dict):
+        preset = SubstanceExportPreset.from_data(data["preset"], preset_name, file_format)
+    else:
+        preset = SubstanceExportPreset.load(root / data["preset"], preset_name, file_format)
+    if not preset.maps:
+        raise ValueError(f"Export preset '{preset.name}' in {manifest_path} has no maps with a known texture type.")
+
+    mesh = data.get("mesh")
+    project = data.get("project")
+    if "outputs" in data:
+        # Painter reports exports per texture set and stack ("Crate/Main").
+        outputs = {}
+        for texture_set, file_paths in data["outputs"].items():
+            outputs.setdefault(texture_set.split("/", 1)[0], []).extend(str(root / file_path) for file_path in file_paths)
+        texture_sets = preset.match_outputs(outputs, mesh, project)
+    elif "texture_sets" in data:
+        texture_sets = preset.predict_texture_sets(
+            str(root / data.get("export_dir", ".")), data["texture_sets"], mesh, project, data.get("verify", True))
+    else:
+        raise ValueError(f"Manifest {manifest_path} needs 'texture_sets' or 'outputs' next to 'preset'.")
+    return {texture_set: textures for texture_set, textures in texture_sets.items() if textures}
@@ -0,0 +1,268 @@
+"""
+lampTextureAudit
+Lamp Material Setup (texture audit and repath)
+
+Description:
+Audits and repaths the file nodes created by the tool, found through the
+lampSourcePath tag they get at creation. The path of every node is checked
+on a thread pool for existence, size and modification time; tile sets are
+checked through their tiles. Repath rules (a path prefix or a regular
+expression) and a switch between the source texture and its converted
+.tx/.rstexbin file are planned against those checks and applied to all
+nodes, and to the stored material states and content hashes, in one undo
+chunk.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import re
+import stat
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import maya.cmds as cmds
+
+from lampMaterialSetup import shading_group_content_hash, shading_group_materials
+from lampSceneIndex import (
+    CONTENT_HASH_ATTR, FILE_NODE_CACHE, MATERIAL_INDEX, MATERIAL_STATE_ATTR, SOURCE_PATH_ATTR, TEXTURE_TYPE_ATTR,
+    tagged_nodes)
+from lampTextureConvert import TextureConverter
+from lampTextureSets import tile_files, tile_scan, tiling_mode
+
+MAX_AUDIT_WORKERS = 16
+SOURCE_VARIANT = "source"
+
+FileStatus = namedtuple("FileStatus", ["path", "exists", "size", "mtime", "tiles"])
+AuditEntry = namedtuple("AuditEntry", ["node", "texture_type", "path", "source_path", "status"])
+PathChange = namedtuple("PathChange", ["node", "old_path", "new_path", "old_source", "new_source"])
+
+
+def stat_file(file_path):
+    """Return the FileStatus of a path. A tile set exists if it has at least one tile; an empty path does not exist."""
+    if not file_path:
+        return FileStatus(file_path, False, 0, None, 0)
+    tiles = tile_files(file_path, (os.path.splitext(file_path)[1].lower(),)) if tiling_mode(file_path) else [file_path]
+    size = 0
+    mtime = None
+    count = 0
+    for tile in tiles:
+        try:
+            tile_stat = os.stat(tile)
+        except OSError:
+            continue
+        if not stat.S_ISREG(tile_stat.st_mode):
+            continue
+        count += 1
+        size += tile_stat.st_size
+        mtime = tile_stat.st_mtime if mtime is None else max(mtime, tile_stat.st_mtime)
+    return FileStatus(file_path, count > 0, size, mtime, count)
+
+
+def stat_files(file_paths, max_workers=MAX_AUDIT_WORKERS):
+    """Stat every unique path on a thread pool and return {path: FileStatus}, empty paths included."""
+    unique_paths = list(dict.fromkeys(path or "" for path in file_paths))
+    if len(unique_paths) <= 1:
+        return {path: stat_file(path) for path in unique_paths}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_paths))) as executor:
+        return dict(zip(unique_paths, executor.map(stat_file, unique_paths)))
+
+
+def _comparable(file_path):
+    file_path = file_path.replace("\\", "/")
+    return file_path.lower() if os.name == "nt" else file_path
+
+
+class RepathRule:
+    """
+    Replace the start of a path (//server/textures -> T:/textures) or, with
+    regex=True, every match of a regular expression. Prefixes match whole
+    path components and ignore the slash direction, and on Windows the case.
+    """
+
+    def __init__(self, old, new, regex=False):
+        self.old = old
+        self.new = new
+        self.regex = regex
+        self._pattern = re.compile(old) if regex else None
+        self._prefix = None if regex else _comparable(old).rstrip("/")
+
+    @classmethod
+    def parse(cls, rule):
+        """Build a rule from "OLD=NEW" (a prefix) or "re:OLD=NEW" (a regular expression)."""
+        regex = rule.startswith("re:")
+        old, separator, new = rule[3 if regex else 0:].partition("=")
+        if not separator or not old:
+            raise ValueError(f"Repath rule '{rule}' is not in the form OLD=NEW.")
+        return cls(old, new, regex)
+
+    def apply(self, file_path):
+        """Return the repathed path, or None if the rule does not match."""
+        if self.regex:
+            new_path, count = self._pattern.subn(self.new, file_path)
+            return new_path if count else None
+
+        comparable_path = _comparable(file_path)
+        if comparable_path != self._prefix and not comparable_path.startswith(self._prefix + "/"):
+            return None
+        return self.new.rstrip("/\\") + file_path.replace("\\", "/")[len(self._prefix):]
+
+
+def apply_rules(rules, file_path):
+    """Return file_path repathed by the first matching rule, or unchanged."""
+    for rule in rules:
+        new_path = rule.apply(file_path)
+        if new_path is not None:
+            return new_path
+    return file_path
+
+
+def variant_path(source_path, variant):
+    """Return the path a node reads for variant: "source" or a renderer's converted texture."""
+    if variant == SOURCE_VARIANT:
+        return source_path
+    return TextureConverter(variant).output_path(source_path)
+
+
+class TextureAudit:
+    def __init__(self, nodes=None, max_workers=MAX_AUDIT_WORKERS):
+        self.nodes = nodes
+        self.max_workers = max_workers
+
+    def file_nodes(self):
+        """The file nodes to audit: the given ones that the tool created, or all of them."""
+        if self.nodes is None:
+            return tagged_nodes(SOURCE_PATH_ATTR, "file")
+        return [
+            node for node in dict.fromkeys(self.nodes)
+            if cmds.objExists(node) and cmds.attributeQuery(SOURCE_PATH_ATTR, node=node, exists=True)
+        ]
+
+    def scan(self):
+        """Return one AuditEntry per file node with the FileStatus of the path it reads."""
+        records = []
+        for node in self.file_nodes():
+            texture_type = None
+            if cmds.attributeQuery(TEXTURE_TYPE_ATTR, node=node, exists=True):
+                texture_type = cmds.getAttr(f"{node}.{TEXTURE_TYPE_ATTR}")
+            records.append((
+                node, texture_type,
+                cmds.getAttr(f"{node}.fileTextureName") or "",
+                cmds.getAttr(f"{node}.{SOURCE_PATH_ATTR}") or ""))
+
+        with tile_scan():
+            statuses = stat_files((record[2] for record in records), self.max_workers)
+        return [AuditEntry(*record, statuses[record[2]]) for record in records]
+
+    def plan(self, entries, rules=(), variant=None, require_existing=True):
+        """
+        Return (changes, skipped) PathChange lists for the scanned entries.
+        The rules repath both the path a node reads and its source path, the
+        first matching rule wins; variant then picks the source texture or a
+        renderer's converted one. With require_existing a node is skipped
+        when its new path does not exist.
+        """
+        candidates = []
+        for entry in entries:
+            new_source = apply_rules(rules, entry.source_path)
+            new_path = variant_path(new_source, variant) if variant else apply_rules(rules, entry.path)
+            if new_path != entry.path or new_source != entry.source_path:
+                candidates.append(PathChange(entry.node, entry.path, new_path, entry.source_path, new_source))
+
+        statuses = {}
+        if require_existing:
+            statuses = stat_files(
+                (change.new_path for change in candidates if change.new_path != change.old_path), self.max_workers)
+
+        changes = []
+        skipped = []
+        for change in candidates:
+            status = statuses.get(change.new_path)
+            if status is not None and not status.exists:
+                skipped.append(change)
+            else:
+                changes.append(change)
+        return changes, skipped
+
+    def apply(self, changes):
+        """
+        Set the new paths in one undo chunk. Moved source paths are also
+        changed in the state stored on the tool's materials, so updates keep
+        recognizing their textures, and their content hashes are recomputed,
+        so reuse finds them under the new paths.
+        """
+        if not changes:
+            return changes
+
+        moved_sources = {
+            _comparable(change.old_source): change.new_source
+            for change in changes if change.new_source != change.old_source
+        }
+
+        cmds.undoInfo(openChunk=True, chunkName="lampMaterialSetup_repath")
+        try:
+            for change in changes:
+                if change.new_path != change.old_path:
+                    cmds.setAttr(f"{change.node}.fileTextureName", change.new_path, type="string")
+                if change.new_source != change.old_source:
+                    cmds.setAttr(f"{change.node}.{SOURCE_PATH_ATTR}", change.new_source, type="string")
+            if moved_sources:
+                repath_material_states(moved_sources)
+        finally:
+            cmds.undoInfo(closeChunk=True)
+
+        if moved_sources:
+            FILE_NODE_CACHE.reset()
+            MATERIAL_INDEX.reset()
+        return changes
+
+
+def repath_material_states(moved_sources):
+    """
+    Replace moved texture paths ({old path: new path}) in the lampMaterialState
+    of the tool's materials and recompute the content hash of their shading
+    groups.
+    """
+    changed_materials = []
+    for material in tagged_nodes(MATERIAL_STATE_ATTR):
+        try:
+            state = json.loads(cmds.getAttr(f"{material}.{MATERIAL_STATE_ATTR}") or "")
+        except ValueError:
+            continue
+
+        changed = False
+        for texture in state.get("textures", {}).values():
+            new_path = moved_sources.get(_comparable(texture[0]))
+            if new_path is not None and new_path != texture[0]:
+                texture[0] = new_path
+                changed = True
+        if changed:
+            cmds.setAttr(f"{material}.{MATERIAL_STATE_ATTR}", json.dumps(state), type="string")
+            changed_materials.append(material)
+
+    shading_groups = cmds.listConnections(changed_materials, source=False, destination=True, type="shadingEngine") if changed_materials else None
+    for sg in dict.fromkeys(shading_groups or []):
+        # The surface shader carries the hash of the whole shading group.
+        surface_material = next(iter(shading_group_materials(sg).values()), None)
+        if surface_material and cmds.attributeQuery(CONTENT_HASH_ATTR, node=surface_material, exists=True):
+            cmds.setAttr(f"{surface_material}.{CONTENT_HASH_ATTR}", shading_group_content_hash(sg), type="string")
+
+
+def repath_textures(rules=(), variant=None, nodes=None, require_existing=True):
+    """
+    Scan, plan and apply in one call. Returns (changes, skipped, missing):
+    missing lists the entries still reading a path that does not exist.
+    """
+    audit = TextureAudit(nodes)
+    entries = audit.scan()
+    changes, skipped = audit.plan(entries, rules, variant, require_existing)
+    audit.apply(changes)
+
+    changed_nodes = {change.node for change in changes}
+    missing = [entry for entry in entries if entry.node not in changed_nodes and not entry.status.exists]
+    return changes, skipped, missing
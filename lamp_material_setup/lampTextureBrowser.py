@@ -0,0 +1,250 @@
+"""
+lampTextureBrowser
+Lamp Material Setup (texture set browser)
+
+Description:
+Non-blocking texture browser. A background thread walks the texture library
+through the persistent TextureIndex and streams classified files to the
+dialog, which groups them by asset in a filterable tree while the scan is
+running. Closing the dialog or changing the folder cancels the scan.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+import time
+
+from PySide2 import QtCore, QtGui, QtWidgets
+
+from lampTextureClassifier import DEFAULT_CLASSIFIER
+from lampTextureIndex import TEXTURE_INDEX
+from lampTextureSets import collapse_tile_sets
+
+BATCH_SIZE = 500
+BATCH_INTERVAL = 0.1
+PATH_ROLE = QtCore.Qt.UserRole + 1
+UNSORTED_ASSET = "(unsorted)"
+
+
+class TextureIndexThread(QtCore.QThread):
+    textures_found = QtCore.Signal(list)
+    scan_finished = QtCore.Signal(int, bool)
+
+    def __init__(self, root_dir, texture_index=TEXTURE_INDEX, classifier=None, parent=None):
+        super(TextureIndexThread, self).__init__(parent)
+        self.root_dir = root_dir
+        self.texture_index = texture_index
+        self.classifier = classifier or DEFAULT_CLASSIFIER
+        self._buffer = []
+        self._last_emit = 0.0
+
+    def run(self):
+        self._last_emit = time.monotonic()
+        file_paths, completed = self.texture_index.scan(self.root_dir, self._add_files, self.isInterruptionRequested)
+        self._flush()
+        self.scan_finished.emit(len(file_paths), completed)
+
+    def _add_files(self, file_paths):
+        self._buffer.extend(file_paths)
+        if len(self._buffer) >= BATCH_SIZE or time.monotonic() - self._last_emit >= BATCH_INTERVAL:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        file_paths, self._buffer = self._buffer, []
+        file_paths, _ = collapse_tile_sets(file_paths)
+        classifications = self.classifier.classify_many(file_paths)
+        self.textures_found.emit([
+            (file_path, classification.asset_name, classification.texture_type, classification.confidence)
+            for file_path, classification in zip(file_paths, classifications)
+        ])
+        self._last_emit = time.monotonic()
+
+
+class TextureBrowserDialog(QtWidgets.QDialog):
+    def __init__(self, root_dir, texture_type=None, parent=None):
+        super(TextureBrowserDialog, self).__init__(parent)
+        self.setWindowTitle(f"Select {texture_type} Texture" if texture_type else "Select Textures")
+        self.resize(520, 560)
+
+        self.root_dir = os.path.normpath(root_dir)
+        self.texture_type = texture_type
+        self.index_thread = None
+        self.asset_items = {}
+        self.best_textures = {}
+        self.file_count = 0
+        self.fallback_files = None
+
+        self.init_ui()
+        self.start_scan()
+
+    def init_ui(self):
+        main_layout = QtWidgets.QVBoxLayout(self)
+
+        folder_layout = QtWidgets.QHBoxLayout()
+        self.folder_field = QtWidgets.QLineEdit(self.root_dir)
+        self.folder_field.setReadOnly(True)
+        folder_button = QtWidgets.QPushButton("...")
+        folder_button.setMaximumWidth(30)
+        folder_button.clicked.connect(self.choose_folder)
+        folder_layout.addWidget(QtWidgets.QLabel("Folder:"))
+        folder_layout.addWidget(self.folder_field)
+        folder_layout.addWidget(folder_button)
+        main_layout.addLayout(folder_layout)
+
+        self.filter_field = QtWidgets.QLineEdit()
+        self.filter_field.setPlaceholderText("Filter by asset, file name or texture type")
+        main_layout.addWidget(self.filter_field)
+
+        self.model = QtGui.QStandardItemModel(0, 2, self)
+        self.model.setHorizontalHeaderLabels(["Texture", "Type"])
+        self.proxy_model = QtCore.QSortFilterProxyModel(self)
+        self.proxy_model.setSourceModel(self.model)
+        self.proxy_model.setFilterCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.proxy_model.setFilterKeyColumn(-1)
+        self.proxy_model.setRecursiveFilteringEnabled(True)
+        self.proxy_model.setSortCaseSensitivity(QtCore.Qt.CaseInsensitive)
+        self.filter_field.textChanged.connect(self.proxy_model.setFilterFixedString)
+
+        self.tree_view = QtWidgets.QTreeView()
+        self.tree_view.setModel(self.proxy_model)
+        self.tree_view.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
+        self.tree_view.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.tree_view.setUniformRowHeights(True)
+        self.tree_view.setSortingEnabled(True)
+        self.tree_view.sortByColumn(0, QtCore.Qt.AscendingOrder)
+        self.tree_view.header().setStretchLastSection(False)
+        self.tree_view.header().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self.tree_view.doubleClicked.connect(self.item_double_clicked)
+        main_layout.addWidget(self.tree_view)
+
+        status_layout = QtWidgets.QHBoxLayout()
+        self.status_label = QtWidgets.QLabel("")
+        self.stop_button = QtWidgets.QPushButton("Stop")
+        self.stop_button.clicked.connect(self.cancel_scan)
+        refresh_button = QtWidgets.QPushButton("Rescan")
+        refresh_button.setToolTip("Forget the cached listing of this folder and scan it again.")
+        refresh_button.clicked.connect(self.rescan)
+        status_layout.addWidget(self.status_label)
+        status_layout.addStretch()
+        status_layout.addWidget(self.stop_button)
+        status_layout.addWidget(refresh_button)
+        main_layout.addLayout(status_layout)
+
+        button_box = QtWidgets.QDialogButtonBox(QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel)
+        files_button = button_box.addButton("Files...", QtWidgets.QDialogButtonBox.ActionRole)
+        files_button.setToolTip("Pick files with the standard file dialog.")
+        files_button.clicked.connect(self.browse_files)
+        button_box.accepted.connect(self.accept)
+        button_box.rejected.connect(self.reject)
+        main_layout.addWidget(button_box)
+
+        if self.texture_type:
+            self.filter_field.setText(self.texture_type)
+
+    def start_scan(self):
+        self.cancel_scan()
+        self.model.removeRows(0, self.model.rowCount())
+        self.asset_items = {}
+        self.best_textures = {}
+        self.file_count = 0
+
+        self.index_thread = TextureIndexThread(self.root_dir, parent=self)
+        self.index_thread.textures_found.connect(self.add_textures)
+        self.index_thread.scan_finished.connect(self.scan_finished)
+        self.stop_button.setEnabled(True)
+        self.status_label.setText("Scanning...")
+        self.index_thread.start()
+
+    def cancel_scan(self):
+        if self.index_thread is None:
+            return
+        self.index_thread.textures_found.disconnect(self.add_textures)
+        self.index_thread.scan_finished.disconnect(self.scan_finished)
+        self.index_thread.requestInterruption()
+        self.index_thread.wait()
+        self.index_thread = None
+        self.stop_button.setEnabled(False)
+        self.status_label.setText(f"{self.file_count} textures (stopped)")
+
+    def rescan(self):
+        self.cancel_scan()
+        TEXTURE_INDEX.invalidate(self.root_dir)
+        self.start_scan()
+
+    def choose_folder(self):
+        folder = QtWidgets.QFileDialog.getExistingDirectory(self, "Select Texture Folder", self.root_dir)
+        if folder:
+            self.root_dir = os.path.normpath(folder)
+            self.folder_field.setText(self.root_dir)
+            self.start_scan()
+
+    def add_textures(self, textures):
+        if self.sender() is not self.index_thread:
+            return
+        self.tree_view.setSortingEnabled(False)
+        for file_path, asset_name, texture_type, confidence in textures:
+            asset_name = asset_name or UNSORTED_ASSET
+            asset_item = self.asset_items.get(asset_name.lower())
+            if asset_item is None:
+                asset_item = QtGui.QStandardItem(asset_name)
+                self.asset_items[asset_name.lower()] = asset_item
+                self.model.appendRow([asset_item, QtGui.QStandardItem("")])
+
+            file_item = QtGui.QStandardItem(os.path.basename(file_path))
+            file_item.setData(file_path, PATH_ROLE)
+            file_item.setToolTip(file_path)
+            asset_item.appendRow([file_item, QtGui.QStandardItem(texture_type or "")])
+
+            if texture_type:
+                best = self.best_textures.setdefault(asset_name.lower(), {})
+                if confidence > best.get(texture_type, (None, 0.0))[1]:
+                    best[texture_type] = (file_path, confidence)
+
+        self.file_count += len(textures)
+        self.tree_view.setSortingEnabled(True)
+        self.status_label.setText(f"Scanning... {self.file_count} textures in {len(self.asset_items)} assets")
+
+    def scan_finished(self, file_count, completed):
+        if self.sender() is not self.index_thread:
+            return
+        self.index_thread.wait()
+        self.index_thread = None
+        self.stop_button.setEnabled(False)
+        state = "" if completed else " (stopped)"
+        self.status_label.setText(f"{self.file_count} textures in {len(self.asset_items)} assets{state}")
+
+    def item_double_clicked(self, index):
+        if self.proxy_model.mapToSource(index).parent().isValid():
+            self.accept()
+
+    def browse_files(self):
+        file_paths, _ = QtWidgets.QFileDialog.getOpenFileNames(
+            self, "Select Texture(s)", self.root_dir, "Image Files (*.jpg *.png *.exr *.hdr)"
+        )
+        if file_paths:
+            self.fallback_files = file_paths
+            self.accept()
+
+    def selected_files(self):
+        """Return the chosen file paths; a selected asset stands for its best texture per type."""
+        if self.fallback_files is not None:
+            return list(self.fallback_files)
+
+        file_paths = []
+        for index in self.tree_view.selectionModel().selectedRows(0):
+            source_index = self.proxy_model.mapToSource(index)
+            if source_index.parent().isValid():
+                file_paths.append(source_index.data(PATH_ROLE))
+            else:
+                asset_name = source_index.data().lower()
+                file_paths.extend(path for path, confidence in self.best_textures.get(asset_name, {}).values())
+        return list(dict.fromkeys(file_paths))
+
+    def done(self, result):
+        self.cancel_scan()
+        super(TextureBrowserDialog, self).done(result)
@@ -0,0 +1,212 @@
+"""
+lampTextureClassifier
+Lamp Material Setup (texture type classifier)
+
+Description:
+Precompiled, token based texture type classifier. File names are split into
+tokens (separators and camelCase), UDIM/version/resolution tokens are dropped
+and the remaining tokens are looked up in a keyword table. A keyword is never
+matched inside a longer word; only a "map"/"tex" affix (normalmap) is
+stripped, at a lower confidence. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import re
+import warnings
+from collections import namedtuple
+
+TEXTURE_KEYWORDS = {
+    "Base Color": ["basecolor", "albedo", "diffuse"],
+    "Roughness": ["roughness", "rough"],
+    "Metalness": ["metalness", "metal"],
+    "Specular": ["specular"],
+    "Normal": ["normal", "nmap"],
+    "Displacement": ["displacement", "disp", "height"]
+}
+
+EXTRA_KEYWORDS = {
+    "Metalness": ["metallic"],
+    "Specular": ["spec"],
+    "Normal": ["nrm"]
+}
+
+KEYWORDS_ENV_VAR = "LAMP_TEXTURE_KEYWORDS"
+
+Classification = namedtuple("Classification", ["texture_type", "confidence", "asset_name"])
+
+UNKNOWN = Classification(None, 0.0, None)
+
+_TOKEN_PATTERN = re.compile(
+    r"<[A-Za-z]+>"
+    r"|[uU]\d+_[vV]\d+"
+    r"|[vV]\d+(?![A-Za-z])"
+    r"|\d+[kK](?![a-z])"
+    r"|\d+[xX]\d+"
+    r"|\d+"
+    r"|([A-Z]+(?![a-z])|[A-Z]?[a-z]+)"
+    r"|(\n)"
+)
+_EXTENSION_PATTERN = re.compile(r"\.[A-Za-z][A-Za-z0-9]{1,4}$")
+_SEPARATORS = "_-. "
+
+EXACT_CONFIDENCE = 1.0
+PARTIAL_CONFIDENCE = 0.6
+AMBIGUOUS_PENALTY = 0.75
+# Affixes a keyword may carry within one token, as in "normalmap" or "texalbedo".
+PARTIAL_AFFIXES = ("texture", "map", "tex")
+MAX_KEYWORD_TOKENS = 3
+
+
+def _normalize_keyword(keyword):
+    return re.sub(r"[^a-z0-9]", "", keyword.lower())
+
+
+class TextureClassifier:
+    def __init__(self, keywords=None):
+        self._keywords = {}
+        for texture_type, type_keywords in (keywords or TEXTURE_KEYWORDS).items():
+            self._keywords[texture_type] = list(type_keywords)
+        self._compile()
+
+    @property
+    def texture_types(self):
+        return list(self._keywords)
+
+    def register(self, texture_type, keywords):
+        """
+        Add keywords to a known texture type. New types are rejected since
+        the dialog and the renderer creators have no slot for them.
+        """
+        if texture_type not in self._keywords:
+            raise ValueError(
+                f"Unknown texture type '{texture_type}', expected one of: {', '.join(self._keywords)}.")
+        type_keywords = self._keywords[texture_type]
+        for keyword in keywords:
+            if keyword not in type_keywords:
+                type_keywords.append(keyword)
+        self._compile()
+
+    def load_keywords(self, keywords_path):
+        with open(keywords_path, "r", encoding="utf-8") as keywords_file:
+            data = json.load(keywords_file)
+        unknown_types = [texture_type for texture_type in data if texture_type not in self._keywords]
+        if unknown_types:
+            raise ValueError(f"{keywords_path}: unknown texture types {', '.join(unknown_types)}.")
+        for texture_type, keywords in data.items():
+            self.register(texture_type, keywords)
+
+    def _compile(self):
+        self._lookup = {}
+        for texture_type, keywords in self._keywords.items():
+            for keyword in keywords:
+                self._lookup.setdefault(_normalize_keyword(keyword), texture_type)
+
+    def classify(self, file_name):
+        return self.classify_many([file_name])[0]
+
+    def classify_many(self, file_names):
+        """
+        Classify a whole listing with a single tokenizer pass over the joined
+        file names. Returns one Classification per input name.
+        """
+        if not file_names:
+            return []
+
+        stems = [_EXTENSION_PATTERN.sub("", os.path.basename(name)).replace("\n", " ") for name in file_names]
+        words_per_name = [[]]
+        for word, newline in _TOKEN_PATTERN.findall("\n".join(stems)):
+            if word:
+                words_per_name[-1].append(word.lower())
+            elif newline:
+                words_per_name.append([])
+
+        return [self._classify_words(stem, words) for stem, words in zip(stems, words_per_name)]
+
+    def _classify_words(self, stem, words):
+        if not words:
+            return UNKNOWN
+
+        lookup = self._lookup
+        matches = []
+        for first in range(len(words)):
+            joined = ""
+            for last in range(first, min(first + MAX_KEYWORD_TOKENS, len(words))):
+                joined += words[last]
+                texture_type = lookup.get(joined)
+                if texture_type:
+                    matches.append((EXACT_CONFIDENCE, last, first, texture_type))
+
+        if not matches:
+            for index, word in enumerate(words):
+                texture_type = next(filter(None, map(lookup.get, _affix_stems(word))), None)
+                if texture_type:
+                    matches.append((PARTIAL_CONFIDENCE, index, index, texture_type))
+
+        if not matches:
+            return UNKNOWN
+
+        confidence, last, first, texture_type = max(matches)
+        if any(match[3] != texture_type for match in matches):
+            confidence *= AMBIGUOUS_PENALTY
+
+        return Classification(texture_type, confidence, self._asset_name(stem, words, first, last))
+
+    @staticmethod
+    def _asset_name(stem, words, first, last):
+        lowered = stem.lower()
+        spans = []
+        cursor = 0
+        for word in words:
+            start = lowered.find(word, cursor)
+            cursor = start + len(word)
+            spans.append((start, cursor))
+
+        if first > 0:
+            start, end = spans[0][0], spans[first - 1][1]
+        elif last + 1 < len(words):
+            start, end = spans[last + 1][0], spans[-1][1]
+        else:
+            return None
+        return stem[start:end].strip(_SEPARATORS) or None
+
+
+def _affix_stems(word):
+    """Yield what is left of word without one of the PARTIAL_AFFIXES at its start or end."""
+    for affix in PARTIAL_AFFIXES:
+        if len(word) > len(affix):
+            if word.endswith(affix):
+                yield word[:-len(affix)]
+            if word.startswith(affix):
+                yield word[len(affix):]
+
+
+def _create_builtin_classifier():
+    classifier = TextureClassifier()
+    for texture_type, keywords in EXTRA_KEYWORDS.items():
+        classifier.register(texture_type, keywords)
+    return classifier
+
+
+def _create_default_classifier():
+    """
+    The built-in keywords plus the user's keywords file, if any. A broken
+    keywords file is reported and ignored so the plug-in still loads.
+    """
+    classifier = _create_builtin_classifier()
+    keywords_path = os.environ.get(KEYWORDS_ENV_VAR)
+    if keywords_path and os.path.isfile(keywords_path):
+        try:
+            classifier.load_keywords(keywords_path)
+        except (OSError, ValueError) as e:
+            warnings.warn(f"Ignoring the texture keywords in {keywords_path}: {e}")
+            classifier = _create_builtin_classifier()
+    return classifier
+
+
+DEFAULT_CLASSIFIER = _create_default_classifier()
@@ -0,0 +1,144 @@
+"""
+lampTextureConvert
+Lamp Material Setup (texture pre-conversion)
+
+Description:
+Converts source textures to mipmapped, tiled renderer textures (Arnold .tx
+with maketx, Redshift .rstexbin with redshiftTextureProcessor). Every
+conversion runs in its own child process, a pool of worker threads keeps up
+to max_workers of them busy. Sources whose converted file is newer than the
+source are skipped. A tile set (<UDIM> path) is converted tile by tile and
+reported as one result. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+import shlex
+import shutil
+import subprocess
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from lampTextureSets import tile_files, tiling_mode
+
+CONVERTERS = {
+    "Arnold": {
+        "extension": ".tx",
+        "executable": "maketx",
+        "location_env": "MTOA_LOCATION",
+        "command": ["{executable}", "-u", "--oiio", "{source}", "-o", "{output}"]
+    },
+    "Redshift": {
+        "extension": ".rstexbin",
+        "executable": "redshiftTextureProcessor",
+        "location_env": "REDSHIFT_COREDATAPATH",
+        "command": ["{executable}", "{source}"]
+    }
+}
+
+COMMAND_ENV_VAR = "LAMP_TEXTURE_CONVERT_COMMAND"
+
+ConversionResult = namedtuple("ConversionResult", ["source", "output", "status", "error"])
+
+
+class TextureConverter:
+    def __init__(self, renderer, command=None, max_workers=None):
+        if renderer not in CONVERTERS:
+            raise ValueError(f"Renderer {renderer} is not supported.")
+        self.renderer = renderer
+        self.extension = CONVERTERS[renderer]["extension"]
+        self.max_workers = max_workers or os.cpu_count() or 1
+
+        if command is None and os.environ.get(COMMAND_ENV_VAR):
+            command = shlex.split(os.environ[COMMAND_ENV_VAR])
+        self.command = command or CONVERTERS[renderer]["command"]
+        self._resolved_executable = None
+
+    def output_path(self, source):
+        return os.path.splitext(source)[0] + self.extension
+
+    def needs_conversion(self, source):
+        if source.lower().endswith(self.extension):
+            return False
+        output = self.output_path(source)
+        try:
+            return os.path.getmtime(output) < os.path.getmtime(source)
+        except OSError:
+            return True
+
+    def convert(self, sources):
+        """Convert every stale source and return one ConversionResult per unique source."""
+        sources = list(dict.fromkeys(source for source in sources if source))
+        tiles = {source: tile_files(source) for source in sources if tiling_mode(source)}
+        results = {}
+        stale = []
+        for source in dict.fromkeys(tile for source in sources for tile in tiles.get(source, [source])):
+            if not os.path.isfile(source):
+                results[source] = ConversionResult(source, None, "failed", "Source texture not found")
+            elif self.needs_conversion(source):
+                stale.append(source)
+            else:
+                results[source] = ConversionResult(source, self.output_path(source), "up-to-date", None)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(stale))) as executor:
+                for result in executor.map(self._convert_one, stale):
+                    results[result.source] = result
+
+        return [
+            self._tile_set_result(source, [results[tile] for tile in tiles[source]]) if source in tiles else results[source]
+            for source in sources
+        ]
+
+    def convert_async(self, sources, callback):
+        """Run convert() on a background thread and pass its results to callback."""
+        thread = threading.Thread(target=lambda: callback(self.convert(sources)), daemon=True)
+        thread.start()
+        return thread
+
+    def _tile_set_result(self, source, tile_results):
+        if not tile_results:
+            return ConversionResult(source, None, "failed", "No tiles found")
+        failed = [result for result in tile_results if result.status == "failed"]
+        if failed:
+            return ConversionResult(source, None, "failed", "; ".join(f"{result.source}: {result.error}" for result in failed))
+        status = "converted" if any(result.status == "converted" for result in tile_results) else "up-to-date"
+        return ConversionResult(source, self.output_path(source), status, None)
+
+    def _convert_one(self, source):
+        output = self.output_path(source)
+        arguments = [
+            argument.format(executable=self._executable(), source=source, output=output)
+            for argument in self.command
+        ]
+        try:
+            completed = subprocess.run(arguments, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+        except OSError as e:
+            return ConversionResult(source, output, "failed", str(e))
+
+        if completed.returncode != 0 or not os.path.isfile(output):
+            return ConversionResult(source, output, "failed", completed.stdout.strip() or f"Exit code {completed.returncode}")
+        return ConversionResult(source, output, "converted", None)
+
+    def _executable(self):
+        if self._resolved_executable is None:
+            self._resolved_executable = self._find_executable()
+        return self._resolved_executable
+
+    def _find_executable(self):
+        converter = CONVERTERS[self.renderer]
+        executable = shutil.which(converter["executable"])
+        if executable:
+            return executable
+
+        location = os.environ.get(converter["location_env"])
+        if location:
+            candidate = shutil.which(converter["executable"], path=os.path.join(location, "bin"))
+            if candidate:
+                return candidate
+        return converter["executable"]
@@ -0,0 +1,152 @@
+"""
+lampTextureIndex
+Lamp Material Setup (persistent texture directory index)
+
+Description:
+Walks texture libraries with os.scandir and streams the texture files of
+every directory to a callback, so a browser can fill its view while the scan
+is still running. Directory listings are kept in an on-disk JSON index and
+reused as long as the directory's modification time is unchanged, so
+re-scanning a known library only costs one stat per directory. Scans can be
+cancelled between directories and every few hundred entries. Has no Maya
+dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import threading
+
+from lampTextureSets import TEXTURE_EXTENSIONS
+
+INDEX_PATH_ENV = "LAMP_TEXTURE_INDEX_PATH"
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".lampMaterialSetup", "textureIndex.json")
+INDEX_VERSION = 1
+CANCEL_CHECK_INTERVAL = 256
+
+
+class TextureIndex:
+    def __init__(self, index_path=None, extensions=TEXTURE_EXTENSIONS):
+        self.index_path = index_path or os.environ.get(INDEX_PATH_ENV) or DEFAULT_INDEX_PATH
+        self.extensions = tuple(extensions)
+        self._directories = None
+        self._dirty = False
+        self._lock = threading.RLock()
+
+    def scan(self, root_dir, on_files=None, is_cancelled=None):
+        """
+        Walk root_dir depth first and call on_files(file_paths) for every
+        directory that contains textures. Returns (file_paths, completed);
+        completed is False when is_cancelled() stopped the scan.
+        """
+        self._load()
+        file_paths = []
+        pending = [os.path.normpath(os.path.abspath(root_dir))]
+        completed = True
+        try:
+            while pending:
+                if is_cancelled and is_cancelled():
+                    completed = False
+                    break
+
+                directory = pending.pop()
+                listing = self._list_directory(directory, is_cancelled)
+                if listing is None:
+                    completed = False
+                    break
+
+                files, subdirectories = listing
+                if files:
+                    directory_files = [os.path.join(directory, file_name) for file_name in files]
+                    file_paths.extend(directory_files)
+                    if on_files:
+                        on_files(directory_files)
+                pending.extend(os.path.join(directory, name) for name in reversed(subdirectories))
+        finally:
+            self.save()
+        return file_paths, completed
+
+    def invalidate(self, root_dir=None):
+        """Forget root_dir and everything below it, or the whole index."""
+        with self._lock:
+            self._load()
+            if root_dir is None:
+                self._directories.clear()
+            else:
+                root_dir = os.path.normpath(os.path.abspath(root_dir))
+                prefix = root_dir.rstrip(os.sep) + os.sep
+                for directory in [d for d in self._directories if d == root_dir or d.startswith(prefix)]:
+                    del self._directories[directory]
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"version": INDEX_VERSION, "extensions": list(self.extensions), "directories": self._directories}
+            temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                with open(temp_path, "w", encoding="utf-8") as index_file:
+                    json.dump(data, index_file, separators=(",", ":"))
+                os.replace(temp_path, self.index_path)
+                self._dirty = False
+            except OSError:
+                pass
+
+    def _load(self):
+        with self._lock:
+            if self._directories is not None:
+                return
+            self._directories = {}
+            try:
+                with open(self.index_path, "r", encoding="utf-8") as index_file:
+                    data = json.load(index_file)
+            except (OSError, ValueError):
+                return
+            if not isinstance(data, dict) or not isinstance(data.get("directories"), dict):
+                return
+            if data.get("version") == INDEX_VERSION and tuple(data.get("extensions", ())) == self.extensions:
+                self._directories = data["directories"]
+
+    def _list_directory(self, directory, is_cancelled):
+        try:
+            modification_time = os.stat(directory).st_mtime
+        except OSError:
+            return [], []
+
+        with self._lock:
+            cached = self._directories.get(directory)
+        if isinstance(cached, dict) and cached.get("mtime") == modification_time:
+            return cached.get("files", []), cached.get("dirs", [])
+
+        files = []
+        subdirectories = []
+        try:
+            with os.scandir(directory) as entries:
+                for count, entry in enumerate(entries, 1):
+                    if count % CANCEL_CHECK_INTERVAL == 0 and is_cancelled and is_cancelled():
+                        return None
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirectories.append(entry.name)
+                        elif entry.name.lower().endswith(self.extensions):
+                            files.append(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return [], []
+
+        files.sort()
+        subdirectories.sort()
+        with self._lock:
+            self._directories[directory] = {"mtime": modification_time, "files": files, "dirs": subdirectories}
+            self._dirty = True
+        return files, subdirectories
+
+
+TEXTURE_INDEX = TextureIndex()
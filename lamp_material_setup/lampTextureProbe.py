@@ -0,0 +1,173 @@
+"""
+lampTextureProbe
+Lamp Material Setup (texture header probing)
+
+Description:
+Reads only the headers of EXR, PNG, JPG and HDR files on a thread pool and
+picks color space, alphaIsLuminance and the output plug for every file node.
+Tile sets are probed through their first tile; the modification time is
+the newest of all tiles. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import os
+import struct
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from lampTextureSets import tile_files
+
+LINEAR_COLOR_SPACE = "scene-linear Rec.709-sRGB"
+RAW_COLOR_SPACE = "Raw"
+
+COLOR_TEXTURE_TYPES = ["Base Color", "Specular"]
+
+MAX_PROBE_WORKERS = 16
+EXR_HEADER_LIMIT = 1 << 16
+
+TextureInfo = namedtuple("TextureInfo", [
+    "path", "format", "width", "height", "channels", "bit_depth", "is_float", "mtime"
+])
+
+FileSettings = namedtuple("FileSettings", ["color_space", "alpha_is_luminance", "scalar_output"])
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 3, 4: 2, 6: 4}
+_EXR_MAGIC = b"\x76\x2f\x31\x01"
+_EXR_PIXEL_BITS = {0: 32, 1: 16, 2: 32}
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _read_png(header_file):
+    header = header_file.read(26)
+    if len(header) < 26 or not header.startswith(_PNG_SIGNATURE) or header[12:16] != b"IHDR":
+        raise ValueError("Not a PNG file")
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", header[16:26])
+    return "png", width, height, _PNG_CHANNELS.get(color_type, 3), bit_depth, False
+
+
+def _read_jpeg(header_file):
+    if header_file.read(2) != b"\xff\xd8":
+        raise ValueError("Not a JPEG file")
+    while True:
+        marker = header_file.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            raise ValueError("JPEG frame header not found")
+        if marker[1] == 0xFF:
+            header_file.seek(-1, os.SEEK_CUR)
+            continue
+        length = struct.unpack(">H", header_file.read(2))[0]
+        if marker[1] in _JPEG_SOF_MARKERS:
+            bit_depth, height, width, channels = struct.unpack(">BHHB", header_file.read(6))
+            return "jpg", width, height, channels, bit_depth, False
+        header_file.seek(length - 2, os.SEEK_CUR)
+
+
+def _read_exr(header_file):
+    header = header_file.read(EXR_HEADER_LIMIT)
+    if not header.startswith(_EXR_MAGIC):
+        raise ValueError("Not an OpenEXR file")
+
+    width = height = 0
+    channel_bits = []
+    offset = 8
+    while header[offset:offset + 1] != b"\x00":
+        name_end = header.index(b"\x00", offset)
+        type_end = header.index(b"\x00", name_end + 1)
+        name = header[offset:name_end]
+        size = struct.unpack("<i", header[type_end + 1:type_end + 5])[0]
+        value = header[type_end + 5:type_end + 5 + size]
+        offset = type_end + 5 + size
+
+        if name == b"channels":
+            position = 0
+            while value[position:position + 1] not in (b"\x00", b""):
+                channel_end = value.index(b"\x00", position)
+                pixel_type = struct.unpack("<i", value[channel_end + 1:channel_end + 5])[0]
+                channel_bits.append(_EXR_PIXEL_BITS.get(pixel_type, 32))
+                position = channel_end + 17
+        elif name == b"dataWindow":
+            x_min, y_min, x_max, y_max = struct.unpack("<iiii", value)
+            width, height = x_max - x_min + 1, y_max - y_min + 1
+
+    bit_depth = max(channel_bits) if channel_bits else 16
+    return "exr", width, height, len(channel_bits), bit_depth, True
+
+
+def _read_hdr(header_file):
+    if not header_file.readline().startswith((b"#?RADIANCE", b"#?RGBE")):
+        raise ValueError("Not a Radiance HDR file")
+    while header_file.readline().strip():
+        pass
+    resolution = header_file.readline().split()
+    height, width = int(resolution[1]), int(resolution[3])
+    if resolution[0][1:2] == b"X":
+        height, width = width, height
+    return "hdr", width, height, 3, 32, True
+
+
+_READERS = {
+    ".png": _read_png,
+    ".jpg": _read_jpeg,
+    ".jpeg": _read_jpeg,
+    ".exr": _read_exr,
+    ".hdr": _read_hdr
+}
+
+
+def probe_texture(file_path):
+    """Return TextureInfo for file_path, or None if its header cannot be read."""
+    reader = _READERS.get(os.path.splitext(file_path)[1].lower())
+    if reader is None:
+        return None
+
+    tiles = tile_files(file_path)
+    if not tiles:
+        return None
+
+    try:
+        with open(tiles[0], "rb") as header_file:
+            header = reader(header_file)
+        mtime = max(os.path.getmtime(tile) for tile in tiles)
+    except (OSError, ValueError, IndexError, struct.error):
+        return None
+
+    return TextureInfo(file_path, *header, mtime)
+
+
+def probe_textures(file_paths, max_workers=MAX_PROBE_WORKERS):
+    """Probe every unique path on a thread pool and return {path: TextureInfo or None}."""
+    unique_paths = list(dict.fromkeys(path for path in file_paths if path))
+    if len(unique_paths) <= 1:
+        return {path: probe_texture(path) for path in unique_paths}
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_paths))) as executor:
+        return dict(zip(unique_paths, executor.map(probe_texture, unique_paths)))
+
+
+def choose_file_settings(texture_type, info, use_substance_style):
+    """
+    Pick (color_space, alpha_is_luminance, scalar_output) for a file node.
+    Without header information the Substance-style defaults are used.
+    Normal maps are always Raw without alphaIsLuminance, probed or not.
+    """
+    if texture_type == "Normal":
+        return FileSettings(RAW_COLOR_SPACE, False, "outAlpha")
+
+    if info is None:
+        color_space = RAW_COLOR_SPACE if use_substance_style and texture_type in ["Roughness", "Metalness", "Specular"] else None
+        alpha_is_luminance = use_substance_style and texture_type in ["Roughness", "Metalness"]
+        return FileSettings(color_space, alpha_is_luminance, "outAlpha")
+
+    if texture_type in COLOR_TEXTURE_TYPES and not (texture_type == "Specular" and use_substance_style):
+        return FileSettings(LINEAR_COLOR_SPACE if info.is_float else None, False, "outAlpha")
+
+    if info.channels == 1 or (texture_type == "Displacement" and info.channels == 3):
+        return FileSettings(RAW_COLOR_SPACE, False, "outColorR")
+    if info.channels in (2, 4) and not use_substance_style:
+        return FileSettings(RAW_COLOR_SPACE, False, "outAlpha")
+    return FileSettings(RAW_COLOR_SPACE, True, "outAlpha")
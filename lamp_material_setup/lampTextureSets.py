@@ -0,0 +1,328 @@
+"""
+lampTextureSets
+Lamp Material Setup (texture set discovery)
+
+Description:
+Groups texture files into per-asset texture sets, either by scanning a
+texture library or by reading a JSON manifest. Tiled textures (UDIM, and
+ZBrush/Mudbox u_v tiles) are collapsed into one path with a <UDIM>, <u>_<v>
+or <U>_<V> token. Inside a tile_scan() block, such as a batch build, every
+directory is scanned for tiles once. Has no Maya dependency.
+
+Version:    2.1
+Author:     rabbitGraned
+License:    Apache 2.0
+
+"""
+
+import json
+import os
+import re
+import threading
+import warnings
+from collections import namedtuple
+from contextlib import contextmanager
+from pathlib import Path
+
+from lampTextureClassifier import DEFAULT_CLASSIFIER, TEXTURE_KEYWORDS
+
+TEXTURE_EXTENSIONS = (".jpg", ".png", ".exr", ".hdr")
+
+# Separates the folder from the asset name in the key of a per-folder texture set.
+FOLDER_SEPARATOR = "/"
+
+UDIM_TOKEN = "<UDIM>"
+ZBRUSH_TOKEN = "<u>_<v>"
+MUDBOX_TOKEN = "<U>_<V>"
+
+# file.uvTilingMode values
+TILING_MODES = {
+    ZBRUSH_TOKEN: 1,
+    MUDBOX_TOKEN: 2,
+    UDIM_TOKEN: 3
+}
+
+TileSet = namedtuple("TileSet", ["pattern", "tiling_mode", "files", "tiles", "missing"])
+
+_INVALID_NAME_CHARS = re.compile(r"[^A-Za-z0-9_]+")
+_UDIM_TILE = re.compile(r"^(.*[._])(1\d{3})(\.[^.]+)$")
+_UV_TILE = re.compile(r"^(.*[._])[uU](\d+)_[vV](\d+)(\.[^.]+)$")
+
+_scan_lock = threading.Lock()
+_scan_cache = None
+_scan_depth = 0
+
+
+def maya_safe_name(name):
+    safe_name = _INVALID_NAME_CHARS.sub("_", name).strip("_")
+    if not safe_name:
+        return "asset"
+    if safe_name[0].isdigit():
+        safe_name = f"_{safe_name}"
+    return safe_name
+
+
+def split_asset_key(key):
+    """Split a texture set key into (folder, asset name); the folder is None for a plain asset name."""
+    folder, separator, asset_name = key.rpartition(FOLDER_SEPARATOR)
+    return (folder if separator else None), asset_name
+
+
+def asset_node_name(key):
+    """A Maya node name for a texture set key, "folder/asset" becoming "folder_asset"."""
+    folder, asset_name = split_asset_key(key)
+    if folder:
+        asset_name = "_".join(folder.split(FOLDER_SEPARATOR) + [asset_name])
+    return maya_safe_name(asset_name)
+
+
+def tiling_mode(file_path):
+    """Return the uvTilingMode for a path with a tile token, 0 for a plain path."""
+    for token, mode in TILING_MODES.items():
+        if token in file_path:
+            return mode
+    return 0
+
+
+def _tile_coordinates(kind, tile):
+    if kind == UDIM_TOKEN:
+        return (tile - 1001) % 10, (tile - 1001) // 10
+    return tile
+
+
+def _tile_label(kind, coordinates):
+    u, v = coordinates
+    if kind == UDIM_TOKEN:
+        return str(1001 + u + v * 10)
+    return f"u{u}_v{v}"
+
+
+def _parse_tile(file_name):
+    match = _UDIM_TILE.match(file_name)
+    if match and int(match.group(2)) >= 1001:
+        return (match.group(1), match.group(3).lower(), UDIM_TOKEN), int(match.group(2))
+    match = _UV_TILE.match(file_name)
+    if match:
+        return (match.group(1), match.group(4).lower(), ZBRUSH_TOKEN), (int(match.group(2)), int(match.group(3)))
+    return None, None
+
+
+def collapse_tile_sets(file_paths):
+    """
+    Replace the tiles of every tile set in file_paths by one token path.
+    Returns (file_paths, {token path: TileSet}); other paths are kept as they are.
+    """
+    groups = {}
+    order = []
+    for file_path in file_paths:
+        directory, file_name = os.path.split(file_path)
+        key, tile = _parse_tile(file_name)
+        if key is None:
+            order.append(file_path)
+            continue
+        key = (directory,) + key
+        if key not in groups:
+            groups[key] = []
+            order.append(key)
+        groups[key].append((tile, file_path, os.path.splitext(file_name)[1]))
+
+    tile_sets = {}
+    collapsed_paths = []
+    for item in order:
+        if isinstance(item, str):
+            collapsed_paths.append(item)
+            continue
+
+        directory, prefix, _, kind = item
+        tiles = sorted(groups[item])
+        if kind == UDIM_TOKEN and len(tiles) == 1 and tiles[0][0] != 1001 and prefix.endswith("_"):
+            # A lone "_1024" is more likely a resolution than a tile.
+            collapsed_paths.append(tiles[0][1])
+            continue
+        if kind == ZBRUSH_TOKEN and all(u > 0 and v > 0 for (u, v), _, _ in tiles):
+            kind = MUDBOX_TOKEN
+
+        coordinates = {_tile_coordinates(kind, tile) for tile, _, _ in tiles}
+        u_range = range(min(u for u, _ in coordinates), max(u for u, _ in coordinates) + 1)
+        v_range = range(min(v for _, v in coordinates), max(v for _, v in coordinates) + 1)
+        missing = [
+            _tile_label(kind, (u, v)) for v in v_range for u in u_range if (u, v) not in coordinates
+        ]
+
+        pattern = os.path.join(directory, f"{prefix}{kind}{tiles[0][2]}")
+        tile_sets[pattern] = TileSet(
+            pattern, TILING_MODES[kind], [file_path for _, file_path, _ in tiles],
+            [_tile_label(kind, _tile_coordinates(kind, tile)) for tile, _, _ in tiles], missing)
+        collapsed_paths.append(pattern)
+    return collapsed_paths, tile_sets
+
+
+def resolve_tile_sets(file_paths, extensions=TEXTURE_EXTENSIONS):
+    """
+    Map every tile or token path in file_paths to its whole tile set. Every
+    directory that holds a tile is scanned once. Returns (file_paths, {token path: TileSet}).
+    """
+    directory_sets = {}
+    resolved_paths = []
+    tile_sets = {}
+    for file_path in file_paths:
+        directory, file_name = os.path.split(file_path)
+        if _parse_tile(file_name)[0] is None and not tiling_mode(file_name):
+            resolved_paths.append(file_path)
+            continue
+
+        if directory not in directory_sets:
+            directory_sets[directory] = _directory_tile_sets(directory, extensions)
+        for pattern, tile_set in directory_sets[directory].items():
+            if file_path == pattern or file_path in tile_set.files:
+                resolved_paths.append(pattern)
+                tile_sets[pattern] = tile_set
+                break
+        else:
+            resolved_paths.append(file_path)
+    return list(dict.fromkeys(resolved_paths)), tile_sets
+
+
+@contextmanager
+def tile_scan(tile_sets=None):
+    """
+    Within the block every directory is scanned for tiles at most once, and
+    the TileSets of tile_sets ({token path: TileSet}, as recorded by
+    collect_texture_sets) are used without a scan. Blocks nest; threads
+    started inside the block share the scans.
+    """
+    global _scan_cache, _scan_depth
+    with _scan_lock:
+        if _scan_depth == 0:
+            _scan_cache = {"tile_sets": {}, "directories": {}}
+        _scan_depth += 1
+        _scan_cache["tile_sets"].update(tile_sets or {})
+    try:
+        yield
+    finally:
+        with _scan_lock:
+            _scan_depth -= 1
+            if _scan_depth == 0:
+                _scan_cache = None
+
+
+def tile_files(file_path, extensions=TEXTURE_EXTENSIONS):
+    """Return the existing tiles of a token path (one directory scan), or [file_path]."""
+    if not tiling_mode(file_path):
+        return [file_path]
+    cache = _scan_cache
+    tile_set = cache["tile_sets"].get(file_path) if cache else None
+    if tile_set is None:
+        tile_set = _directory_tile_sets(os.path.dirname(file_path), extensions).get(file_path)
+    return tile_set.files if tile_set else []
+
+
+def _directory_tile_sets(directory, extensions):
+    cache = _scan_cache
+    if cache is None:
+        return collapse_tile_sets(_list_textures(directory, extensions))[1]
+    key = (directory, tuple(extensions))
+    with _scan_lock:
+        if key not in cache["directories"]:
+            cache["directories"][key] = collapse_tile_sets(_list_textures(directory, extensions))[1]
+        return cache["directories"][key]
+
+
+def _list_textures(directory, extensions):
+    try:
+        with os.scandir(directory or ".") as entries:
+            return sorted(
+                os.path.join(directory, entry.name) for entry in entries
+                if entry.name.lower().endswith(extensions) and entry.is_file())
+    except OSError:
+        return []
+
+
+def collect_texture_sets(root_dir, extensions=TEXTURE_EXTENSIONS, classifier=None, tile_sets=None):
+    """
+    Walk root_dir once and return {asset_name: {texture_type: file_path}}.
+    Tile sets are collapsed into token paths and, if tile_sets is a dict,
+    recorded in it. An asset whose textures are spread over several folders
+    is one set, unless two folders hold the same texture type: then every
+    folder makes its own set, named "folder/asset", and a warning is issued.
+    """
+    classifier = classifier or DEFAULT_CLASSIFIER
+    file_paths = []
+    for dir_path, _, file_names in os.walk(root_dir):
+        file_paths.extend(
+            os.path.join(dir_path, file_name) for file_name in sorted(file_names)
+            if file_name.lower().endswith(extensions))
+
+    file_paths, found_tile_sets = collapse_tile_sets(file_paths)
+    if tile_sets is not None:
+        tile_sets.update(found_tile_sets)
+
+    folder_sets = {}
+    asset_names = {}
+    confidences = {}
+    for file_path, classification in zip(file_paths, classifier.classify_many(file_paths)):
+        texture_type, confidence, asset_name = classification
+        if not texture_type or not asset_name:
+            continue
+
+        asset_name = asset_names.setdefault(asset_name.lower(), asset_name)
+        directory = os.path.dirname(file_path)
+        key = (asset_name, directory, texture_type)
+        if confidence > confidences.get(key, 0.0):
+            confidences[key] = confidence
+            folder_sets.setdefault(asset_name, {}).setdefault(directory, {})[texture_type] = file_path
+
+    texture_sets = {}
+    for asset_name, folders in folder_sets.items():
+        texture_types = [texture_type for textures in folders.values() for texture_type in textures]
+        if len(texture_types) == len(set(texture_types)):
+            texture_sets[asset_name] = {
+                texture_type: file_path for textures in folders.values() for texture_type, file_path in textures.items()
+            }
+            continue
+
+        names = []
+        for directory, textures in folders.items():
+            name = _folder_asset_name(root_dir, directory, asset_name)
+            texture_sets[name] = textures
+            names.append(name)
+        warnings.warn(f"Asset '{asset_name}' has textures of the same type in several folders, building one set per folder: {', '.join(names)}.")
+    return texture_sets
+
+
+def _folder_asset_name(root_dir, directory, asset_name):
+    folder = os.path.relpath(directory, root_dir)
+    if folder == os.curdir:
+        return asset_name
+    return FOLDER_SEPARATOR.join(Path(folder).parts + (asset_name,))
+
+
+def load_texture_manifest(manifest_path):
+    """
+    Read a JSON manifest of the form
+    {"assets": {"crate": {"Base Color": "crate/crate_BaseColor.png", ...}}}.
+    Relative paths are resolved against the manifest's folder. A manifest
+    with a "preset" key is read through a Substance Painter export preset
+    (see lampSubstanceExport).
+    """
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+        data = json.load(manifest_file)
+
+    if isinstance(data, dict) and "preset" in data:
+        from lampSubstanceExport import load_substance_manifest
+        return load_substance_manifest(manifest_path, data)
+
+    assets = data.get("assets", data)
+    if not isinstance(assets, dict):
+        raise ValueError(f"Manifest {manifest_path} must map asset names to texture sets.")
+
+    texture_sets = {}
+    for asset_name, textures in assets.items():
+        texture_sets[asset_name] = {}
+        for texture_type, file_path in textures.items():
+            if texture_type not in TEXTURE_KEYWORDS:
+                raise ValueError(f"Unknown texture type '{texture_type}' for asset '{asset_name}' in {manifest_path}.")
+            if file_path:
+                texture_sets[asset_name][texture_type] = str(manifest_path.parent / file_path)
+    return texture_sets
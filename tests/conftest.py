@@ -0,0 +1,42 @@
+"""
+Test setup: the core modules run against the in-memory lampFakeMaya backend
+from the benchmarks, so the suite needs neither Maya nor Qt.
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, os.path.join(ROOT, "lamp_material_setup"))
+
+import lampFakeMaya
+
+lampFakeMaya.install()
+
+import maya.cmds as cmds
+
+# Like a Maya session with the module installed: commits go through lampApplyGraph.
+cmds.loadPlugin("lampMSPlugin")
+
+
+@pytest.fixture
+def scene():
+    """An empty fake scene; the file node cache and material index are reset with it."""
+    return lampFakeMaya.new_scene()
+
+
+@pytest.fixture
+def texture_dir(tmp_path):
+    """Create empty texture files under tmp_path: texture_dir("crate_BaseColor.png", ...)."""
+    def create(*file_names):
+        paths = []
+        for file_name in file_names:
+            path = tmp_path / file_name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"")
+            paths.append(str(path))
+        return paths
+    return create
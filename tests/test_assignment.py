@@ -0,0 +1,31 @@
+import maya.cmds as cmds
+
+from lampAssignment import assign_material, material_name_for, members_outside
+
+
+def make_sg(name="crateSG"):
+    return cmds.sets(renderable=True, noSurfaceShader=True, empty=True, name=name)
+
+
+def test_material_name_for():
+    assert material_name_for(["|grp|rock_01", "rock_02"]) == "rockM"
+    assert material_name_for(["crate", "barrel"]) == "crateM"
+    assert material_name_for([]) == "newMaterial"
+
+
+def test_assign_material_reports_failures(scene):
+    crate = scene.create_mesh("crate")
+    sg = make_sg()
+    assignment = assign_material([crate, "|missing"], sg)
+    assert assignment.assigned == [crate]
+    assert list(assignment.failed) == ["|missing"]
+    assert cmds.sets(sg, query=True) == ["|crate|crateShape"]
+
+
+def test_members_outside(scene):
+    crate, barrel = scene.create_mesh("crate"), scene.create_mesh("barrel")
+    sg = make_sg()
+    assign_material([crate, barrel], sg)
+    assert members_outside(sg, [crate, barrel]) == []
+    assert members_outside(sg, [crate]) == ["|barrel|barrelShape"]
+    assert members_outside(sg, ["crate.f[0:3]"]) == ["|barrel|barrelShape"]
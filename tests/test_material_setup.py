@@ -0,0 +1,249 @@
+import json
+
+import maya.cmds as cmds
+import pytest
+
+import lampMaterialSetup
+from lampMaterialSetup import MaterialBatchBuilder, MaterialFactory, find_lamp_material
+from lampSceneIndex import CONTENT_HASH_ATTR, FILE_NODE_CACHE, MATERIAL_STATE_ATTR
+from lampTextureProbe import TextureInfo
+
+TEXTURES = {
+    "Base Color": "/tex/crate/crate_BaseColor.png",
+    "Roughness": "/tex/crate/crate_Roughness.png",
+    "Normal": "/tex/crate/crate_Normal.png"
+}
+
+
+def build(textures, name="crateM", renderer="Arnold", normal_map_type="aiNormalMap", reuse=True):
+    creator = MaterialFactory.create_material(renderer, name, normal_map_type)
+    creator.reuse_existing = reuse
+    material, sg = creator.connect_textures(textures, True, True, normal_map_type, texture_info={})
+    return creator, material, sg
+
+
+def update(material, sg, textures, renderer="Arnold", normal_map_type="aiNormalMap"):
+    creator = MaterialFactory.create_updater(material, sg, renderer, normal_map_type)
+    return creator.update_textures(material, sg, textures, True, True, normal_map_type, texture_info={})
+
+
+def source(plug):
+    connections = cmds.listConnections(plug, source=True, destination=False, plugs=True) or []
+    return connections[0] if connections else None
+
+
+def file_path(plug):
+    return cmds.getAttr(source(plug).split(".")[0] + ".fileTextureName")
+
+
+def test_connect_textures(scene):
+    _, material, sg = build(TEXTURES)
+    assert cmds.nodeType(material) == "aiStandardSurface"
+    assert source(f"{sg}.surfaceShader") == f"{material}.outColor"
+    assert file_path(f"{material}.baseColor") == TEXTURES["Base Color"]
+    assert file_path(f"{material}.specularRoughness") == TEXTURES["Roughness"]
+    state = json.loads(cmds.getAttr(f"{material}.{MATERIAL_STATE_ATTR}"))
+    assert set(state["textures"]) == set(TEXTURES)
+    assert cmds.getAttr(f"{material}.{CONTENT_HASH_ATTR}")
+
+
+def test_identical_material_is_reused(scene):
+    _, material, sg = build(TEXTURES)
+    creator, reused, reused_sg = build(TEXTURES, name="otherM")
+    assert creator.reused
+    assert (reused, reused_sg) == (material, sg)
+
+    creator, other, _ = build(TEXTURES, name="otherM", reuse=False)
+    assert not creator.reused and other != material
+
+
+def test_file_nodes_are_shared(scene):
+    _, first, _ = build(TEXTURES, reuse=False)
+    _, second, _ = build(TEXTURES, name="otherM", reuse=False)
+    assert source(f"{first}.baseColor") == source(f"{second}.baseColor")
+
+
+def test_file_nodes_share_one_placement(scene):
+    _, material, _ = build(TEXTURES)
+    file_node = source(f"{material}.baseColor").split(".")[0]
+    place2d_plugs = cmds.listConnections(file_node, source=True, destination=False, plugs=True, type="place2dTexture")
+    assert sorted(place2d_plugs) == ["lampPlace2dTexture.outUV", "lampPlace2dTexture.outUvFilterSize"]
+
+
+def test_update_swaps_changed_texture(scene):
+    _, material, sg = build(TEXTURES)
+    old_file_node = source(f"{material}.baseColor").split(".")[0]
+    textures = dict(TEXTURES, **{"Base Color": "/tex/crate/crate_BaseColor_v2.png"})
+    update(material, sg, textures)
+    assert file_path(f"{material}.baseColor") == textures["Base Color"]
+    assert file_path(f"{material}.specularRoughness") == TEXTURES["Roughness"]
+    assert not cmds.objExists(old_file_node)
+
+
+def test_update_removes_texture(scene):
+    _, material, sg = build(TEXTURES)
+    update(material, sg, {"Base Color": TEXTURES["Base Color"]})
+    assert source(f"{material}.specularRoughness") is None
+    assert source(f"{material}.normalCamera") is None
+    assert find_lamp_material([], "Arnold") == (None, None)
+
+
+MASK = "/tex/crate/crate_mask.png"
+
+
+def test_update_keeps_other_slots_of_shared_file_node(scene):
+    _, material, sg = build({"Roughness": MASK, "Metalness": MASK})
+    assert source(f"{material}.specularRoughness").split(".")[0] == source(f"{material}.metalness").split(".")[0]
+    update(material, sg, {"Roughness": "/tex/crate/crate_Roughness.png", "Metalness": MASK})
+    assert file_path(f"{material}.specularRoughness") == "/tex/crate/crate_Roughness.png"
+    assert file_path(f"{material}.metalness") == MASK
+
+
+def test_update_slot_of_file_node_created_for_another_material(scene):
+    _, first, _ = build({"Base Color": TEXTURES["Base Color"], "Roughness": MASK}, name="firstM")
+    _, second, second_sg = build({"Metalness": MASK}, name="secondM")
+    mask_node = source(f"{first}.specularRoughness").split(".")[0]
+    assert source(f"{second}.metalness").split(".")[0] == mask_node
+
+    update(second, second_sg, {"Metalness": "/tex/crate/crate_Metalness.png"})
+    assert file_path(f"{second}.metalness") == "/tex/crate/crate_Metalness.png"
+    assert source(f"{first}.specularRoughness").split(".")[0] == mask_node
+
+    update(second, second_sg, {"Base Color": TEXTURES["Base Color"], "Metalness": MASK})
+    assert source(f"{second}.metalness").split(".")[0] == mask_node
+    update(second, second_sg, {"Base Color": TEXTURES["Base Color"]})
+    assert source(f"{second}.metalness") is None
+    assert file_path(f"{first}.specularRoughness") == MASK
+
+
+def test_material_state_takes_modification_times_from_probe(scene, texture_dir):
+    probed, unprobed = texture_dir("crate_BaseColor.png", "crate_Roughness.png")
+    creator = MaterialFactory.create_material("Arnold", "crateM", "aiNormalMap")
+    texture_info = {probed: TextureInfo(probed, "png", 8, 8, 3, 8, False, 123.0)}
+    state = creator.material_state({"Base Color": probed, "Roughness": unprobed}, True, texture_info)
+    assert state["textures"]["Base Color"] == [probed, 123.0]
+    assert state["textures"]["Roughness"][1] is not None
+
+
+def test_batch_build_assigns_by_asset_name(scene):
+    transform = scene.create_mesh("crate_geo")
+    builder = MaterialBatchBuilder("Arnold", "aiNormalMap", enable_normal_displacement=True)
+    results = builder.build({"crate": TEXTURES})
+    assert results[0]["error"] is None
+    assert find_lamp_material([transform]) == (results[0]["material"], results[0]["sg"])
+
+
+def test_update_applies_template_shader_attributes(scene):
+    _, material, sg = build(TEXTURES)
+    creator = MaterialFactory.create_updater(material, sg, "Arnold", "aiNormalMap", "arnold_skin")
+    creator.update_textures(material, sg, TEXTURES, True, True, "aiNormalMap", texture_info={})
+    assert cmds.getAttr(f"{material}.subsurface") == 1.0
+    assert cmds.getAttr(f"{material}.subsurfaceScale") == 0.1
+    assert file_path(f"{material}.subsurfaceColor") == TEXTURES["Base Color"]
+
+    update(material, sg, TEXTURES)
+    assert cmds.getAttr(f"{material}.subsurface") == 0.0
+    assert cmds.getAttr(f"{material}.subsurfaceScale") == 1.0
+    assert source(f"{material}.subsurfaceColor") is None
+
+
+def test_update_rejects_template_for_another_shader_type(scene, tmp_path):
+    _, material, sg = build(TEXTURES)
+    template_path = tmp_path / "toon.json"
+    template_path.write_text(json.dumps({"renderer": "Arnold", "shader": {"type": "aiToon"}}))
+    creator = MaterialFactory.create_updater(material, sg, "Arnold", "aiNormalMap", str(template_path))
+    with pytest.raises(ValueError, match="needs a aiToon"):
+        creator.update_textures(material, sg, TEXTURES, True, True, "aiNormalMap", texture_info={})
+    assert file_path(f"{material}.baseColor") == TEXTURES["Base Color"]
+
+
+def test_updater_ignores_template_for_several_renderers(scene):
+    _, material, sg = build(TEXTURES, renderer=("Arnold", "Redshift"))
+    creator = MaterialFactory.create_updater(material, sg, "Arnold", "aiNormalMap", "arnold_skin")
+    assert creator.renderers == ["Arnold", "Redshift"]
+    assert creator.template_name is None
+    assert any("without the template" in warning for warning in scene.warnings)
+
+
+def test_batch_build_converts_only_wired_textures(scene, monkeypatch):
+    converted = []
+    monkeypatch.setattr(lampMaterialSetup, "convert_textures", lambda renderer, file_paths, wait=False: converted.extend(file_paths))
+    builder = MaterialBatchBuilder("Arnold", "aiNormalMap", convert_textures=True)
+    results = builder.build({"crate": TEXTURES}, assign=False)
+    assert results[0]["error"] is None
+    assert converted == [TEXTURES["Base Color"], TEXTURES["Roughness"]]
+
+
+def test_stale_file_node_entry_is_rescanned(scene):
+    _, first, _ = build(TEXTURES, reuse=False)
+    file_node = source(f"{first}.baseColor").split(".")[0]
+    key = FILE_NODE_CACHE.make_key(TEXTURES["Base Color"], cmds.getAttr(f"{file_node}.colorSpace"))
+    assert FILE_NODE_CACHE.lookup(key) == file_node
+    # As after a rename: the entry points at a name that no longer exists.
+    FILE_NODE_CACHE.add(key, "renamedAway_file")
+    assert FILE_NODE_CACHE.lookup(key) == file_node
+
+    _, second, _ = build(TEXTURES, name="otherM", reuse=False)
+    assert source(f"{second}.baseColor").split(".")[0] == file_node
+
+
+def test_batch_build_in_gui_session_does_not_load_plugin(scene, monkeypatch):
+    monkeypatch.setattr(cmds, "about", lambda batch=False, **kwargs: False if batch else "2025")
+    monkeypatch.setattr(lampMaterialSetup, "load_plugin", lambda: pytest.fail("load_plugin called"))
+    results = MaterialBatchBuilder("Arnold", "aiNormalMap").build({"crate": TEXTURES}, assign=False)
+    assert results[0]["error"] is None
+
+
+def test_file_node_is_reused_after_undo_and_redo(scene):
+    _, first, _ = build(TEXTURES, reuse=False)
+    file_node = source(f"{first}.baseColor").split(".")[0]
+    cmds.undo()
+    assert not cmds.objExists(file_node)
+    cmds.redo()
+    assert cmds.objExists(file_node)
+
+    _, second, _ = build(TEXTURES, name="otherM", reuse=False)
+    assert source(f"{second}.baseColor").split(".")[0] == file_node
+    assert len(cmds.ls(type="place2dTexture")) == 1
+
+
+def test_batch_build_assigns_folder_sets_by_asset_name(scene):
+    transform = scene.create_mesh("rock_geo")
+    builder = MaterialBatchBuilder("Arnold", "aiNormalMap")
+    results = builder.build({"cliff/rock": TEXTURES, "crate": {"Base Color": TEXTURES["Base Color"]}})
+    assert results[0]["objects"] == [transform]
+    assert results[0]["material"] == "cliff_rockM"
+    assert find_lamp_material([transform]) == (results[0]["material"], results[0]["sg"])
+    assert scene.warnings == [f"No geometry matches asset 'crate', {results[1]['material']} was not assigned."]
+
+
+def probed(file_path, channels, mtime):
+    return TextureInfo(file_path, "png", 8, 8, channels, 8, False, mtime)
+
+
+def test_update_rebuilds_file_node_when_probed_settings_change(scene):
+    _, material, sg = build(TEXTURES)
+    old_file_node = source(f"{material}.specularRoughness").split(".")[0]
+    assert cmds.getAttr(f"{old_file_node}.alphaIsLuminance")
+
+    creator = MaterialFactory.create_updater(material, sg, "Arnold", "aiNormalMap")
+    texture_info = {TEXTURES["Roughness"]: probed(TEXTURES["Roughness"], 1, 123.0)}
+    creator.update_textures(material, sg, TEXTURES, True, True, "aiNormalMap", texture_info=texture_info)
+    new_source = source(f"{material}.specularRoughness")
+    assert new_source.endswith(".outColorR")
+    assert not cmds.getAttr(new_source.split(".")[0] + ".alphaIsLuminance")
+    assert not cmds.objExists(old_file_node)
+
+
+def test_update_keeps_converted_path_when_only_mtime_changes(scene):
+    _, material, sg = build(TEXTURES)
+    file_node = source(f"{material}.specularRoughness").split(".")[0]
+    converted = "/tex/crate/crate_Roughness.tx"
+    cmds.setAttr(f"{file_node}.fileTextureName", converted, type="string")
+
+    creator = MaterialFactory.create_updater(material, sg, "Arnold", "aiNormalMap")
+    texture_info = {TEXTURES["Roughness"]: probed(TEXTURES["Roughness"], 3, 123.0)}
+    creator.update_textures(material, sg, TEXTURES, True, True, "aiNormalMap", texture_info=texture_info)
+    assert source(f"{material}.specularRoughness") == f"{file_node}.outAlpha"
+    assert cmds.getAttr(f"{file_node}.fileTextureName") == converted
+    assert json.loads(cmds.getAttr(f"{material}.{MATERIAL_STATE_ATTR}"))["textures"]["Roughness"][1] == 123.0
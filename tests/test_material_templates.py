@@ -0,0 +1,66 @@
+import pytest
+
+from lampMaterialTemplates import available_templates, compile_template, load_template
+from lampShadingGraph import ShadingGraph
+
+
+def make_template(**overrides):
+    definition = {
+        "renderer": "Arnold",
+        "shader": {"type": "aiStandardSurface", "attributes": {"base": 0.5}},
+        "textures": {
+            "Base Color": {"connections": [["file.outColor", "baseColor"]]},
+            "Normal": [
+                {
+                    "when": {"normal_map_type": "aiNormalMap"},
+                    "nodes": {"normal": {"type": "aiNormalMap"}},
+                    "attributes": {"normal.invertY": {"value": True, "when": {"use_substance_style": True}}},
+                    "connections": [["file.outColor", "normal.input"], ["normal.outValue", "normalCamera"]]
+                },
+                {
+                    "nodes": {"bump": {"type": "bump2d"}},
+                    "connections": [["file.$scalar", "bump.bumpValue"], ["bump.outNormal", "normalCamera"]]
+                }
+            ]
+        }
+    }
+    definition.update(overrides)
+    return compile_template(definition, "test")
+
+
+def test_compile_template():
+    template = make_template()
+    assert template.name == "test"
+    assert template.renderer == "Arnold"
+    assert template.texture_types == ["Base Color", "Normal"]
+    assert template.dependent_types("normal_map_type") == ["Normal"]
+    assert template.dependent_types("use_substance_style") == ["Normal"]
+
+
+def test_plan_picks_first_matching_variant():
+    template = make_template()
+    graph = ShadingGraph()
+    material, sg = template.plan_shader(graph, "crateM")
+    options = {"use_substance_style": True, "normal_map_type": "bump2d"}
+    assert template.plan_texture(graph, "crateM", material, sg, "@file", "Normal", "@file.outAlpha", options)
+    assert graph.stats() == {"nodes": 3, "added_attributes": 0, "attributes": 1, "connections": 3}
+    assert graph.nodes_since(2) == ["@2"]
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"shader": {}}, "missing 'type'"),
+    ({"textures": {"Base Color": {"connections": [["file.outColor", "ghost.input"]]}}}, "unknown node 'ghost'"),
+    ({"textures": {"Base Color": {"when": {"renderer": "Arnold"}}}}, "unknown conditions"),
+    ({"textures": {"Base Color": {"nodes": {"file": {"type": "file"}}}}}, "cannot redefine"),
+    ({"textures": {"Base Color": {"connections": [["material.$scalar", "baseColor"]]}}}, "only use"),
+])
+def test_invalid_templates(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        make_template(**overrides)
+
+
+def test_builtin_templates_compile():
+    templates = available_templates()
+    assert templates
+    for path in templates.values():
+        assert load_template(path).renderer in ("Arnold", "Redshift")
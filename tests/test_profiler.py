@@ -0,0 +1,76 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import lampProfiler
+from lampProfiler import _NULL_SPAN, PROFILE_ENV_VAR, Profiler
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Make time.perf_counter return the queued values, one per call."""
+    ticks = []
+    monkeypatch.setattr(lampProfiler.time, "perf_counter", lambda: ticks.pop(0))
+    return ticks
+
+
+@pytest.mark.parametrize("value, enabled", [
+    (None, False), ("", False), ("0", False), ("false", False), (" Off ", False), ("NO", False),
+    ("1", True), ("true", True), ("yes", True)])
+def test_profile_env_var(value, enabled):
+    env = {key: item for key, item in os.environ.items() if key != PROFILE_ENV_VAR}
+    if value is not None:
+        env[PROFILE_ENV_VAR] = value
+    env["PYTHONPATH"] = os.path.dirname(lampProfiler.__file__)
+    output = subprocess.run(
+        [sys.executable, "-c", "import lampProfiler; print(lampProfiler.PROFILER.enabled)"],
+        env=env, stdout=subprocess.PIPE, universal_newlines=True, check=True).stdout
+    assert output.strip() == str(enabled)
+
+
+def test_disabled_profiler_returns_the_null_span():
+    profiler = Profiler()
+    with profiler.span("build", count=3) as span:
+        span.set(assets=2)
+    assert profiler.span("other") is span is _NULL_SPAN
+    assert profiler.records == []
+
+    profiler.enable()
+    assert profiler.span("build") is not _NULL_SPAN
+
+
+def test_span_records_args_and_errors(clock):
+    clock.extend([10.0, 11.0, 11.5, 12.0, 12.25])
+    profiler = Profiler(enabled=True)
+    with profiler.span("plan", assets=2) as span:
+        span.set(nodes=5)
+    with pytest.raises(ValueError):
+        with profiler.span("commit"):
+            raise ValueError("bad plug")
+
+    assert [(name, start, end, args) for name, start, end, thread_id, args in profiler.records] == [
+        ("plan", 11.0, 11.5, {"assets": 2, "nodes": 5}), ("commit", 12.0, 12.25, {"error": "bad plug"})]
+    assert list(profiler.summary()) == ["plan", "commit"]
+    assert profiler.summary()["plan"] == {"count": 1, "total": 0.5, "max": 0.5, "mean": 0.5}
+
+
+def test_chrome_trace_export(clock, tmp_path):
+    clock.extend([10.0, 10.5, 10.75])
+    profiler = Profiler(enabled=True)
+    with profiler.span("probe", files=4):
+        pass
+    trace_path = tmp_path / "traces" / "build.json"
+    profiler.export_chrome_trace(str(trace_path))
+
+    trace = json.loads(trace_path.read_text(encoding="utf-8"))
+    metadata, event = trace["traceEvents"]
+    assert metadata["ph"] == "M"
+    assert event["name"] == "probe"
+    assert event["ph"] == "X"
+    assert event["ts"] == pytest.approx(500000.0)
+    assert event["dur"] == pytest.approx(250000.0)
+    assert event["pid"] == metadata["pid"] == os.getpid()
+    assert event["args"] == {"files": 4}
@@ -0,0 +1,81 @@
+import os
+import stat
+import sys
+
+import pytest
+
+from lampSceneBatch import RESULT_MARKER, run_batch
+
+FAKE_WORKER = """#!{python}
+import json
+import os
+import sys
+import time
+
+for line in sys.stdin:
+    job = json.loads(line)
+    name = os.path.basename(job["scene"])
+    print("Initializing fake mayapy")
+    print("// Warning: " + name)
+    sys.stdout.flush()
+    if name == "crash.ma":
+        print("Fatal error in " + name)
+        sys.stdout.flush()
+        sys.exit(3)
+    if name == "hang.ma":
+        time.sleep(30)
+    result = {{"scene": job["scene"], "status": "ok", "error": None, "assets": [], "timings": {{}},
+               "pid": os.getpid(), "renderer": job["renderer"]}}
+    sys.stdout.write({marker!r} + json.dumps(result) + "\\n")
+    sys.stdout.flush()
+"""
+
+
+@pytest.fixture
+def mayapy(tmp_path):
+    """A stand-in mayapy: an executable script run by this interpreter that answers jobs like run_worker."""
+    if os.name == "nt":
+        pytest.skip("the fake mayapy is started through its shebang")
+    path = tmp_path / "mayapy"
+    path.write_text(FAKE_WORKER.format(python=sys.executable, marker=RESULT_MARKER), encoding="utf-8")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def jobs(*scene_names):
+    return [{"scene": os.path.join("/scenes", name), "renderer": ["Arnold"]} for name in scene_names]
+
+
+def test_results_are_framed_and_returned_in_job_order(mayapy):
+    reported = []
+    results = run_batch(jobs("a.ma", "b.ma", "c.ma"), mayapy, workers=1, timeout=30, on_result=reported.append)
+
+    assert [result["scene"] for result in results] == ["/scenes/a.ma", "/scenes/b.ma", "/scenes/c.ma"]
+    assert all(result["status"] == "ok" and result["renderer"] == ["Arnold"] for result in results)
+    assert all("total" in result["timings"] for result in results)
+    assert len({result["pid"] for result in results}) == 1
+    assert reported == results
+
+
+def test_worker_dying_mid_scene_fails_only_that_scene(mayapy):
+    results = run_batch(jobs("a.ma", "crash.ma", "b.ma"), mayapy, workers=1, timeout=30)
+
+    assert [result["status"] for result in results] == ["ok", "failed", "ok"]
+    assert "exited with code 3" in results[1]["error"]
+    assert "Fatal error in crash.ma" in results[1]["error"]
+    assert results[1]["assets"] == []
+    assert results[0]["pid"] != results[2]["pid"]
+
+
+def test_scene_that_times_out_is_failed_and_the_worker_restarted(mayapy):
+    results = run_batch(jobs("hang.ma", "a.ma"), mayapy, workers=1, timeout=1)
+
+    assert [result["status"] for result in results] == ["failed", "ok"]
+    assert results[0]["error"] == "Timed out after 1 s"
+
+
+def test_missing_mayapy_fails_every_scene(tmp_path):
+    results = run_batch(jobs("a.ma", "b.ma"), str(tmp_path / "missing" / "mayapy"), workers=2, timeout=30)
+
+    assert [result["status"] for result in results] == ["failed", "failed"]
+    assert all(result["error"] and result["assets"] == [] for result in results)
@@ -0,0 +1,90 @@
+import maya.cmds as cmds
+import pytest
+
+import lampShadingGraph
+from lampShadingGraph import APPLY_COMMAND, ShadingGraph, load_plugin
+
+
+def plan_graph():
+    graph = ShadingGraph()
+    material = graph.shading_node("aiStandardSurface", "shader", "crateM")
+    file_node = graph.shading_node("file", "texture", "crate_BaseColor")
+    graph.add_attr(material, "lampMaterialState")
+    graph.set_attr(f"{material}.lampMaterialState", "{}")
+    graph.set_attr(f"{file_node}.fileTextureName", "/tex/crate_BaseColor.png")
+    graph.set_attr(f"{file_node}.alphaIsLuminance", True)
+    graph.connect_attr(f"{file_node}.outColor", f"{material}.baseColor")
+    return graph
+
+
+def assert_applied(graph):
+    material, file_node = graph.names["@0"], graph.names["@1"]
+    assert cmds.getAttr(f"{material}.lampMaterialState") == "{}"
+    assert cmds.getAttr(f"{file_node}.fileTextureName") == "/tex/crate_BaseColor.png"
+    assert cmds.getAttr(f"{file_node}.alphaIsLuminance") is True
+    assert cmds.listConnections(f"{material}.baseColor", plugs=True) == [f"{file_node}.outColor"]
+
+
+def test_commit_with_command(scene):
+    graph = plan_graph()
+    graph.commit()
+    assert_applied(graph)
+    assert scene.command_counts[APPLY_COMMAND] == 1
+    assert "setAttr" not in scene.command_counts
+    assert "addAttr" not in scene.command_counts
+
+
+def test_commit_with_modifier_when_undo_is_off(scene, monkeypatch):
+    monkeypatch.delattr(cmds, APPLY_COMMAND)
+    cmds.undoInfo(state=False)
+    try:
+        graph = plan_graph()
+        graph.commit()
+    finally:
+        cmds.undoInfo(state=True)
+    assert_applied(graph)
+    assert "setAttr" not in scene.command_counts
+    assert "connectAttr" not in scene.command_counts
+
+
+def test_commit_with_cmds(scene, monkeypatch):
+    monkeypatch.delattr(cmds, APPLY_COMMAND)
+    graph = plan_graph()
+    graph.commit()
+    assert_applied(graph)
+    assert scene.command_counts["setAttr"] == 3
+    assert scene.command_counts["connectAttr"] == 1
+
+
+def test_apply_command_undo_and_redo(scene):
+    graph = plan_graph()
+    graph._create_nodes()
+    command = lampShadingGraph.ApplyGraphCommand()
+    lampShadingGraph._pending_graph = graph
+    try:
+        command.doIt(None)
+    finally:
+        lampShadingGraph._pending_graph = None
+    assert_applied(graph)
+
+    material = graph.names["@0"]
+    command.undoIt()
+    assert not cmds.attributeQuery("lampMaterialState", node=material, exists=True)
+    assert not cmds.listConnections(f"{material}.baseColor")
+    command.redoIt()
+    assert_applied(graph)
+
+
+def test_load_plugin_keeps_loaded_plugin(monkeypatch):
+    monkeypatch.setattr(cmds, "loadPlugin", lambda *args, **kwargs: pytest.fail("loadPlugin called"))
+    assert load_plugin()
+
+
+def test_load_plugin_failure_falls_back_to_cmds(scene, monkeypatch):
+    def load_plugin_fails(*args, **kwargs):
+        raise RuntimeError("Plug-in not found")
+
+    monkeypatch.delattr(cmds, APPLY_COMMAND)
+    monkeypatch.setattr(cmds, "loadPlugin", load_plugin_fails)
+    assert not load_plugin()
+    assert len(scene.warnings) == 1
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+from lampSubstanceExport import SubstanceExportPreset
+from lampTextureSets import UDIM_TOKEN, load_texture_manifest
+
+PRESET = {
+    "exportPresets": [
+        {"name": "Other", "maps": []},
+        {"name": "Maya", "maps": [
+            {"fileName": "$textureSet_BaseColor(.$udim)", "channels": [{"srcMapName": "basecolor"}, {"srcMapName": "basecolor"}]},
+            {"fileName": "$textureSet_Roughness(.$udim)", "channels": [{"srcMapName": "roughness"}]},
+            {"fileName": "$textureSet_Normal(.$udim)", "channels": [{"srcMapName": "normal_directx"}],
+             "parameters": {"fileFormat": "exr"}},
+            {"fileName": "$textureSet_ORM", "channels": [{"srcMapName": "ambientOcclusion"}, {"srcMapName": "roughness"}]},
+            {"fileName": "$mesh_$textureSet_Height", "channels": [{"srcMapName": "height"}]}
+        ]}
+    ]
+}
+
+
+def test_preset_maps():
+    preset = SubstanceExportPreset.from_data(PRESET, "Maya")
+    assert [(export_map.texture_type, export_map.file_format) for export_map in preset.maps] == [
+        ("Base Color", "png"), ("Roughness", "png"), ("Normal", "exr"), ("Displacement", "png")]
+    assert preset.skipped == ["$textureSet_ORM"]
+
+
+def test_unknown_preset_name():
+    with pytest.raises(ValueError, match="not found"):
+        SubstanceExportPreset.from_data(PRESET, "Unreal")
+
+
+def test_predict_without_verify():
+    preset = SubstanceExportPreset.from_data(PRESET, "Maya")
+    texture_sets = preset.predict_texture_sets("/tex", ["Crate"], mesh="crate", verify=False)
+    assert texture_sets["Crate"] == {
+        "Base Color": os.path.join("/tex", "Crate_BaseColor.png"),
+        "Roughness": os.path.join("/tex", "Crate_Roughness.png"),
+        "Normal": os.path.join("/tex", "Crate_Normal.exr"),
+        "Displacement": os.path.join("/tex", "crate_Crate_Height.png")
+    }
+
+
+def test_predict_requires_variables():
+    preset = SubstanceExportPreset.from_data(PRESET, "Maya")
+    with pytest.raises(ValueError, match="not given"):
+        preset.predict_texture_sets("/tex", ["Crate"], verify=False)
+
+
+def test_predict_verifies_exported_files(tmp_path, texture_dir):
+    texture_dir("tex/Crate_BaseColor.png", "tex/Hero_BaseColor.1001.png", "tex/Hero_BaseColor.1002.png")
+    (tmp_path / "preset.json").write_text(json.dumps(PRESET))
+    (tmp_path / "manifest.json").write_text(json.dumps({
+        "preset": "preset.json", "preset_name": "Maya", "mesh": "props", "export_dir": "tex",
+        "texture_sets": ["Crate", "Hero", "Ghost"]
+    }))
+    assert load_texture_manifest(tmp_path / "manifest.json") == {
+        "Crate": {"Base Color": os.path.join(str(tmp_path / "tex"), "Crate_BaseColor.png")},
+        "Hero": {"Base Color": os.path.join(str(tmp_path / "tex"), f"Hero_BaseColor.{UDIM_TOKEN}.png")}
+    }
+
+
+def test_match_outputs(tmp_path):
+    (tmp_path / "manifest.json").write_text(json.dumps({
+        "preset": PRESET, "preset_name": "Maya", "outputs": {
+            "Crate/Main": ["tex/Crate_BaseColor.png", "tex/Crate_ORM.png", "tex/crate_roughness.png"],
+            "Hero": ["tex/Hero_Normal.1001.exr", "tex/Hero_Normal.1002.exr", "tex/readme.txt"]
+        }
+    }))
+    texture_dir = str(tmp_path / "tex")
+    assert load_texture_manifest(tmp_path / "manifest.json") == {
+        "Crate": {
+            "Base Color": os.path.join(texture_dir, "Crate_BaseColor.png"),
+            "Roughness": os.path.join(texture_dir, "crate_roughness.png")
+        },
+        "Hero": {"Normal": os.path.join(texture_dir, f"Hero_Normal.{UDIM_TOKEN}.exr")}
+    }
@@ -0,0 +1,68 @@
+import maya.cmds as cmds
+import pytest
+
+from lampMaterialSetup import MaterialFactory
+from lampSceneIndex import CONTENT_HASH_ATTR
+from lampTextureAudit import RepathRule, TextureAudit, apply_rules, repath_textures, stat_file, stat_files
+
+
+def test_prefix_rule_matches_whole_folders():
+    rule = RepathRule.parse("//oldserver/textures=//newserver/textures/")
+    assert rule.apply("//oldserver/textures/crate/crate_BaseColor.png") == "//newserver/textures/crate/crate_BaseColor.png"
+    assert rule.apply("\\\\oldserver\\textures\\crate.png") == "//newserver/textures/crate.png"
+    assert rule.apply("//oldserver/textures_old/crate.png") is None
+    assert rule.apply("//oldserver/textures") == "//newserver/textures"
+
+
+def test_regex_rule():
+    rule = RepathRule.parse(r"re:/v(\d+)/=/v00\1/")
+    assert rule.regex
+    assert rule.apply("/assets/v2/crate.png") == "/assets/v002/crate.png"
+    assert rule.apply("/assets/latest/crate.png") is None
+
+
+def test_parse_rejects_rules_without_separator():
+    with pytest.raises(ValueError):
+        RepathRule.parse("/old/path")
+
+
+def test_first_matching_rule_wins():
+    rules = [RepathRule("/a/b", "/x"), RepathRule("/a", "/y")]
+    assert apply_rules(rules, "/a/b/c.png") == "/x/c.png"
+    assert apply_rules(rules, "/a/c.png") == "/y/c.png"
+    assert apply_rules(rules, "/z/c.png") == "/z/c.png"
+
+
+def test_empty_path_does_not_exist():
+    assert stat_file("") == ("", False, 0, None, 0)
+    assert stat_files(["", None])[""].exists is False
+
+
+def test_scan_and_repath_file_node_without_path(scene, texture_dir):
+    base_color, = texture_dir("crate_BaseColor.png")
+    creator = MaterialFactory.create_material("Arnold", "crateM")
+    material, _ = creator.connect_textures({"Base Color": base_color}, True, False, texture_info={})
+    file_node = cmds.listConnections(f"{material}.baseColor")[0]
+    cmds.setAttr(f"{file_node}.fileTextureName", "", type="string")
+
+    entries = TextureAudit().scan()
+    assert [(entry.node, entry.status.exists) for entry in entries] == [(file_node, False)]
+    changes, skipped, missing = repath_textures([RepathRule("/nowhere", "/elsewhere")])
+    assert (changes, skipped) == ([], [])
+    assert [entry.node for entry in missing] == [file_node]
+
+
+@pytest.mark.parametrize("renderer", ["Arnold", ["Arnold", "Redshift"]])
+def test_repath_updates_content_hash(scene, renderer):
+    textures = {"Base Color": "/old/crate_BaseColor.png", "Roughness": "/old/crate_Roughness.png"}
+    moved = {texture_type: path.replace("/old/", "/new/") for texture_type, path in textures.items()}
+    creator = MaterialFactory.create_material(renderer, "crateM", "aiNormalMap")
+    material, sg = creator.connect_textures(textures, True, False, texture_info={})
+
+    changes, skipped, _ = repath_textures([RepathRule("/old", "/new")], require_existing=False)
+    assert len(changes) == 2 and skipped == []
+    assert cmds.getAttr(f"{material}.{CONTENT_HASH_ATTR}") == creator.content_hash(moved, True)
+
+    rebuilt = MaterialFactory.create_material(renderer, "otherM", "aiNormalMap")
+    assert rebuilt.connect_textures(moved, True, False, texture_info={}) == (material, sg)
+    assert rebuilt.reused
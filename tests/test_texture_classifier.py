@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from lampTextureClassifier import DEFAULT_CLASSIFIER, KEYWORDS_ENV_VAR, PARTIAL_CONFIDENCE, TextureClassifier, _create_default_classifier
+
+
+@pytest.mark.parametrize("file_name, texture_type, asset_name", [
+    ("crate_BaseColor.png", "Base Color", "crate"),
+    ("crateBaseColor.png", "Base Color", "crate"),
+    ("crate_base_color.png", "Base Color", "crate"),
+    ("T_rock_Roughness_v002.png", "Roughness", "T_rock"),
+    ("hero_Normal.1001.exr", "Normal", "hero"),
+    ("hero_Normal.<UDIM>.exr", "Normal", "hero"),
+    ("rock_Metallic_4K.exr", "Metalness", "rock"),
+    ("wood_height.png", "Displacement", "wood"),
+    ("barrel-nrm.png", "Normal", "barrel"),
+])
+def test_classify(file_name, texture_type, asset_name):
+    classification = DEFAULT_CLASSIFIER.classify(file_name)
+    assert classification.texture_type == texture_type
+    assert classification.asset_name == asset_name
+
+
+def test_unknown_file_name():
+    assert DEFAULT_CLASSIFIER.classify("notes.png").texture_type is None
+
+
+def test_ambiguous_name_is_penalized():
+    classification = DEFAULT_CLASSIFIER.classify("crate_metal_rough.png")
+    assert classification.texture_type == "Roughness"
+    assert classification.confidence < 1.0
+
+
+@pytest.mark.parametrize("file_name, texture_type, asset_name", [
+    ("crate_roughnessmap.png", "Roughness", "crate"),
+    ("crate-normalmap.exr", "Normal", "crate"),
+    ("texalbedo_crate.png", "Base Color", "crate"),
+])
+def test_partial_keyword_match(file_name, texture_type, asset_name):
+    classification = DEFAULT_CLASSIFIER.classify(file_name)
+    assert classification.texture_type == texture_type
+    assert classification.asset_name == asset_name
+    assert classification.confidence == PARTIAL_CONFIDENCE
+
+
+@pytest.mark.parametrize("file_name", ["abnormal_col.png", "normalized.png", "crateroughnessmap.png", "metalwork.png"])
+def test_keyword_inside_a_word_is_not_matched(file_name):
+    assert DEFAULT_CLASSIFIER.classify(file_name).texture_type is None
+
+
+def test_classify_many_matches_classify():
+    file_names = ["a_BaseColor.png", "notes.txt", "b_Normal.exr", "c-Rough.jpg"]
+    assert DEFAULT_CLASSIFIER.classify_many(file_names) == [DEFAULT_CLASSIFIER.classify(name) for name in file_names]
+
+
+def test_register_keywords():
+    classifier = TextureClassifier()
+    assert classifier.classify("crate_col.png").texture_type is None
+    classifier.register("Base Color", ["col"])
+    assert classifier.classify("crate_col.png").texture_type == "Base Color"
+
+
+def test_register_rejects_unknown_type():
+    classifier = TextureClassifier()
+    with pytest.raises(ValueError):
+        classifier.register("Emission", ["emissive"])
+    assert "Emission" not in classifier.texture_types
+
+
+def test_load_keywords_rejects_unknown_type(tmp_path):
+    keywords_path = tmp_path / "keywords.json"
+    keywords_path.write_text(json.dumps({"Base Color": ["col"], "Emission": ["emissive"]}))
+    classifier = TextureClassifier()
+    with pytest.raises(ValueError):
+        classifier.load_keywords(str(keywords_path))
+    assert classifier.classify("crate_col.png").texture_type is None
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"Emission": ["emissive"]})])
+def test_broken_keywords_file_falls_back_to_builtin(tmp_path, monkeypatch, content):
+    keywords_path = tmp_path / "keywords.json"
+    keywords_path.write_text(content)
+    monkeypatch.setenv(KEYWORDS_ENV_VAR, str(keywords_path))
+    with pytest.warns(UserWarning, match="Ignoring the texture keywords"):
+        classifier = _create_default_classifier()
+    assert classifier.classify("crate_BaseColor.png").texture_type == "Base Color"
+    assert classifier.classify("barrel-nrm.png").texture_type == "Normal"
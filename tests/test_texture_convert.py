@@ -0,0 +1,102 @@
+import os
+import subprocess
+
+import pytest
+
+import lampTextureConvert
+from lampTextureConvert import COMMAND_ENV_VAR, TextureConverter
+from lampTextureSets import UDIM_TOKEN
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Stub subprocess.run: records the arguments and writes the -o output like maketx."""
+    calls = []
+
+    def run(arguments, **kwargs):
+        calls.append(arguments)
+        with open(arguments[arguments.index("-o") + 1], "wb"):
+            pass
+        return subprocess.CompletedProcess(arguments, 0, stdout="")
+
+    monkeypatch.delenv(COMMAND_ENV_VAR, raising=False)
+    monkeypatch.setattr(lampTextureConvert.subprocess, "run", run)
+    return calls
+
+
+def converter():
+    return TextureConverter("Arnold", max_workers=2)
+
+
+def test_converts_stale_and_skips_up_to_date_sources(texture_dir, runs):
+    fresh, stale, new = texture_dir("fresh.png", "stale.png", "new.png", "fresh.tx", "stale.tx")[:3]
+    os.utime(fresh, (100, 100))
+    os.utime(os.path.splitext(fresh)[0] + ".tx", (200, 200))
+    os.utime(stale, (300, 300))
+    os.utime(os.path.splitext(stale)[0] + ".tx", (200, 200))
+
+    results = converter().convert([fresh, stale, new, fresh])
+
+    assert [(result.source, result.status) for result in results] == [
+        (fresh, "up-to-date"), (stale, "converted"), (new, "converted")]
+    assert sorted(arguments[3] for arguments in runs) == sorted([stale, new])
+
+
+def test_converted_source_is_not_converted_again(texture_dir, runs):
+    source = texture_dir("crate_BaseColor.png")[0]
+    os.utime(source, (100, 100))
+    assert converter().convert([source])[0].status == "converted"
+    assert converter().convert([source])[0].status == "up-to-date"
+    assert len(runs) == 1
+
+
+def test_udim_tiles_are_converted_and_reported_as_one_result(texture_dir, runs):
+    first, second = texture_dir("hero_BaseColor.1001.exr", "hero_BaseColor.1002.exr")
+    pattern = os.path.join(os.path.dirname(first), f"hero_BaseColor.{UDIM_TOKEN}.exr")
+
+    result, = converter().convert([pattern])
+
+    assert (result.source, result.output, result.status) == (
+        pattern, os.path.splitext(pattern)[0] + ".tx", "converted")
+    assert sorted(arguments[3] for arguments in runs) == [first, second]
+
+
+def test_missing_tile_set_and_source_fail(tmp_path, runs):
+    pattern = str(tmp_path / f"hero_BaseColor.{UDIM_TOKEN}.exr")
+    missing = str(tmp_path / "missing.png")
+    tile_set, source = converter().convert([pattern, missing])
+    assert (tile_set.status, tile_set.error) == ("failed", "No tiles found")
+    assert (source.status, source.error) == ("failed", "Source texture not found")
+    assert runs == []
+
+
+def test_missing_executable_fails_the_source(texture_dir, monkeypatch):
+    def run(arguments, **kwargs):
+        raise FileNotFoundError(2, "No such file or directory", arguments[0])
+
+    monkeypatch.delenv(COMMAND_ENV_VAR, raising=False)
+    monkeypatch.delenv("MTOA_LOCATION", raising=False)
+    monkeypatch.setattr(lampTextureConvert.shutil, "which", lambda *args, **kwargs: None)
+    monkeypatch.setattr(lampTextureConvert.subprocess, "run", run)
+    source = texture_dir("crate_BaseColor.png")[0]
+
+    result, = converter().convert([source])
+
+    assert result.status == "failed"
+    assert "maketx" in result.error
+
+
+def test_non_zero_exit_reports_the_tool_output(texture_dir, monkeypatch):
+    monkeypatch.delenv(COMMAND_ENV_VAR, raising=False)
+    monkeypatch.setattr(
+        lampTextureConvert.subprocess, "run",
+        lambda arguments, **kwargs: subprocess.CompletedProcess(arguments, 3, stdout="bad image\n"))
+    silent = TextureConverter("Redshift", command=["tool", "{source}"])
+    source = texture_dir("crate_BaseColor.png")[0]
+
+    assert converter().convert([source])[0][2:] == ("failed", "bad image")
+
+    monkeypatch.setattr(
+        lampTextureConvert.subprocess, "run",
+        lambda arguments, **kwargs: subprocess.CompletedProcess(arguments, 3, stdout=""))
+    assert silent.convert([source])[0][2:] == ("failed", "Exit code 3")
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+import lampTextureIndex
+from lampTextureIndex import TextureIndex
+
+
+@pytest.fixture
+def scandirs(monkeypatch):
+    """Record every directory listed with os.scandir."""
+    listed = []
+    scandir = os.scandir
+
+    def record(path):
+        listed.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(lampTextureIndex.os, "scandir", record)
+    return listed
+
+
+def library(texture_dir, tmp_path):
+    texture_dir("lib/crate_BaseColor.png", "lib/notes.txt", "lib/rock/rock_Normal.exr")
+    return str(tmp_path / "lib")
+
+
+def scanned(index, root):
+    file_paths, completed = index.scan(root)
+    assert completed
+    return sorted(os.path.relpath(path, root) for path in file_paths)
+
+
+def test_index_survives_a_reload(texture_dir, tmp_path, scandirs):
+    root = library(texture_dir, tmp_path)
+    index_path = str(tmp_path / "index" / "textureIndex.json")
+    expected = ["crate_BaseColor.png", os.path.join("rock", "rock_Normal.exr")]
+
+    assert scanned(TextureIndex(index_path), root) == expected
+    assert len(scandirs) == 2
+    assert os.path.isfile(index_path)
+
+    assert scanned(TextureIndex(index_path), root) == expected
+    assert len(scandirs) == 2
+
+
+def test_changed_directory_is_listed_again(texture_dir, tmp_path, scandirs):
+    root = library(texture_dir, tmp_path)
+    index_path = str(tmp_path / "textureIndex.json")
+    scanned(TextureIndex(index_path), root)
+
+    texture_dir("lib/rock/rock_Roughness.exr")
+    rock = os.path.join(root, "rock")
+    os.utime(rock, (os.stat(rock).st_mtime + 10,) * 2)
+    del scandirs[:]
+
+    assert scanned(TextureIndex(index_path), root) == [
+        "crate_BaseColor.png", os.path.join("rock", "rock_Normal.exr"), os.path.join("rock", "rock_Roughness.exr")]
+    assert scandirs == [rock]
+
+
+@pytest.mark.parametrize("content", [b"{not json", b"[1, 2]", b'{"version": 1, "directories": []}', b"\xff\xfe"])
+def test_corrupt_index_is_rebuilt(texture_dir, tmp_path, content):
+    root = library(texture_dir, tmp_path)
+    index_path = tmp_path / "textureIndex.json"
+    index_path.write_bytes(content)
+
+    assert scanned(TextureIndex(str(index_path)), root) == [
+        "crate_BaseColor.png", os.path.join("rock", "rock_Normal.exr")]
+    assert b'"crate_BaseColor.png"' in index_path.read_bytes()
+
+
+def test_unreadable_index_path_does_not_raise(texture_dir, tmp_path):
+    root = library(texture_dir, tmp_path)
+    index_dir = tmp_path / "index"
+    index_dir.mkdir()
+
+    assert scanned(TextureIndex(str(index_dir)), root) == [
+        "crate_BaseColor.png", os.path.join("rock", "rock_Normal.exr")]
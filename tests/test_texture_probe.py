@@ -0,0 +1,92 @@
+import struct
+
+import pytest
+
+from lampTextureProbe import (
+    LINEAR_COLOR_SPACE, RAW_COLOR_SPACE, FileSettings, TextureInfo, choose_file_settings, probe_texture,
+    probe_textures)
+
+
+def png_header(width, height, bit_depth, color_type):
+    ihdr = struct.pack(">IIBBBBB", width, height, bit_depth, color_type, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", len(ihdr)) + b"IHDR" + ihdr + b"\x00" * 4
+
+
+def jpeg_header(width, height, channels):
+    app0 = b"JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof = struct.pack(">BHHB", 8, height, width, channels) + b"\x00" * 3 * channels
+    return (b"\xff\xd8" + b"\xff\xe0" + struct.pack(">H", len(app0) + 2) + app0
+            + b"\xff\xc0" + struct.pack(">H", len(sof) + 2) + sof)
+
+
+def exr_attribute(name, type_name, value):
+    return name + b"\x00" + type_name + b"\x00" + struct.pack("<i", len(value)) + value
+
+
+def exr_header(width, height, channels, pixel_type=1):
+    channel_list = b"".join(
+        name + b"\x00" + struct.pack("<iB3xii", pixel_type, 0, 1, 1) for name in channels) + b"\x00"
+    return (b"\x76\x2f\x31\x01" + struct.pack("<i", 2)
+            + exr_attribute(b"channels", b"chlist", channel_list)
+            + exr_attribute(b"dataWindow", b"box2i", struct.pack("<iiii", 0, 0, width - 1, height - 1))
+            + b"\x00")
+
+
+def write(tmp_path, file_name, data):
+    path = tmp_path / file_name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_png_header(tmp_path):
+    info = probe_texture(write(tmp_path, "crate_Roughness.png", png_header(512, 256, 16, 0)))
+    assert (info.format, info.width, info.height, info.channels, info.bit_depth, info.is_float) == (
+        "png", 512, 256, 1, 16, False)
+
+
+def test_jpeg_header_skips_segments_before_frame(tmp_path):
+    info = probe_texture(write(tmp_path, "crate_BaseColor.jpg", jpeg_header(640, 480, 3)))
+    assert (info.format, info.width, info.height, info.channels, info.bit_depth) == ("jpg", 640, 480, 3, 8)
+
+
+def test_exr_header(tmp_path):
+    info = probe_texture(write(tmp_path, "crate_Height.exr", exr_header(128, 64, [b"A", b"B", b"G", b"R"])))
+    assert (info.format, info.width, info.height, info.channels, info.bit_depth, info.is_float) == (
+        "exr", 128, 64, 4, 16, True)
+
+    info = probe_texture(write(tmp_path, "crate_Mask.exr", exr_header(32, 32, [b"Y"], pixel_type=2)))
+    assert (info.channels, info.bit_depth) == (1, 32)
+
+
+def test_hdr_header(tmp_path):
+    data = b"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y 200 +X 300\n"
+    info = probe_texture(write(tmp_path, "sky.hdr", data))
+    assert (info.format, info.width, info.height, info.channels, info.is_float) == ("hdr", 300, 200, 3, True)
+
+
+def test_unreadable_headers_map_to_none(tmp_path):
+    broken = write(tmp_path, "broken.png", b"not a png")
+    truncated = write(tmp_path, "truncated.exr", exr_header(8, 8, [b"R"])[:20])
+    missing = str(tmp_path / "missing.jpg")
+    unknown = write(tmp_path, "crate.tga", b"\x00" * 32)
+    assert probe_textures([broken, truncated, missing, unknown, ""]) == {
+        broken: None, truncated: None, missing: None, unknown: None}
+
+
+def probed(channels, is_float=False):
+    return TextureInfo("/t/crate.exr", "exr", 8, 8, channels, 32 if is_float else 8, is_float, 0.0)
+
+
+@pytest.mark.parametrize("info", [None, probed(3), probed(4)])
+@pytest.mark.parametrize("use_substance_style", [False, True])
+def test_normal_maps_are_raw_whether_probed_or_not(info, use_substance_style):
+    assert choose_file_settings("Normal", info, use_substance_style) == FileSettings(RAW_COLOR_SPACE, False, "outAlpha")
+
+
+def test_file_settings_from_header():
+    assert choose_file_settings("Base Color", probed(3, is_float=True), False) == (LINEAR_COLOR_SPACE, False, "outAlpha")
+    assert choose_file_settings("Base Color", probed(3), False) == (None, False, "outAlpha")
+    assert choose_file_settings("Roughness", probed(1), False) == (RAW_COLOR_SPACE, False, "outColorR")
+    assert choose_file_settings("Roughness", probed(4), False) == (RAW_COLOR_SPACE, False, "outAlpha")
+    assert choose_file_settings("Roughness", probed(3), False) == (RAW_COLOR_SPACE, True, "outAlpha")
+    assert choose_file_settings("Displacement", probed(3), False) == (RAW_COLOR_SPACE, False, "outColorR")
@@ -0,0 +1,113 @@
+import json
+import os
+
+import pytest
+
+import lampTextureSets
+from lampTextureSets import (
+    MUDBOX_TOKEN, UDIM_TOKEN, collapse_tile_sets, collect_texture_sets, load_texture_manifest, maya_safe_name,
+    asset_node_name, split_asset_key, tile_files, tile_scan, tiling_mode)
+
+
+def test_collapse_udim_tiles():
+    paths, tile_sets = collapse_tile_sets([
+        "/t/hero_BaseColor.1001.exr", "/t/hero_BaseColor.1002.exr", "/t/hero_BaseColor.1004.exr", "/t/plain.png"])
+    pattern = os.path.join("/t", f"hero_BaseColor.{UDIM_TOKEN}.exr")
+    assert paths == [pattern, "/t/plain.png"]
+    assert tile_sets[pattern].tiles == ["1001", "1002", "1004"]
+    assert tile_sets[pattern].missing == ["1003"]
+    assert tile_sets[pattern].tiling_mode == tiling_mode(pattern) == 3
+
+
+def test_collapse_uv_tiles():
+    paths, tile_sets = collapse_tile_sets(["/t/prop_u1_v1.png", "/t/prop_u2_v1.png"])
+    assert paths == [os.path.join("/t", f"prop_{MUDBOX_TOKEN}.png")]
+    assert tile_sets[paths[0]].tiling_mode == 2
+
+
+def test_lone_resolution_suffix_is_not_a_tile():
+    paths, tile_sets = collapse_tile_sets(["/t/rock_1024.png"])
+    assert paths == ["/t/rock_1024.png"]
+    assert not tile_sets
+
+
+def test_tile_files(texture_dir):
+    tiles = texture_dir("hero_Normal.1001.png", "hero_Normal.1002.png", "other.png")
+    pattern = os.path.join(os.path.dirname(tiles[0]), f"hero_Normal.{UDIM_TOKEN}.png")
+    assert tile_files(pattern) == tiles[:2]
+    assert tile_files(tiles[2]) == [tiles[2]]
+
+
+def test_collect_texture_sets(texture_dir):
+    crate_color, crate_rough, hero_tile, _, _ = texture_dir(
+        "crate/crate_BaseColor.png", "crate/crate_Roughness.png", "hero/hero_Normal.1001.exr",
+        "hero/hero_Normal.1002.exr", "notes.png")
+    texture_sets = collect_texture_sets(os.path.dirname(os.path.dirname(crate_color)))
+    assert texture_sets == {
+        "crate": {"Base Color": crate_color, "Roughness": crate_rough},
+        "hero": {"Normal": os.path.join(os.path.dirname(hero_tile), f"hero_Normal.{UDIM_TOKEN}.exr")}
+    }
+
+
+def test_load_texture_manifest(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"assets": {"crate": {"Base Color": "crate/crate_BaseColor.png", "Normal": None}}}))
+    assert load_texture_manifest(manifest) == {"crate": {"Base Color": str(tmp_path / "crate/crate_BaseColor.png")}}
+
+
+def test_manifest_rejects_unknown_texture_types(tmp_path):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"crate": {"Emission": "crate_Emission.png"}}))
+    with pytest.raises(ValueError, match="Emission"):
+        load_texture_manifest(manifest)
+
+
+def test_maya_safe_name():
+    assert maya_safe_name("12 crate-01") == "_12_crate_01"
+    assert maya_safe_name("---") == "asset"
+
+
+def test_collect_texture_sets_merges_folders_of_one_asset(texture_dir):
+    color, normal = texture_dir("rock/rock_BaseColor.png", "rock/maps/rock_Normal.png")
+    texture_sets = collect_texture_sets(os.path.dirname(os.path.dirname(color)))
+    assert texture_sets == {"rock": {"Base Color": color, "Normal": normal}}
+
+
+def test_collect_texture_sets_splits_conflicting_folders(texture_dir):
+    cliff_color, cliff_rough, beach_color, beach_rough = texture_dir(
+        "cliff/rock_BaseColor.png", "cliff/rock_Roughness.png", "beach/rock_BaseColor.png", "beach/rock_Roughness.png")
+    with pytest.warns(UserWarning, match="rock"):
+        texture_sets = collect_texture_sets(os.path.dirname(os.path.dirname(cliff_color)))
+    assert texture_sets == {
+        "beach/rock": {"Base Color": beach_color, "Roughness": beach_rough},
+        "cliff/rock": {"Base Color": cliff_color, "Roughness": cliff_rough}
+    }
+
+
+def test_split_asset_key():
+    assert split_asset_key("rock") == (None, "rock")
+    assert split_asset_key("props/cliff/rock") == ("props/cliff", "rock")
+    assert asset_node_name("props/cliff/rock") == "props_cliff_rock"
+
+
+def test_tile_scan_lists_each_directory_once(texture_dir, monkeypatch):
+    tiles = texture_dir("hero_Normal.1001.png", "hero_Normal.1002.png", "hero_BaseColor.1001.png")
+    directory = os.path.dirname(tiles[0])
+    normal = os.path.join(directory, f"hero_Normal.{UDIM_TOKEN}.png")
+    color = os.path.join(directory, f"hero_BaseColor.{UDIM_TOKEN}.png")
+    scans = []
+    list_textures = lampTextureSets._list_textures
+    monkeypatch.setattr(lampTextureSets, "_list_textures", lambda *args: scans.append(args) or list_textures(*args))
+
+    with tile_scan():
+        assert tile_files(normal) == tiles[:2]
+        assert tile_files(color) == tiles[2:]
+        assert tile_files(normal) == tiles[:2]
+    assert len(scans) == 1
+
+    _, tile_sets = collapse_tile_sets(tiles)
+    with tile_scan(tile_sets):
+        assert tile_files(normal) == tiles[:2]
+    assert len(scans) == 1
+    assert tile_files(normal) == tiles[:2]
+    assert len(scans) == 2